@@ -0,0 +1,138 @@
+import hashlib
+import os
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
+                             QPushButton, QFileDialog, QLabel)
+from PySide6.QtGui import QIcon, QPixmap, QImageReader
+from PySide6.QtCore import Qt, Signal, QSize, QStandardPaths, QThread
+from jobs import Job, JobManager
+ASSET_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp', '.pbm', '.tga', '.ico', '.xbm', '.pcraw')
+THUMBNAIL_SIZE = 64
+def cache_directory():
+    location = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    return os.path.join(location or ".", "PixelCraftor", "thumbnails")
+def read_asset(file_path, size=None):
+    if file_path.lower().endswith(".xbm"):
+        from xbm_converter import XBMConverter
+        with open(file_path, 'r') as f:
+            return XBMConverter().xbm_to_image(f.read())
+    if file_path.lower().endswith(".pcraw"):
+        from mapped_image import MappedImage
+        mapped = MappedImage(file_path)
+        return mapped.preview(size) if size else mapped
+    reader = QImageReader(file_path)
+    if reader.canRead():
+        if size and reader.size().isValid():
+            reader.setScaledSize(reader.size().scaled(size, size, Qt.KeepAspectRatio).expandedTo(QSize(1, 1)))
+        image = reader.read()
+        if not image.isNull():
+            return image
+    from image_io import read_image
+    return read_image(file_path)
+class ThumbnailCache:
+    def __init__(self, directory=None, size=THUMBNAIL_SIZE):
+        self.directory = directory or cache_directory()
+        self.size = size
+        self.memory = {}
+    def key(self, file_path):
+        stat = os.stat(file_path)
+        identity = f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size}"
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+    def cache_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+    def lookup(self, file_path):
+        key = self.key(file_path)
+        if key not in self.memory:
+            path = self.cache_path(key)
+            if not os.path.exists(path):
+                return key, None
+            self.memory[key] = QPixmap(path)
+        return key, self.memory[key]
+    def generate(self, file_path, key, progress=None):
+        image = read_asset(file_path, self.size)
+        if image is None or image.isNull():
+            raise IOError(f"Не удалось открыть изображение: {file_path}")
+        thumbnail = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.FastTransformation)
+        path = self.cache_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        thumbnail.save(path + ".part.png")
+        os.replace(path + ".part.png", path)
+        return key, thumbnail
+    def store(self, key, image):
+        self.memory[key] = QPixmap.fromImage(image)
+        return self.memory[key]
+class AssetBrowser(QWidget):
+    file_activated = Signal(str)
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.cache = ThumbnailCache()
+        self.jobs = JobManager(self, max(1, QThread.idealThreadCount() - 1))
+        self.items = {}
+        self.directory = None
+        self.setup_ui()
+        self.show_recent()
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        buttons_layout = QHBoxLayout()
+        self.recent_button = QPushButton("Недавние")
+        self.recent_button.clicked.connect(self.show_recent)
+        buttons_layout.addWidget(self.recent_button)
+        self.folder_button = QPushButton("Папка...")
+        self.folder_button.clicked.connect(self.choose_directory)
+        buttons_layout.addWidget(self.folder_button)
+        layout.addLayout(buttons_layout)
+        self.location_label = QLabel()
+        layout.addWidget(self.location_label)
+        self.asset_list = QListWidget()
+        self.asset_list.setViewMode(QListWidget.IconMode)
+        self.asset_list.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.asset_list.setGridSize(QSize(THUMBNAIL_SIZE + 24, THUMBNAIL_SIZE + 32))
+        self.asset_list.setResizeMode(QListWidget.Adjust)
+        self.asset_list.setUniformItemSizes(True)
+        self.asset_list.itemActivated.connect(lambda item: self.file_activated.emit(item.data(Qt.UserRole)))
+        layout.addWidget(self.asset_list)
+    def show_recent(self):
+        self.directory = None
+        self.location_label.setText("Недавние файлы")
+        self.show_files([path for path in self.settings.get_recent_files() if os.path.exists(path)])
+    def choose_directory(self):
+        directory = QFileDialog.getExistingDirectory(self, "Выбор папки", self.directory or "")
+        if directory:
+            self.show_directory(directory)
+    def show_directory(self, directory):
+        self.directory = directory
+        self.location_label.setText(directory)
+        names = sorted(name for name in os.listdir(directory) if name.lower().endswith(ASSET_EXTENSIONS))
+        self.show_files([os.path.join(directory, name) for name in names])
+    def show_files(self, paths):
+        self.jobs.cancel_all()
+        self.asset_list.clear()
+        self.items = {}
+        placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        placeholder.fill(Qt.lightGray)
+        for path in paths:
+            item = QListWidgetItem(os.path.basename(path))
+            item.setData(Qt.UserRole, path)
+            item.setToolTip(path)
+            self.asset_list.addItem(item)
+            try:
+                key, pixmap = self.cache.lookup(path)
+            except OSError:
+                continue
+            item.setIcon(QIcon(pixmap if pixmap is not None else placeholder))
+            if pixmap is None:
+                self.items.setdefault(key, []).append(item)
+                job = Job(self.cache.generate, path, key)
+                job.signals.finished.connect(self.on_thumbnail_ready)
+                job.signals.failed.connect(lambda message: print(f"Миниатюра: {message}"))
+                self.jobs.start(job)
+    def on_thumbnail_ready(self, result):
+        key, image = result
+        pixmap = self.cache.store(key, image)
+        for item in self.items.pop(key, []):
+            item.setIcon(QIcon(pixmap))
+    def refresh(self):
+        if self.directory:
+            self.show_directory(self.directory)
+        else:
+            self.show_recent()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+from c_array import CArrayExporter, COLOR_FORMATS
+from c_formatter import CHeaderFormatter
+from dithering import DITHER_METHODS, LEVEL_DITHER_METHODS
+from xbm_converter import XBMConverter
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Пакетное преобразование изображений в XBM и C-массивы")
+    parser.add_argument("images", nargs="+", help="исходные изображения")
+    parser.add_argument("-o", "--output", default=".", help="каталог для результатов")
+    parser.add_argument("-f", "--format", choices=("xbm", "raw") + COLOR_FORMATS, default="xbm", help="формат результата")
+    parser.add_argument("--dither", choices=DITHER_METHODS, default=None, help="метод дизеринга")
+    parser.add_argument("--threshold", type=int, default=128, help="порог яркости (1-255)")
+    parser.add_argument("--per-line", type=int, default=12, help="байт в строке C-массива")
+    parser.add_argument("--progmem", action="store_true", help="добавить PROGMEM к массивам")
+    parser.add_argument("--stdint", action="store_true", help="использовать uint8_t из stdint.h")
+    args = parser.parse_args(argv)
+    if args.format not in ("xbm", "raw") and args.dither not in (None,) + LEVEL_DITHER_METHODS:
+        parser.error(f"метод {args.dither} доступен только для формата xbm")
+    return args
+def convert_raw(paths, output_dir):
+    from image_io import read_image
+    from mapped_image import RAW_EXTENSION, write_raw
+    written = []
+    for path in paths:
+        try:
+            image = read_image(path)
+        except Exception as e:
+            print(f"Не удалось открыть изображение: {path} ({e})")
+            continue
+        name = os.path.splitext(os.path.basename(path))[0]
+        written.append(write_raw(image, os.path.join(output_dir, name + RAW_EXTENSION)))
+    return written
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    os.makedirs(args.output, exist_ok=True)
+    if args.format == "xbm":
+        written = XBMConverter().convert_files(args.images, args.output, args.dither, args.threshold)
+    elif args.format == "raw":
+        written = convert_raw(args.images, args.output)
+    else:
+        formatter = CHeaderFormatter(per_line=args.per_line, progmem=args.progmem, stdint=args.stdint)
+        written = CArrayExporter().convert_files(args.images, args.output, args.format, args.dither, formatter)
+    for path in written:
+        print(f"Сохранено: {path}")
+    return 0 if len(written) == len(args.images) else 1
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import re
+import numpy as np
+from PySide6.QtGui import QImage, QPainter, QFont, QColor
+from PySide6.QtCore import Qt
+from c_formatter import CHeaderFormatter
+from pixel_buffer import image_to_array
+FIRST_CHAR = 0x20
+LAST_CHAR = 0x7E
+_fonts = {}
+class BitmapFont:
+    def __init__(self, font):
+        self.font = QFont(font)
+        self.font.setStyleStrategy(QFont.NoAntialias)
+        image = QImage(1, 1, QImage.Format_ARGB32)
+        painter = QPainter(image)
+        painter.setFont(self.font)
+        metrics = painter.fontMetrics()
+        painter.end()
+        self.ascent = metrics.ascent()
+        self.line_height = metrics.height()
+        self.cell_width = metrics.maxWidth() * 2 + 2
+        self.pad = metrics.maxWidth() // 2 + 1
+        self.atlas = np.zeros((self.line_height, 0), dtype=bool)
+        self.glyphs = {}
+        self.add_glyphs([chr(code) for code in range(FIRST_CHAR, LAST_CHAR + 1)])
+    def add_glyphs(self, chars):
+        chars = [char for char in dict.fromkeys(chars) if char not in self.glyphs]
+        if not chars:
+            return
+        image = QImage(self.cell_width * len(chars), self.line_height, QImage.Format_ARGB32)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setFont(self.font)
+        painter.setPen(QColor(0, 0, 0))
+        metrics = painter.fontMetrics()
+        for index, char in enumerate(chars):
+            painter.drawText(index * self.cell_width + self.pad, self.ascent, char)
+        painter.end()
+        strip = (image_to_array(image) >> 24) >= 128
+        origin = self.atlas.shape[1]
+        for index, char in enumerate(chars):
+            left = index * self.cell_width
+            cell = strip[:, left:left + self.cell_width]
+            rows = np.flatnonzero(cell.any(axis=1))
+            columns = np.flatnonzero(cell.any(axis=0))
+            advance = metrics.horizontalAdvance(char)
+            if not len(rows):
+                self.glyphs[char] = (origin + left, 0, 0, 0, advance, 0)
+                continue
+            x, y = int(columns[0]), int(rows[0])
+            width, height = int(columns[-1]) - x + 1, int(rows[-1]) - y + 1
+            self.glyphs[char] = (origin + left + x, y, width, height, advance, x - self.pad)
+        self.atlas = np.hstack([self.atlas, strip])
+    def glyph_bitmap(self, char):
+        x, y, width, height, _, _ = self.glyphs[char]
+        return self.atlas[y:y + height, x:x + width]
+    def layout(self, text):
+        self.add_glyphs(text)
+        pen = 0
+        placed = []
+        for char in text:
+            placed.append((pen, self.glyphs[char]))
+            pen += self.glyphs[char][4]
+        left = min([0] + [position + glyph[5] for position, glyph in placed if glyph[2]])
+        right = max([pen] + [position + glyph[5] + glyph[2] for position, glyph in placed])
+        return placed, left, right
+    def text_size(self, text):
+        _, left, right = self.layout(text)
+        return right - left, self.line_height
+    def text_mask(self, text):
+        placed, left, right = self.layout(text)
+        mask = np.zeros((self.line_height, right - left), dtype=bool)
+        for position, (x, y, width, height, _, x_offset) in placed:
+            if width:
+                target = position + x_offset - left
+                mask[y:y + height, target:target + width] |= self.atlas[y:y + height, x:x + width]
+        return mask, left
+    def gfx_name(self):
+        family = re.sub(r"\W", "", self.font.family()) or "Font"
+        size = self.font.pointSize() if self.font.pointSize() > 0 else self.font.pixelSize()
+        return f"{family}{size}pt7b"
+    def write_gfx(self, stream, name=None):
+        name = name or self.gfx_name()
+        formatter = CHeaderFormatter(static=False, progmem=True, stdint=True)
+        chars = [chr(code) for code in range(FIRST_CHAR, LAST_CHAR + 1)]
+        bitmaps = []
+        table = []
+        offset = 0
+        for char in chars:
+            _, y, width, height, advance, x_offset = self.glyphs[char]
+            data = np.packbits(self.glyph_bitmap(char).ravel()).tobytes()
+            bitmaps.append(data)
+            table.append(f"  {{ {offset:5d}, {width:3d}, {height:3d}, {advance:3d}, {x_offset:4d}, {y - self.ascent:4d} }}")
+            offset += len(data)
+        formatter.write_array(stream, f"{name}Bitmaps", b"".join(bitmaps))
+        stream.write("\n")
+        stream.write(f"const GFXglyph {name}Glyphs[] PROGMEM = {{\n")
+        for index, (char, entry) in enumerate(zip(chars, table)):
+            separator = "," if index < len(table) - 1 else " "
+            stream.write(f"{entry}{separator}   // 0x{ord(char):02X} '{char}'\n")
+        stream.write("};\n\n")
+        stream.write(f"const GFXfont {name} PROGMEM = {{\n")
+        stream.write(f"  (uint8_t  *){name}Bitmaps,\n")
+        stream.write(f"  (GFXglyph *){name}Glyphs,\n")
+        stream.write(f"  0x{FIRST_CHAR:02X}, 0x{LAST_CHAR:02X}, {self.line_height} }};\n")
+def bitmap_font(font):
+    key = font.key()
+    if key not in _fonts:
+        _fonts[key] = BitmapFont(font)
+    return _fonts[key]
@@ -0,0 +1,109 @@
+import io
+import os
+import re
+import numpy as np
+from PySide6.QtGui import QImage
+from c_formatter import CHeaderFormatter
+from image_io import replace_file
+from dithering import color_channels, dither_levels, luminance
+from pixel_buffer import image_to_array
+from quantize import bits_per_pixel, pack_indices, quantize_image
+COLOR_FORMATS = ("rgb565_be", "rgb565_le", "rgb332", "gray4", "gray2")
+COLOR_FORMAT_NAMES = {
+    "rgb565_be": "RGB565 (big endian)",
+    "rgb565_le": "RGB565 (little endian)",
+    "rgb332": "RGB332",
+    "gray4": "Оттенки серого, 4 бит",
+    "gray2": "Оттенки серого, 2 бит",
+}
+COLOR_FORMAT_BPP = {"rgb565_be": 16, "rgb565_le": 16, "rgb332": 8, "gray4": 4, "gray2": 2}
+class CArrayExporter:
+    def __init__(self):
+        pass
+    def header(self, name, image, formatter, **defines):
+        c_data = formatter.includes()
+        c_data += f"#define {name}_width {image.width()}\n"
+        c_data += f"#define {name}_height {image.height()}\n"
+        for key, value in defines.items():
+            c_data += f"#define {name}_{key} {value}\n"
+        return c_data
+    def write_indexed(self, stream, image, name="image", bpp=None, formatter=None):
+        if bpp not in (None, 1, 2, 4, 8):
+            raise ValueError(f"Неподдерживаемая глубина цвета: {bpp}")
+        formatter = formatter or CHeaderFormatter()
+        if image.format() != QImage.Format_Indexed8:
+            image = quantize_image(image, 1 << (bpp or 4))
+        elif bpp and image.colorCount() > 1 << bpp:
+            print(f"Палитра из {image.colorCount()} цветов сокращена до {1 << bpp}")
+            image = quantize_image(image, 1 << bpp)
+        palette = image.colorTable()
+        bpp = bpp or bits_per_pixel(palette)
+        packed = pack_indices(image_to_array(image), bpp)
+        stream.write(self.header(name, image, formatter, bpp=bpp))
+        stream.write(formatter.declaration(f"{name}_palette", formatter.word_type(), len(palette)))
+        stream.write(formatter.format_words(palette))
+        stream.write("};\n")
+        formatter.write_array(stream, f"{name}_data", packed)
+    def save_indexed(self, file_path, image, name="image", bpp=None, formatter=None, progress=None):
+        def write(path):
+            with open(path, 'w') as f:
+                self.write_indexed(f, image, name, bpp, formatter)
+        replace_file(file_path, write, progress)
+        return file_path
+    def indexed_to_c(self, image, name="image", bpp=None, formatter=None):
+        if not isinstance(image, QImage):
+            return None
+        stream = io.StringIO()
+        self.write_indexed(stream, image, name, bpp, formatter)
+        return stream.getvalue()
+    def pack_rgb565(self, image, big_endian=True, dither=None):
+        red, green, blue = color_channels(image)
+        words = (dither_levels(red, 32, dither).astype(np.uint16) << 11
+                 | dither_levels(green, 64, dither).astype(np.uint16) << 5
+                 | dither_levels(blue, 32, dither).astype(np.uint16))
+        return words.astype(">u2" if big_endian else "<u2")
+    def pack_rgb332(self, image, dither=None):
+        red, green, blue = color_channels(image)
+        return (dither_levels(red, 8, dither) << 5 | dither_levels(green, 8, dither) << 2
+                | dither_levels(blue, 4, dither)).astype(np.uint8)
+    def pack_gray(self, image, bpp, dither=None):
+        return pack_indices(dither_levels(luminance(image), 1 << bpp, dither), bpp)
+    def pack_color(self, image, color_format, dither=None):
+        if color_format in ("rgb565_be", "rgb565_le"):
+            return self.pack_rgb565(image, color_format == "rgb565_be", dither)
+        if color_format == "rgb332":
+            return self.pack_rgb332(image, dither)
+        if color_format in ("gray4", "gray2"):
+            return self.pack_gray(image, int(color_format[4:]), dither)
+        raise ValueError(f"Неизвестный формат: {color_format}")
+    def write_color(self, stream, image, name="image", color_format="rgb565_be", dither=None, formatter=None):
+        formatter = formatter or CHeaderFormatter()
+        data = self.pack_color(image, color_format, dither)
+        stream.write(self.header(name, image, formatter, bpp=COLOR_FORMAT_BPP[color_format]))
+        formatter.write_array(stream, f"{name}_data", data)
+    def save_color(self, file_path, image, name="image", color_format="rgb565_be", dither=None, formatter=None,
+                   progress=None):
+        def write(path):
+            with open(path, 'w') as f:
+                self.write_color(f, image, name, color_format, dither, formatter)
+        replace_file(file_path, write, progress)
+        return file_path
+    def color_to_c(self, image, name="image", color_format="rgb565_be", dither=None, formatter=None):
+        if not isinstance(image, QImage):
+            return None
+        stream = io.StringIO()
+        self.write_color(stream, image, name, color_format, dither, formatter)
+        return stream.getvalue()
+    def convert_files(self, paths, output_dir, color_format="rgb565_be", dither=None, formatter=None):
+        written = []
+        for path in paths:
+            image = QImage(path)
+            if image.isNull():
+                print(f"Не удалось открыть изображение: {path}")
+                continue
+            name = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+            output_path = os.path.join(output_dir, f"{name}.h")
+            with open(output_path, 'w') as f:
+                self.write_color(f, image, name, color_format, dither, formatter)
+            written.append(output_path)
+        return written
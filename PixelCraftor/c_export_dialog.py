@@ -0,0 +1,55 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QComboBox, QGridLayout, QSpinBox, QCheckBox)
+from c_array import COLOR_FORMATS, COLOR_FORMAT_NAMES
+from c_formatter import CHeaderFormatter
+from dithering import DITHER_NAMES, LEVEL_DITHER_METHODS
+class CArrayExportDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Экспорт в C-массив")
+        self.setMinimumWidth(300)
+        self.setup_ui()
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        grid_layout = QGridLayout()
+        grid_layout.addWidget(QLabel("Формат:"), 0, 0)
+        self.format_combo = QComboBox()
+        for color_format in COLOR_FORMATS:
+            self.format_combo.addItem(COLOR_FORMAT_NAMES[color_format], color_format)
+        grid_layout.addWidget(self.format_combo, 0, 1)
+        grid_layout.addWidget(QLabel("Дизеринг:"), 1, 0)
+        self.dither_combo = QComboBox()
+        self.dither_combo.addItem("Без дизеринга", None)
+        for method in LEVEL_DITHER_METHODS:
+            self.dither_combo.addItem(DITHER_NAMES[method], method)
+        grid_layout.addWidget(self.dither_combo, 1, 1)
+        grid_layout.addWidget(QLabel("Байт в строке:"), 2, 0)
+        self.per_line_spin = QSpinBox()
+        self.per_line_spin.setRange(1, 64)
+        self.per_line_spin.setValue(12)
+        grid_layout.addWidget(self.per_line_spin, 2, 1)
+        self.const_check = QCheckBox("const")
+        self.const_check.setChecked(True)
+        grid_layout.addWidget(self.const_check, 3, 0)
+        self.progmem_check = QCheckBox("PROGMEM")
+        grid_layout.addWidget(self.progmem_check, 3, 1)
+        self.stdint_check = QCheckBox("uint8_t (stdint.h)")
+        grid_layout.addWidget(self.stdint_check, 4, 0, 1, 2)
+        layout.addLayout(grid_layout)
+        buttons_layout = QHBoxLayout()
+        self.cancel_button = QPushButton("Отмена")
+        self.cancel_button.clicked.connect(self.reject)
+        self.ok_button = QPushButton("ОК")
+        self.ok_button.clicked.connect(self.accept)
+        self.ok_button.setDefault(True)
+        buttons_layout.addWidget(self.cancel_button)
+        buttons_layout.addWidget(self.ok_button)
+        layout.addLayout(buttons_layout)
+        self.setLayout(layout)
+    def color_format(self):
+        return self.format_combo.currentData()
+    def dither(self):
+        return self.dither_combo.currentData()
+    def formatter(self):
+        return CHeaderFormatter(per_line=self.per_line_spin.value(), const=self.const_check.isChecked(),
+                                progmem=self.progmem_check.isChecked(), stdint=self.stdint_check.isChecked())
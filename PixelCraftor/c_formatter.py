@@ -0,0 +1,61 @@
+import io
+import numpy as np
+class CHeaderFormatter:
+    CHUNK_LINES = 16384
+    def __init__(self, per_line=12, static=True, const=True, progmem=False, stdint=False):
+        self.per_line = max(1, per_line)
+        self.static = static
+        self.const = const
+        self.progmem = progmem
+        self.stdint = stdint
+        self.template = np.frombuffer(("  " + "0x00, " * (self.per_line - 1) + "0x00,\n").encode("ascii"), dtype=np.uint16)
+    def byte_type(self):
+        return "uint8_t" if self.stdint else "unsigned char"
+    def word_type(self):
+        return "uint32_t" if self.stdint else "unsigned long"
+    def includes(self):
+        includes = "#include <stdint.h>\n" if self.stdint else ""
+        if self.progmem:
+            includes += "#include <avr/pgmspace.h>\n"
+        return includes
+    def declaration(self, name, ctype, length=None):
+        qualifiers = ("static " if self.static else "") + ("const " if self.const else "")
+        size = "" if length is None else str(length)
+        progmem = " PROGMEM" if self.progmem else ""
+        return f"{qualifiers}{ctype} {name}[{size}]{progmem} = {{\n"
+    def format_lines(self, data):
+        full = len(data) // self.per_line * self.per_line
+        text = ""
+        if full:
+            digits = np.frombuffer(data[:full].hex().encode("ascii"), dtype=np.uint16).reshape(-1, self.per_line)
+            lines = np.empty((len(digits), len(self.template)), dtype=np.uint16)
+            lines[:] = self.template
+            lines[:, 2::3] = digits
+            text = lines.tobytes().decode("ascii")
+        if full < len(data):
+            text += "  " + ", ".join(f"0x{b:02x}" for b in data[full:]) + ",\n"
+        return text
+    def write_bytes(self, stream, data):
+        data = memoryview(data).cast("B")
+        if not len(data):
+            stream.write("\n")
+            return
+        step = self.CHUNK_LINES * self.per_line
+        for start in range(0, len(data), step):
+            text = self.format_lines(data[start:start + step])
+            if start + step >= len(data):
+                text = text[:-2] + "\n"
+            stream.write(text)
+    def format_bytes(self, data):
+        stream = io.StringIO()
+        self.write_bytes(stream, data)
+        return stream.getvalue()
+    def format_words(self, values, digits=8, per_line=6):
+        lines = []
+        for i in range(0, len(values), per_line):
+            lines.append("  " + ", ".join(f"0x{v:0{digits}x}" for v in values[i:i + per_line]))
+        return ",\n".join(lines) + "\n"
+    def write_array(self, stream, name, data, length=None):
+        stream.write(self.declaration(name, self.byte_type(), length))
+        self.write_bytes(stream, data)
+        stream.write("};\n")
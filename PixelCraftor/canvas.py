@@ -1,27 +1,64 @@
-from PySide6.QtWidgets import QWidget, QApplication, QInputDialog, QFontDialog
+from PySide6.QtWidgets import QApplication, QInputDialog, QFontDialog, QScrollArea
 from PySide6.QtGui import (QPainter, QPen, QColor, QPixmap, QImage, 
-                          QCursor, QPainterPath, QBrush, QFont, QFontMetrics,
-                          QTransform)
-from PySide6.QtCore import Qt, QPoint, QRect, QSize, Signal, Slot
+                          QCursor, QPainterPath, QBrush, QFont,
+                          QTransform, QRegion)
+from PySide6.QtCore import Qt, QPoint, QPointF, QRect, QRectF, QLineF, QSize, QSizeF, Signal, Slot, QEvent
+import math
 import os
-from PIL import Image
-class PixelCanvas(QWidget):
+import time
+import numpy as np
+from bitmap_font import bitmap_font
+from color_histogram import ColorHistogram
+from hud import HudOverlay, PerfCounters
+import parallel_ops
+from image_store import image_store
+from pixel_buffer import (DOCUMENT_FORMAT, array_to_image, image_to_array, read_array, pack_color, unpack_color,
+                          WHITE, TRANSPARENT)
+from resources import transparency_brush
+from image_io import read_image, write_image, write_scaled_image
+from rasterizer import clip_points, line_points, rectangle_points, symmetry_copies
+from quantize import nearest_indices, quantize_image, remap_image
+from tile_history import TileHistory
+from selection import (combine_selections, flood_fill_mask, mask_array, mask_slices,
+                       polygon_mask, selection_from_array, selection_to_array)
+from viewport import CanvasBase, DocumentRenderer, MIN_SCALE, MAX_SCALE
+INPUT_EVENTS = {QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.MouseButtonRelease,
+                QEvent.KeyPress, QEvent.KeyRelease, QEvent.Wheel}
+TILE_COPIES = 3
+UNWRAPPED_TOOLS = ("pen", "eraser", "line", "rectangle", "offset")
+SYMMETRY_TOOLS = ("pen", "eraser", "line", "rectangle", "fill")
+class PixelCanvas(CanvasBase):
     canvas_changed = Signal()  
     position_changed = Signal(int, int)  
-    def __init__(self, width=128, height=64, parent=None):
+    tool_changed = Signal(str)
+    color_changed = Signal(QColor)
+    pixel_picked = Signal(object)
+    def __init__(self, width=128, height=64, parent=None, renderer=None):
         super().__init__(parent)
         self.width = width
         self.height = height
         self.scale = 8
         self.current_color = QColor(0, 0, 0)
         self.current_tool = "pen"
-        self.image = QImage(self.width, self.height, QImage.Format_ARGB32)
+        self.color_pixel = pack_color(self.current_color)
+        self.background_pixel = WHITE
+        self.layered = False
+        self.image = QImage(self.width, self.height, DOCUMENT_FORMAT)
         self.image.fill(Qt.white)
+        self.store = image_store()
+        self.histogram = ColorHistogram()
         self.undo_buffer = []
         self.redo_buffer = []
+        self.clipboard_key = None
         self.selection = None
         self.selection_start = None
         self.selection_image = None
+        self.selection_mask = None
+        self.selection_mode = "replace"
+        self.base_selection = None
+        self.lasso_points = []
+        self.floating_selection = False
+        self.float_origin = None
         self.drawing = False
         self.last_pos = None
         self.eraser_mode = False
@@ -44,39 +81,143 @@ class PixelCanvas(QWidget):
         self.floating_text = None
         self.floating_text_pos = None
         self.is_dragging_text = False
+        self.text_pixmap = None
+        self.text_cache_key = None
+        self.text_cache_offset = 0
+        self.renderer = renderer or DocumentRenderer()
+        self.counters = PerfCounters()
+        self.mapped = None
+        self.tile_history = None
+        self.read_only = False
+        self.tiled = False
+        self.symmetry = "none"
+        self.symmetry_folds = 4
+        self.symmetry_color = QColor(215, 60, 120)
+        self.offset_source = None
+        self.hud = None
+        self.history_manager = None
+        self.layer_manager = None
         self.setFocusPolicy(Qt.StrongFocus)
         self.setMouseTracking(True)
         self.update_size()
+    def tile_copies(self):
+        return TILE_COPIES if self.tiled else 1
     def update_size(self):
         ruler_offset = self.ruler_size if self.show_rulers else 0
-        width = self.width * self.scale + ruler_offset
-        height = self.height * self.scale + ruler_offset
+        width = round(self.width * self.tile_copies() * self.scale) + ruler_offset
+        height = round(self.height * self.tile_copies() * self.scale) + ruler_offset
         self.setMinimumSize(width, height)
         self.setMaximumSize(width, height)
         self.update()
     def resize_canvas(self, width, height):
+        self.commit_selection()
         self.save_state()
-        old_image = self.image.copy()
         self.width = width
         self.height = height
-        self.image = QImage(width, height, QImage.Format_ARGB32)
-        self.image.fill(Qt.white)
-        painter = QPainter(self.image)
-        painter.drawImage(0, 0, old_image)
-        painter.end()
+        self.remap_pixels(parallel_ops.copy_region, self.pixel_for_color(QColor(Qt.white)), size=QSize(width, height))
         self.update_size()
         self.canvas_changed.emit()
     def set_scale(self, scale):
-        self.scale = max(1, min(32, scale))
+        self.scale = max(MIN_SCALE, min(MAX_SCALE, scale))
         self.update_size()
     def zoom_in(self):
-        self.set_scale(self.scale + 1)
+        self.set_scale(math.floor(self.scale) + 1)
     def zoom_out(self):
-        self.set_scale(self.scale - 1)
+        self.set_scale(math.ceil(self.scale) - 1)
+    def scroll_area(self):
+        viewport = self.parentWidget()
+        if viewport and isinstance(viewport.parentWidget(), QScrollArea):
+            return viewport.parentWidget()
+        return None
+    def zoom_at(self, position, factor):
+        ruler_offset = self.ruler_size if self.show_rulers else 0
+        old_scale = self.scale
+        self.set_scale(self.scale * factor)
+        scroll_area = self.scroll_area()
+        if scroll_area and self.scale != old_scale:
+            ratio = self.scale / old_scale
+            dx = (position.x() - ruler_offset) * (ratio - 1)
+            dy = (position.y() - ruler_offset) * (ratio - 1)
+            scroll_area.horizontalScrollBar().setValue(round(scroll_area.horizontalScrollBar().value() + dx))
+            scroll_area.verticalScrollBar().setValue(round(scroll_area.verticalScrollBar().value() + dy))
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            self.zoom_at(event.position(), 2 ** (event.angleDelta().y() / 480))
+            event.accept()
+            return
+        super().wheelEvent(event)
     def set_color(self, color):
         self.current_color = color
+        self.color_pixel = self.pixel_for_color(color)
+        self.color_changed.emit(color)
+    def set_layered(self, layered):
+        self.layered = layered
+        self.refresh_pixels()
+        self.update()
+    def refresh_pixels(self):
+        self.color_pixel = self.pixel_for_color(self.current_color)
+        self.background_pixel = self.pixel_for_color(QColor(Qt.transparent) if self.layered else QColor(Qt.white))
+    def is_indexed(self):
+        return self.image.format() == QImage.Format_Indexed8
+    def palette(self):
+        return self.image.colorTable() if self.is_indexed() else []
+    def pixel_for_color(self, color):
+        if self.is_indexed():
+            return int(nearest_indices(np.array([QColor(color).rgba()], dtype=np.uint32), self.palette())[0])
+        return pack_color(color)
+    def color_for_pixel(self, value):
+        if self.is_indexed():
+            return QColor.fromRgba(self.palette()[int(value)])
+        return unpack_color(value)
+    def conform_image(self, image, palette=None):
+        if palette:
+            return remap_image(image, palette)
+        if image.format() != DOCUMENT_FORMAT:
+            return image.convertToFormat(DOCUMENT_FORMAT)
+        return image
+    def paintable_image(self):
+        if self.is_indexed():
+            return self.image.convertToFormat(DOCUMENT_FORMAT)
+        return self.image
+    def store_painted_image(self, image, rect=None):
+        self.image = self.conform_image(image, self.palette())
+        self.mark_pixels(rect)
+    def convert_to_indexed(self, colors=16, method="median_cut"):
+        self.commit_selection()
+        self.save_state()
+        self.image = quantize_image(self.image, colors, method)
+        self.mark_pixels()
+        self.refresh_pixels()
+        self.update()
+        self.canvas_changed.emit()
+        print(f"Холст переведен в индексированный режим: {len(self.palette())} цветов")
+    def convert_to_rgb(self):
+        if not self.is_indexed():
+            return
+        self.commit_selection()
+        self.save_state()
+        self.image = self.image.convertToFormat(DOCUMENT_FORMAT)
+        self.mark_pixels()
+        self.refresh_pixels()
+        self.update()
+        self.canvas_changed.emit()
+    def set_palette(self, palette, save=True):
+        if not self.is_indexed():
+            return
+        if save:
+            self.save_state()
+        self.image.setColorTable(palette)
+        self.renderer.mark_texture(self)
+        self.refresh_pixels()
+        self.update()
+        if save:
+            self.canvas_changed.emit()
+    def active_pixel(self):
+        return self.background_pixel if self.eraser_mode else self.color_pixel
     def set_tool(self, tool):
         print(f"Canvas: установлен инструмент {tool}")
+        if tool != "select":
+            self.commit_selection()
         self.current_tool = tool
         if tool != "text":
             self.floating_text = None
@@ -84,6 +225,52 @@ class PixelCanvas(QWidget):
             self.is_dragging_text = False
             self.update()
         self.eraser_mode = (tool == "eraser")
+        self.color_pixel = self.pixel_for_color(self.current_color)
+        self.tool_changed.emit(tool)
+    def set_tiled(self, tiled):
+        if tiled == self.tiled:
+            return
+        self.commit_selection()
+        self.tiled = tiled
+        self.update_size()
+    def in_view(self, x, y):
+        copies = self.tile_copies()
+        return 0 <= x < self.width * copies and 0 <= y < self.height * copies
+    def wrap_point(self, x, y):
+        if self.tiled:
+            return x % self.width, y % self.height
+        return x, y
+    def tool_position(self, x, y):
+        if self.current_tool in UNWRAPPED_TOOLS:
+            return x, y
+        return self.wrap_point(x, y)
+    def pixel_region(self, rect):
+        if not self.tiled:
+            return QRegion(self.canvas_to_widget_rect(rect))
+        region = QRegion()
+        for row in range(TILE_COPIES):
+            for column in range(TILE_COPIES):
+                region += self.canvas_to_widget_rect(rect.translated(column * self.width, row * self.height))
+        return region
+    def mark_pixels(self, rect=None):
+        self.histogram.mark(rect)
+        self.renderer.mark_texture(self, rect)
+        if self.tile_history:
+            self.tile_history.mark(rect)
+    def update_pixels(self, rect):
+        self.update(self.pixel_region(rect))
+    def set_symmetry(self, mode, folds=4):
+        self.symmetry = mode
+        self.symmetry_folds = max(2, folds)
+        self.update()
+    def symmetry_axes(self):
+        axis_x = next((position for orientation, position in self.guides if orientation == 'vertical'), None)
+        axis_y = next((position for orientation, position in self.guides if orientation == 'horizontal'), None)
+        return (self.width if axis_x is None else 2 * axis_x), (self.height if axis_y is None else 2 * axis_y)
+    def symmetric_points(self, xs, ys, filled=False):
+        if self.symmetry == "none" or self.current_tool not in SYMMETRY_TOOLS:
+            return [(xs, ys)]
+        return symmetry_copies(xs, ys, self.symmetry, *self.symmetry_axes(), self.symmetry_folds, filled)
     def set_grid_visible(self, visible):
         self.show_grid = visible
         self.update()
@@ -97,121 +284,258 @@ class PixelCanvas(QWidget):
         self.grid_style = style
         self.update()
     def clear(self):
+        self.drop_floating_selection()
         self.save_state()
-        self.image.fill(Qt.white)
+        self.image.fill(self.pixel_for_color(QColor(Qt.white)))
+        self.mark_pixels()
         self.update()
         self.canvas_changed.emit()
+    def mapped_history(self):
+        if self.tile_history and self.tile_history.shape != (self.height, self.width):
+            print("Холст: размер изменен, документ больше не отображается из файла")
+            self.mapped = None
+            self.tile_history = None
+        return self.tile_history
     def save_state(self):
-        self.undo_buffer.append(self.image.copy())
-        self.redo_buffer.clear()
+        if self.read_only:
+            return
+        if self.mapped_history():
+            self.tile_history.checkpoint(read_array(self.image))
+            return
+        self.undo_buffer.append(self.store.put(self.image))
+        self.release_buffer(self.redo_buffer)
+        self.counters.record_snapshot(self.store.size(self.undo_buffer[-1]))
+    def release_buffer(self, buffer):
+        for key in buffer:
+            self.store.release(key)
+        buffer.clear()
+    def history_keys(self):
+        return self.undo_buffer + self.redo_buffer + ([self.clipboard_key] if self.clipboard_key else [])
+    def release_history(self):
+        self.release_buffer(self.undo_buffer)
+        self.release_buffer(self.redo_buffer)
+        if self.clipboard_key:
+            self.store.release(self.clipboard_key)
+            self.clipboard_key = None
+    def restore_tiles(self, restore):
+        rect = restore(image_to_array(self.image))
+        if rect is None:
+            return False
+        self.histogram.mark(rect)
+        self.renderer.mark_texture(self, rect)
+        self.update_pixels(rect)
+        self.canvas_changed.emit()
+        return True
     def undo(self):
+        if self.cancel_floating_selection():
+            return True
+        if self.mapped_history():
+            return self.restore_tiles(self.tile_history.undo)
         if self.undo_buffer:
-            self.redo_buffer.append(self.image.copy())
-            self.image = self.undo_buffer.pop()
+            self.redo_buffer.append(self.store.put(self.image))
+            key = self.undo_buffer.pop()
+            self.image = self.store.image(key)
+            self.store.release(key)
+            self.mark_pixels()
+            self.refresh_pixels()
             self.update()
             self.canvas_changed.emit()
     def redo(self):
+        if self.mapped_history():
+            return self.restore_tiles(self.tile_history.redo)
         if self.redo_buffer:
-            self.undo_buffer.append(self.image.copy())
-            self.image = self.redo_buffer.pop()
+            self.undo_buffer.append(self.store.put(self.image))
+            key = self.redo_buffer.pop()
+            self.image = self.store.image(key)
+            self.store.release(key)
+            self.mark_pixels()
+            self.refresh_pixels()
             self.update()
             self.canvas_changed.emit()
+    def event(self, event):
+        if event.type() in INPUT_EVENTS:
+            self.counters.record_event()
+        return super().event(event)
     def paintEvent(self, event):
+        start = time.perf_counter()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
         ruler_offset = self.ruler_size if self.show_rulers else 0
-        painter.drawImage(
-            QRect(ruler_offset, ruler_offset, 
-                  self.width * self.scale, 
-                  self.height * self.scale), 
-            self.image
-        )
-        if self.show_grid and self.scale >= 4:
-            painter.setPen(QPen(self.grid_color, 1, self.grid_style))
-            for x in range(0, self.width + 1, self.grid_size):
-                painter.drawLine(
-                    x * self.scale + ruler_offset, ruler_offset, 
-                    x * self.scale + ruler_offset, self.height * self.scale + ruler_offset
-                )
-            for y in range(0, self.height + 1, self.grid_size):
-                painter.drawLine(
-                    ruler_offset, y * self.scale + ruler_offset, 
-                    self.width * self.scale + ruler_offset, y * self.scale + ruler_offset
-                )
+        exposed = event.rect()
+        if self.isVisible():
+            exposed = exposed.intersected(self.visibleRegion().boundingRect())
+        copies = self.tile_copies()
+        bounds = QRect(0, 0, self.width * copies, self.height * copies)
+        visible = self.renderer.visible_document_rect(bounds, self.scale, ruler_offset, exposed)
+        if self.layered:
+            painter.fillRect(self.canvas_to_widget_rect(visible), transparency_brush())
+        if self.tiled:
+            self.renderer.draw_tiled(painter, self.image, self.scale, ruler_offset, copies, self)
+        else:
+            self.renderer.draw(painter, self.image, self.scale, ruler_offset, exposed, self)
+        painter.save()
+        painter.translate(ruler_offset, ruler_offset)
+        painter.scale(self.scale, self.scale)
+        if self.floating_selection and self.selection_image:
+            painter.drawImage(
+                QRectF(self.selection),
+                self.selection_image,
+                QRectF(QPointF(0, 0), QSizeF(self.selection.size()))
+            )
+        if self.show_grid and self.scale >= 4 and not visible.isEmpty():
+            painter.setPen(QPen(self.grid_color, 0, self.grid_style))
+            top = visible.top()
+            bottom = visible.bottom() + 1
+            left = visible.left()
+            right = visible.right() + 1
+            for x in range(left - left % self.grid_size, right + 1, self.grid_size):
+                painter.drawLine(QLineF(x, top, x, bottom))
+            for y in range(top - top % self.grid_size, bottom + 1, self.grid_size):
+                painter.drawLine(QLineF(left, y, right, y))
+        painter.restore()
         if self.show_rulers:
-            self.draw_rulers(painter, ruler_offset)
-        self.draw_guides(painter, ruler_offset)
+            self.draw_rulers(painter, ruler_offset, exposed)
+        painter.translate(ruler_offset, ruler_offset)
+        painter.scale(self.scale, self.scale)
+        self.draw_guides(painter)
+        self.draw_symmetry_axes(painter)
+        painter.setPen(QPen(QColor(0, 120, 215), 0, Qt.DashLine))
+        if self.base_selection:
+            self.draw_selection_outline(painter, self.base_selection[0], self.base_selection[1])
         if self.selection:
-            painter.setPen(QPen(QColor(0, 120, 215), 1, Qt.DashLine))
-            painter.drawRect(
-                self.selection.x() * self.scale + ruler_offset,
-                self.selection.y() * self.scale + ruler_offset,
-                self.selection.width() * self.scale,
-                self.selection.height() * self.scale
-            )
+            self.draw_selection_outline(painter, self.selection, self.selection_mask)
+        if self.lasso_points:
+            painter.drawPolyline([QPointF(p.x() + 0.5, p.y() + 0.5) for p in self.lasso_points])
         if self.current_tool == "line" and self.line_start and self.last_pos:
-            painter.setPen(QPen(self.current_color, 1, Qt.SolidLine))
-            painter.drawLine(
-                self.line_start.x() * self.scale + self.scale // 2 + ruler_offset,
-                self.line_start.y() * self.scale + self.scale // 2 + ruler_offset,
-                self.last_pos.x() * self.scale + self.scale // 2 + ruler_offset,
-                self.last_pos.y() * self.scale + self.scale // 2 + ruler_offset
-            )
+            painter.setPen(QPen(self.current_color, 0, Qt.SolidLine))
+            painter.drawLine(QLineF(
+                self.line_start.x() + 0.5, self.line_start.y() + 0.5,
+                self.last_pos.x() + 0.5, self.last_pos.y() + 0.5
+            ))
+        painter.resetTransform()
         if self.floating_text and self.floating_text_pos:
-            temp_image = QImage(
-                self.width * self.scale + ruler_offset, 
-                self.height * self.scale + ruler_offset, 
-                QImage.Format_ARGB32
-            )
-            temp_image.fill(Qt.transparent)
-            text_painter = QPainter(temp_image)
-            text_painter.setPen(self.current_color)
-            try:
-                text_painter.setFont(self.text_font)
-                font_metrics = text_painter.fontMetrics()
-                text_width = font_metrics.horizontalAdvance(self.floating_text)
-                text_height = font_metrics.height()
-                text_painter.drawText(
-                    self.floating_text_pos.x() * self.scale + ruler_offset,
-                    self.floating_text_pos.y() * self.scale + font_metrics.ascent() + ruler_offset,
-                    self.floating_text
-                )
-                painter.fillRect(
-                    self.floating_text_pos.x() * self.scale - 2 + ruler_offset,
-                    self.floating_text_pos.y() * self.scale - 2 + ruler_offset,
-                    text_width + 4,
-                    text_height + 4,
-                    QColor(200, 200, 255, 128)
-                )
-            except Exception as e:
-                print(f"Ошибка при отображении текста: {e}")
-                painter.setPen(self.current_color)
-                painter.drawText(
-                    self.floating_text_pos.x() * self.scale + ruler_offset,
-                    self.floating_text_pos.y() * self.scale + 10 + ruler_offset,
-                    self.floating_text
-                )
-            finally:
-                text_painter.end()
-            painter.drawImage(0, 0, temp_image)
-    def draw_rulers(self, painter, offset):
-        ruler_rect_h = QRect(offset, 0, self.width * self.scale, offset)
-        ruler_rect_v = QRect(0, offset, offset, self.height * self.scale)
-        painter.fillRect(ruler_rect_h, self.ruler_color.lighter(120))
-        painter.fillRect(ruler_rect_v, self.ruler_color.lighter(120))
+            text_pixmap = self.floating_text_pixmap()
+            widget_rect = self.canvas_to_widget_rect(self.floating_text_rect())
+            painter.fillRect(widget_rect.adjusted(-2, -2, 2, 2), QColor(200, 200, 255, 128))
+            painter.drawPixmap(widget_rect, text_pixmap)
+        painter.end()
+        self.counters.record_frame((time.perf_counter() - start) * 1000, exposed)
+    def set_hud_visible(self, visible):
+        if visible and self.hud is None:
+            parent = self.scroll_area().viewport() if self.scroll_area() else self
+            self.hud = HudOverlay(self, parent)
+        if self.hud:
+            self.hud.start() if visible else self.hud.stop()
+    def history_memory(self):
+        keys = self.undo_buffer + self.redo_buffer
+        if self.history_manager:
+            keys += self.history_manager.keys()
+        return self.store.memory_usage(keys) + (self.tile_history.memory_usage() if self.tile_history else 0)
+    def layer_cache_memory(self):
+        usage = self.renderer.memory_usage()
+        if self.layer_manager:
+            usage += self.layer_manager.memory_usage()
+        return usage
+    def used_colors(self, limit=None):
+        if self.mapped:
+            return None
+        return self.histogram.colors(self.image, limit)
+    def used_color_count(self):
+        if self.mapped:
+            return None
+        return self.histogram.color_count(self.image)
+    def replace_color(self, value, color):
+        self.commit_selection()
+        target = self.pixel_for_color(color)
+        if target == value:
+            return 0
+        self.save_state()
+        count = parallel_ops.replace(image_to_array(self.image), value, target)
+        if not count:
+            self.store.release(self.undo_buffer.pop())
+            return 0
+        self.pixels_changed()
+        print(f"Замена цвета: {count} пикселей перекрашено в {QColor(color).name()}")
+        return count
+    def pixels_changed(self):
+        self.mark_pixels()
+        self.update()
+        self.canvas_changed.emit()
+    def remap_pixels(self, operation, *args, size=None):
+        source = self.image
+        self.image = QImage(size or source.size(), source.format())
+        if source.format() == QImage.Format_Indexed8:
+            self.image.setColorTable(source.colorTable())
+        operation(image_to_array(self.image), read_array(source), *args)
+        self.mark_pixels()
+    def remap_palette(self, operation, *args):
+        entries = np.array(self.palette(), dtype=np.uint32)
+        opaque = entries | np.uint32(0xFF000000)
+        operation(opaque[None, :], *args)
+        self.set_palette(((entries & 0xFF000000) | (opaque & 0xFFFFFF)).tolist())
+    def invert_colors(self):
+        self.commit_selection()
+        if self.is_indexed():
+            self.remap_palette(parallel_ops.invert)
+            return
+        self.save_state()
+        parallel_ops.invert(image_to_array(self.image))
+        self.pixels_changed()
+        print("Цвета инвертированы")
+    def threshold_image(self, level=128):
+        self.commit_selection()
+        if self.is_indexed():
+            self.remap_palette(parallel_ops.threshold, level)
+            return
+        self.save_state()
+        parallel_ops.threshold(image_to_array(self.image), level)
+        self.pixels_changed()
+        print(f"Порог яркости {level} применен")
+    def offset_image(self, dx, dy, wrap=True):
+        self.commit_selection()
+        self.save_state()
+        self.remap_pixels(parallel_ops.offset, dx, dy, wrap, self.background_pixel)
+        self.pixels_changed()
+        print(f"Изображение сдвинуто на ({dx}, {dy}){' с переносом' if wrap else ''}")
+    def mirror_image(self, horizontal=True):
+        self.commit_selection()
+        self.save_state()
+        self.remap_pixels(parallel_ops.mirror, horizontal)
+        self.pixels_changed()
+        print(f"Холст отражен {'по горизонтали' if horizontal else 'по вертикали'}")
+    def draw_selection_outline(self, painter, rect, mask):
+        if mask is None:
+            painter.drawRect(QRectF(rect))
+            return
+        painter.save()
+        painter.translate(rect.x(), rect.y())
+        painter.drawPath(mask.outline_path())
+        painter.restore()
+    def ruler_range(self, start, end, offset, limit):
+        first = max(0, int((start - offset) // self.scale) - 20)
+        last = min(limit, int((end - offset) // self.scale) + 20)
+        return range(first - first % 5, last + 1, 5)
+    def draw_rulers(self, painter, offset, exposed):
+        width, height = self.width * self.tile_copies(), self.height * self.tile_copies()
+        ruler_rect_h = QRect(offset, 0, round(width * self.scale), offset)
+        ruler_rect_v = QRect(0, offset, offset, round(height * self.scale))
+        painter.fillRect(ruler_rect_h.intersected(exposed), self.ruler_color.lighter(120))
+        painter.fillRect(ruler_rect_v.intersected(exposed), self.ruler_color.lighter(120))
         painter.fillRect(0, 0, offset, offset, self.ruler_color.lighter(110))  
         painter.setPen(self.ruler_text_color)
         painter.setFont(self.ruler_font)
-        for x in range(0, self.width + 1, 5):  
-            x_pos = x * self.scale + offset
+        horizontal = self.ruler_range(exposed.left(), exposed.right(), offset, width) if exposed.top() < offset else []
+        vertical = self.ruler_range(exposed.top(), exposed.bottom(), offset, height) if exposed.left() < offset else []
+        for x in horizontal:  
+            x_pos = round(x * self.scale) + offset
             if x % 10 == 0:  
                 painter.drawLine(x_pos, offset - 5, x_pos, offset - 1)
                 if x % 20 == 0:
                     painter.drawText(x_pos - 10, 2, 20, offset - 6, Qt.AlignCenter, str(x))
             else:
                 painter.drawLine(x_pos, offset - 3, x_pos, offset - 1)
-        for y in range(0, self.height + 1, 5):  
-            y_pos = y * self.scale + offset
+        for y in vertical:  
+            y_pos = round(y * self.scale) + offset
             if y % 10 == 0:  
                 painter.drawLine(offset - 5, y_pos, offset - 1, y_pos)
                 if y % 20 == 0:
@@ -222,17 +546,24 @@ class PixelCanvas(QWidget):
                     painter.restore()
             else:
                 painter.drawLine(offset - 3, y_pos, offset - 1, y_pos)
-    def draw_guides(self, painter, offset):
+    def draw_guides(self, painter):
         if not self.guides:
             return
-        painter.setPen(QPen(self.guide_color, 1, Qt.DashLine))
+        painter.setPen(QPen(self.guide_color, 0, Qt.DashLine))
         for i, (orientation, position) in enumerate(self.guides):
             if orientation == 'horizontal':
-                y = position * self.scale + offset
-                painter.drawLine(offset, y, self.width * self.scale + offset, y)
+                painter.drawLine(QLineF(0, position, self.width, position))
             elif orientation == 'vertical':
-                x = position * self.scale + offset
-                painter.drawLine(x, offset, x, self.height * self.scale + offset)
+                painter.drawLine(QLineF(position, 0, position, self.height))
+    def draw_symmetry_axes(self, painter):
+        if self.symmetry == "none":
+            return
+        axis_x2, axis_y2 = self.symmetry_axes()
+        painter.setPen(QPen(self.symmetry_color, 0, Qt.DotLine))
+        if self.symmetry in ("horizontal", "both", "radial"):
+            painter.drawLine(QLineF(axis_x2 / 2, 0, axis_x2 / 2, self.height))
+        if self.symmetry in ("vertical", "both", "radial"):
+            painter.drawLine(QLineF(0, axis_y2 / 2, self.width, axis_y2 / 2))
     def mousePressEvent(self, event):
         ruler_offset = self.ruler_size if self.show_rulers else 0
         if self.show_rulers:
@@ -271,38 +602,21 @@ class PixelCanvas(QWidget):
                         return
         x = int((event.position().x() - ruler_offset) / self.scale)
         y = int((event.position().y() - ruler_offset) / self.scale)
-        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+        if not self.in_view(x, y):
             return
+        x, y = self.tool_position(x, y)
         if self.floating_text:
             if event.button() == Qt.LeftButton:
-                try:
-                    font_metrics = QFontMetrics(self.text_font)
-                    text_width = font_metrics.horizontalAdvance(self.floating_text)
-                    text_height = font_metrics.height()
-                    text_rect = QRect(
-                        self.floating_text_pos.x(),
-                        self.floating_text_pos.y(),
-                        text_width // self.scale + 1,
-                        text_height // self.scale + 1
-                    )
-                    if text_rect.contains(x, y):
-                        self.is_dragging_text = True
-                        self.last_pos = QPoint(x, y)
-                        print("Начато перетаскивание текста")
-                    else:
-                        self.save_state()
-                        self.draw_text_at_position(self.floating_text_pos.x(), self.floating_text_pos.y(), self.floating_text)
-                        self.floating_text = None
-                        self.floating_text_pos = None
-                        self.is_dragging_text = False
-                        print("Текст зафиксирован при повторном нажатии мыши")
-                except Exception as e:
-                    print(f"Ошибка при обработке текста: {e}")
-                    self.save_state()
+                if self.floating_text_rect().contains(x, y):
+                    self.is_dragging_text = True
+                    self.last_pos = QPoint(x, y)
+                    print("Начато перетаскивание текста")
+                else:
                     self.draw_text_at_position(self.floating_text_pos.x(), self.floating_text_pos.y(), self.floating_text)
                     self.floating_text = None
                     self.floating_text_pos = None
                     self.is_dragging_text = False
+                    print("Текст зафиксирован при повторном нажатии мыши")
             elif event.button() == Qt.RightButton:
                 self.floating_text = None
                 self.floating_text_pos = None
@@ -310,7 +624,10 @@ class PixelCanvas(QWidget):
                 print("Ввод текста отменен")
             self.update()
             return
-        self.save_state()
+        if self.floating_selection and not (self.current_tool == "select" and self.selection_contains(x, y)):
+            self.commit_selection()
+        if self.current_tool not in ("select", "lasso", "magic_wand", "eyedropper"):
+            self.save_state()
         is_right_click = event.button() == Qt.RightButton
         if is_right_click and self.current_tool != "eraser":
             self.eraser_mode = True
@@ -320,28 +637,41 @@ class PixelCanvas(QWidget):
             self.draw_pixel(x, y)
         elif self.current_tool == "rectangle":
             self.drawing = True
+            self.begin_selection("replace")
             self.selection_start = QPoint(x, y)
             self.selection = QRect(x, y, 1, 1)
         elif self.current_tool == "select":
             self.drawing = True
-            if self.selection and self.selection.contains(x, y):
+            mode = self.selection_mode_from_modifiers(event.modifiers())
+            if mode == "replace" and self.selection_contains(x, y):
                 print("Начало перемещения выделения")
                 self.last_pos = QPoint(x, y)
-                if not self.selection_image:
-                    self.selection_image = self.image.copy(self.selection)
+                self.selection_start = None
+                self.lift_selection()
             else:
                 print("Начало нового выделения")
+                self.begin_selection(mode)
                 self.selection_start = QPoint(x, y)
                 self.selection = QRect(x, y, 1, 1)
-                self.selection_image = None
+        elif self.current_tool == "lasso":
+            self.drawing = True
+            self.begin_selection(self.selection_mode_from_modifiers(event.modifiers()))
+            self.lasso_points = [QPoint(x, y)]
+        elif self.current_tool == "magic_wand":
+            self.begin_selection(self.selection_mode_from_modifiers(event.modifiers()))
+            rect, mask = selection_from_array(flood_fill_mask(read_array(self.image), x, y))
+            self.apply_selection(rect, mask)
+            print(f"Волшебная палочка: выделено {self.selection}")
         elif self.current_tool == "fill":
             self.fill(x, y)
         elif self.current_tool == "eyedropper":
             if 0 <= x < self.width and 0 <= y < self.height:
                 try:
-                    color = self.image.pixelColor(x, y)
+                    value = int(read_array(self.image)[y, x])
+                    color = self.color_for_pixel(value)
                     print(f"Пипетка: получен цвет {color.name()} в точке ({x}, {y})")
-                    self.current_color = color
+                    self.set_color(color)
+                    self.pixel_picked.emit(value)
                     main_window = self.window()
                     if main_window and hasattr(main_window, "tool_panel"):
                         main_window.tool_panel.color_palette.set_current_color(color)
@@ -352,6 +682,11 @@ class PixelCanvas(QWidget):
             self.drawing = True
             self.line_start = QPoint(x, y)
             self.last_pos = QPoint(x, y)
+        elif self.current_tool == "offset":
+            self.drawing = True
+            self.selection_start = QPoint(x, y)
+            self.offset_source = self.image
+            self.remap_pixels(parallel_ops.offset, 0, 0, True, self.background_pixel)
         elif self.current_tool == "text":
             if not self.floating_text:
                 try:
@@ -377,30 +712,22 @@ class PixelCanvas(QWidget):
                 self.guides[self.active_guide_index] = ('vertical', x)
             self.update()
             return
-        self.position_changed.emit(x, y)
-        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+        self.position_changed.emit(*self.wrap_point(x, y))
+        if not self.in_view(x, y):
             return
+        x, y = self.tool_position(x, y)
         if self.is_dragging_text and self.floating_text and self.last_pos:
             dx = x - self.last_pos.x()
             dy = y - self.last_pos.y()
             if dx != 0 or dy != 0:
-                try:
-                    font_metrics = QFontMetrics(self.text_font)
-                    text_width = font_metrics.horizontalAdvance(self.floating_text) // self.scale
-                    text_height = font_metrics.height() // self.scale
-                    new_x = max(0, min(self.width - text_width, self.floating_text_pos.x() + dx))
-                    new_y = max(0, min(self.height - text_height, self.floating_text_pos.y() + dy))
-                    self.floating_text_pos = QPoint(new_x, new_y)
-                    self.last_pos = QPoint(x, y)
-                except Exception as e:
-                    print(f"Ошибка при перемещении текста: {e}")
-                    self.floating_text_pos = QPoint(x, y)
-                    self.last_pos = QPoint(x, y)
-                self.update()
+                text_rect = self.floating_text_rect()
+                new_x = max(0, min(self.width - text_rect.width(), self.floating_text_pos.x() + dx))
+                new_y = max(0, min(self.height - text_rect.height(), self.floating_text_pos.y() + dy))
+                self.move_floating_text(QPoint(new_x, new_y))
+                self.last_pos = QPoint(x, y)
             return
         if self.floating_text and not self.is_dragging_text:
-            self.floating_text_pos = QPoint(x, y)
-            self.update()
+            self.move_floating_text(QPoint(x, y))
             return
         modifiers = QApplication.keyboardModifiers()
         temp_eraser_mode = modifiers & Qt.AltModifier
@@ -438,15 +765,22 @@ class PixelCanvas(QWidget):
                 dx = x - self.last_pos.x()
                 dy = y - self.last_pos.y()
                 if dx != 0 or dy != 0:
-                    new_left = max(0, min(self.width - self.selection.width(), self.selection.left() + dx))
-                    new_top = max(0, min(self.height - self.selection.height(), self.selection.top() + dy))
-                    self.selection.moveTopLeft(QPoint(new_left, new_top))
+                    self.offset_floating_selection(dx, dy)
                     self.last_pos = QPoint(x, y)
-                    print(f"Перемещение выделения на ({dx}, {dy})")
+                return
             self.update()
+        elif self.drawing and self.current_tool == "lasso":
+            if self.lasso_points and self.lasso_points[-1] != QPoint(x, y):
+                self.lasso_points.append(QPoint(x, y))
+                self.update()
         elif self.drawing and self.current_tool == "line":
             self.last_pos = QPoint(x, y)
             self.update()
+        elif self.drawing and self.current_tool == "offset" and self.offset_source is not None:
+            parallel_ops.offset(image_to_array(self.image), read_array(self.offset_source),
+                                x - self.selection_start.x(), y - self.selection_start.y(), True)
+            self.mark_pixels()
+            self.update()
     def mouseReleaseEvent(self, event):
         if self.creating_guide:
             self.creating_guide = False
@@ -461,6 +795,7 @@ class PixelCanvas(QWidget):
         ruler_offset = self.ruler_size if self.show_rulers else 0
         x = int((event.position().x() - ruler_offset) / self.scale)
         y = int((event.position().y() - ruler_offset) / self.scale)
+        x, y = self.tool_position(x, y)
         if self.current_tool == "rectangle" and self.selection:
             if event.modifiers() & Qt.ShiftModifier:
                 size = max(self.selection.width(), self.selection.height())
@@ -468,23 +803,32 @@ class PixelCanvas(QWidget):
             self.draw_rectangle(self.selection)
             self.selection = None
         elif self.current_tool == "select" and self.selection:
-            if self.selection.width() <= 1 and self.selection.height() <= 1:
-                self.selection = None
-                self.selection_image = None
+            if not self.floating_selection and self.selection.width() <= 1 and self.selection.height() <= 1:
+                self.apply_selection(None, None)
                 print("Выделение отменено (слишком маленькое)")
+            elif self.selection_start:
+                self.apply_selection(self.selection, None)
+                print(f"Выделение завершено: {self.selection}")
+        elif self.current_tool == "lasso" and self.lasso_points:
+            if len(self.lasso_points) >= 3:
+                rect, mask = polygon_mask(self.lasso_points, self.width, self.height)
+                self.apply_selection(rect, mask)
             else:
-                if self.selection_start:
-                    self.selection_image = self.image.copy(self.selection)
-                    self.selection_start = None
-                    print(f"Выделение завершено: {self.selection}")
+                self.apply_selection(None, None)
+            self.lasso_points = []
+            print(f"Лассо: выделено {self.selection}")
         elif self.current_tool == "line" and self.line_start:
             self.draw_line_tool(self.line_start.x(), self.line_start.y(), x, y)
             self.line_start = None
+        elif self.current_tool == "offset":
+            self.offset_source = None
+            self.selection_start = None
         if event.button() == Qt.RightButton and self.current_tool != "eraser":
             self.eraser_mode = False
         self.drawing = False
         self.last_pos = None
-        self.canvas_changed.emit()
+        if not self.floating_selection:
+            self.canvas_changed.emit()
         self.update()
     def keyPressEvent(self, event):
         key = event.key()
@@ -496,7 +840,6 @@ class PixelCanvas(QWidget):
                 self.update()
                 return
             elif key == Qt.Key_Return or key == Qt.Key_Enter:
-                self.save_state()
                 self.draw_text_at_position(self.floating_text_pos.x(), self.floating_text_pos.y(), self.floating_text)
                 self.floating_text = None
                 self.floating_text_pos = None
@@ -554,61 +897,51 @@ class PixelCanvas(QWidget):
             self.eraser_mode = False
             self.update()
         event.accept()
+    def plot(self, xs, ys, mask=None, filled=False):
+        pixels = image_to_array(self.image)
+        dirty = QRect()
+        region = QRegion()
+        for copy_xs, copy_ys in self.symmetric_points(xs, ys, filled):
+            if self.tiled:
+                copy_xs, copy_ys = copy_xs % self.width, copy_ys % self.height
+            copy_xs, copy_ys = clip_points(copy_xs, copy_ys, self.width, self.height)
+            if mask is not None:
+                inside = mask[copy_ys, copy_xs]
+                copy_xs, copy_ys = copy_xs[inside], copy_ys[inside]
+            if not len(copy_xs):
+                continue
+            pixels[copy_ys, copy_xs] = self.active_pixel()
+            left, top = int(copy_xs.min()), int(copy_ys.min())
+            rect = QRect(left, top, int(copy_xs.max()) - left + 1, int(copy_ys.max()) - top + 1)
+            self.mark_pixels(rect)
+            region += self.pixel_region(rect)
+            dirty = dirty.united(rect)
+        if dirty.isEmpty():
+            return None
+        self.update(region)
+        return dirty
     def draw_pixel(self, x, y):
-        if x < 0 or x >= self.width or y < 0 or y >= self.height:
-            return
-        color = Qt.white if self.eraser_mode else self.current_color
-        self.image.setPixelColor(x, y, color)
-        self.update()
+        self.plot(np.array([x]), np.array([y]))
     def draw_line(self, x1, y1, x2, y2):
-        color = Qt.white if self.eraser_mode else self.current_color
-        dx = abs(x2 - x1)
-        dy = abs(y2 - y1)
-        sx = 1 if x1 < x2 else -1
-        sy = 1 if y1 < y2 else -1
-        err = dx - dy
-        while True:
-            if x1 >= 0 and x1 < self.width and y1 >= 0 and y1 < self.height:
-                self.image.setPixelColor(x1, y1, color)
-            if x1 == x2 and y1 == y2:
-                break
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x1 += sx
-            if e2 < dx:
-                err += dx
-                y1 += sy
-        self.update()
+        self.plot(*line_points(x1, y1, x2, y2))
     def draw_rectangle(self, rect):
-        color = Qt.white if self.eraser_mode else self.current_color
-        x1 = max(0, rect.left())
-        y1 = max(0, rect.top())
-        x2 = min(self.width - 1, rect.right())
-        y2 = min(self.height - 1, rect.bottom())
-        for x in range(x1, x2 + 1):
-            self.image.setPixelColor(x, y1, color)
-            self.image.setPixelColor(x, y2, color)
-        for y in range(y1 + 1, y2):
-            self.image.setPixelColor(x1, y, color)
-            self.image.setPixelColor(x2, y, color)
-        self.update()
+        self.plot(*rectangle_points(rect))
     def fill_rectangle(self, rect):
-        color = Qt.white if self.eraser_mode else self.current_color
-        x1 = max(0, rect.left())
-        y1 = max(0, rect.top())
-        x2 = min(self.width - 1, rect.right())
-        y2 = min(self.height - 1, rect.bottom())
-        for y in range(y1, y2 + 1):
-            for x in range(x1, x2 + 1):
-                self.image.setPixelColor(x, y, color)
-        self.update()
+        target, _ = mask_slices(rect, self.width, self.height)
+        image_to_array(self.image)[target] = self.active_pixel()
+        self.mark_pixels(rect)
+        self.update_pixels(rect)
     def select_all(self):
+        self.commit_selection()
         self.selection = QRect(0, 0, self.width, self.height)
+        self.selection_mask = None
         self.selection_image = self.image.copy()
         self.update()
     def reset_selection(self):
+        self.commit_selection()
         self.selection = None
+        self.selection_mask = None
+        self.base_selection = None
         self.selection_image = None
         self.selection_start = None
         self.update()
@@ -616,11 +949,18 @@ class PixelCanvas(QWidget):
     def delete_selection(self):
         if not self.selection:
             return
+        if self.floating_selection:
+            self.drop_floating_selection()
+            self.update()
+            self.canvas_changed.emit()
+            print("Выделение удалено")
+            return
         self.save_state()
-        painter = QPainter(self.image)
-        painter.fillRect(self.selection, Qt.white)
-        painter.end()
+        target, source = mask_slices(self.selection, self.width, self.height)
+        image_to_array(self.image)[target][mask_array(self.selection, self.selection_mask)[source]] = self.background_pixel
+        self.mark_pixels(self.selection)
         self.selection = None
+        self.selection_mask = None
         self.selection_image = None
         self.update()
         self.canvas_changed.emit()
@@ -628,8 +968,8 @@ class PixelCanvas(QWidget):
     def copy_selection(self):
         if not self.selection:
             return
-        if not self.selection_image:
-            self.selection_image = self.image.copy(self.selection)
+        if not self.floating_selection:
+            self.selection_image = self.copy_selection_pixels()
         clipboard = QApplication.clipboard()
         clipboard.setImage(self.selection_image)
         print("Выделение скопировано в буфер обмена")
@@ -639,142 +979,247 @@ class PixelCanvas(QWidget):
         if clipboard_image.isNull():
             print("Буфер обмена пуст или не содержит изображения")
             return
+        self.commit_selection()
         self.save_state()
         self.selection = QRect(0, 0, 
                               min(clipboard_image.width(), self.width), 
                               min(clipboard_image.height(), self.height))
-        self.selection_image = clipboard_image
+        if self.selection.size() != clipboard_image.size():
+            clipboard_image = clipboard_image.copy(self.selection)
+        key = self.store.put(clipboard_image)
+        if self.clipboard_key:
+            self.store.release(self.clipboard_key)
+        self.clipboard_key = key
+        self.selection_image = self.store.image(key)
+        self.selection_mask = None
+        self.floating_selection = True
+        self.float_origin = None
         print(f"Изображение вставлено из буфера обмена ({clipboard_image.width()}x{clipboard_image.height()})")
         self.update()
     def move_selection(self, dx, dy):
-        if not self.selection or not self.selection_image:
+        if not self.selection:
+            return
+        self.lift_selection()
+        self.offset_floating_selection(dx, dy)
+        print(f"Выделение перемещено на ({dx}, {dy})")
+    def canvas_to_widget_rect(self, rect):
+        ruler_offset = self.ruler_size if self.show_rulers else 0
+        return QRectF(
+            rect.x() * self.scale + ruler_offset,
+            rect.y() * self.scale + ruler_offset,
+            rect.width() * self.scale,
+            rect.height() * self.scale
+        ).toAlignedRect()
+    def selection_contains(self, x, y):
+        if not self.selection or not self.selection.contains(x, y):
+            return False
+        if self.selection_mask is None:
+            return True
+        return self.selection_mask.contains(x - self.selection.x(), y - self.selection.y())
+    def selection_mode_from_modifiers(self, modifiers):
+        if modifiers & Qt.ShiftModifier and modifiers & Qt.ControlModifier:
+            return "intersect"
+        if modifiers & Qt.ShiftModifier:
+            return "add"
+        if modifiers & Qt.ControlModifier:
+            return "subtract"
+        return "replace"
+    def begin_selection(self, mode):
+        self.selection_mode = mode
+        if mode != "replace" and self.selection:
+            self.base_selection = (QRect(self.selection), self.selection_mask)
+        else:
+            self.base_selection = None
+        self.selection = None
+        self.selection_mask = None
+        self.selection_image = None
+    def apply_selection(self, rect, mask):
+        if self.base_selection:
+            if rect is None:
+                rect, mask = self.base_selection
+            else:
+                rect, mask = combine_selections(self.base_selection, (rect, mask), self.selection_mode,
+                                                self.width, self.height)
+        self.base_selection = None
+        self.selection_start = None
+        self.selection = rect
+        self.selection_mask = mask
+        self.selection_image = self.copy_selection_pixels() if rect else None
+        self.update()
+    def copy_selection_pixels(self):
+        image = self.image.copy(self.selection).convertToFormat(DOCUMENT_FORMAT)
+        if self.selection_mask is not None:
+            image_to_array(image)[~self.selection_mask.to_array()] = TRANSPARENT
+        return image
+    def lift_selection(self):
+        if self.floating_selection or not self.selection:
             return
+        self.selection_image = self.copy_selection_pixels()
         self.save_state()
-        painter = QPainter(self.image)
-        painter.fillRect(self.selection, Qt.white)
+        self.float_origin = (QRect(self.selection), self.selection_image, self.selection_mask)
+        target, source = mask_slices(self.selection, self.width, self.height)
+        image_to_array(self.image)[target][mask_array(self.selection, self.selection_mask)[source]] = self.background_pixel
+        self.mark_pixels(self.selection)
+        self.floating_selection = True
+    def offset_floating_selection(self, dx, dy):
+        old_rect = QRect(self.selection)
         new_left = max(0, min(self.width - self.selection.width(), self.selection.left() + dx))
         new_top = max(0, min(self.height - self.selection.height(), self.selection.top() + dy))
         self.selection.moveTopLeft(QPoint(new_left, new_top))
-        painter.drawImage(self.selection.topLeft(), self.selection_image)
-        painter.end()
+        self.update(self.canvas_to_widget_rect(old_rect.united(self.selection)).adjusted(-1, -1, 1, 1))
+    def commit_selection(self):
+        if not self.floating_selection:
+            return
+        if self.selection_mask is not None:
+            self.write_masked(self.selection, self.selection_mask, self.selection_image)
+        else:
+            document = self.paintable_image()
+            painter = QPainter(document)
+            painter.drawImage(self.selection.topLeft(), self.selection_image,
+                              QRect(QPoint(0, 0), self.selection.size()))
+            painter.end()
+            self.store_painted_image(document, self.selection)
+        self.floating_selection = False
+        self.float_origin = None
         self.update()
         self.canvas_changed.emit()
-        print(f"Выделение перемещено на ({dx}, {dy})")
+        print("Плавающее выделение зафиксировано")
+    def cancel_floating_selection(self):
+        if not self.floating_selection:
+            return False
+        if self.float_origin:
+            rect, image, mask = self.float_origin
+            self.write_masked(rect, mask, image)
+            self.selection = QRect(rect)
+            self.selection_image = image
+            self.selection_mask = mask
+        else:
+            self.selection = None
+            self.selection_image = None
+            self.selection_mask = None
+        self.floating_selection = False
+        self.float_origin = None
+        if self.undo_buffer:
+            self.store.release(self.undo_buffer.pop())
+        self.update()
+        print("Перемещение выделения отменено")
+        return True
+    def drop_floating_selection(self):
+        if not self.floating_selection:
+            return
+        self.floating_selection = False
+        self.float_origin = None
+        self.selection = None
+        self.selection_mask = None
+        self.selection_image = None
+    def write_masked(self, rect, mask, image):
+        target, source = mask_slices(rect, self.width, self.height)
+        region = mask_array(rect, mask)[source]
+        if image.format() != self.image.format() or self.is_indexed():
+            image = self.conform_image(image, self.palette())
+        image_to_array(self.image)[target][region] = image_to_array(image)[source][region]
+        self.mark_pixels(rect)
     def get_image(self):
         return self.image
     def set_image(self, image):
-        if isinstance(image, QImage):
-            self.image = image
+        self.drop_floating_selection()
+        if not isinstance(image, QImage):
+            image = QImage(image)
+        if self.is_indexed() and image.format() != QImage.Format_Indexed8:
+            self.image = quantize_image(image, len(self.palette()))
+        elif image.format() == QImage.Format_Indexed8:
+            self.image = image.copy()
         else:
-            self.image = QImage(image)
+            self.image = self.conform_image(image)
+        self.mark_pixels()
+        self.refresh_pixels()
         self.width = self.image.width()
         self.height = self.image.height()
         self.update_size()
         self.canvas_changed.emit()
+    def set_read_only(self, read_only):
+        self.read_only = read_only
+        self.setEnabled(not read_only)
+    def show_partial_image(self, image):
+        self.set_read_only(True)
+        self.image = image
+        self.mark_pixels()
+        self.width = image.width()
+        self.height = image.height()
+        self.refresh_pixels()
+        self.update_size()
+        self.update()
+    def partial_image_updated(self):
+        self.mark_pixels()
+        self.renderer.invalidate()
+        self.update()
+    def set_mapped_image(self, mapped):
+        print(f"Холст: файл {mapped.file_path} отображен в память, история хранит только измененные тайлы")
+        self.mapped = mapped
+        self.set_image(mapped.image)
+        self.tile_history = TileHistory(mapped.original())
+    def snapshot(self):
+        self.commit_selection()
+        if self.mapped_history() and self.mapped.owns(self.image):
+            return self.mapped.snapshot(self.tile_history.modified(read_array(self.image)))
+        return QImage(self.image)
+    def replace_image(self, image):
+        self.commit_selection()
+        self.save_state()
+        self.image = self.conform_image(image, self.palette())
+        self.mark_pixels()
+        self.update()
+        self.canvas_changed.emit()
     def load_image(self, file_path):
         if not os.path.exists(file_path):
             return False
         try:
-            pil_image = Image.open(file_path)
-            if pil_image.mode != "RGBA":
-                pil_image = pil_image.convert("RGBA")
-            img_data = pil_image.tobytes("raw", "RGBA")
-            qimage = QImage(img_data, pil_image.width, pil_image.height, QImage.Format_RGBA8888)
-            self.set_image(qimage)
+            self.set_image(read_image(file_path))
             return True
         except Exception as e:
             print(f"Ошибка загрузки изображения: {e}")
             return False
     def save_image(self, file_path):
-        file_ext = os.path.splitext(file_path)[1].lower()
-        if file_ext in ['.png', '.jpg', '.jpeg', '.bmp', '.webp']:
-            return self.image.save(file_path)
-        elif file_ext in ['.pbm', '.tga', '.ico']:
-            try:
-                buffer = self.image.bits().asstring(self.image.byteCount())
-                pil_image = Image.frombuffer(
-                    "RGBA", 
-                    (self.image.width(), self.image.height()), 
-                    buffer, 
-                    'raw', 
-                    'BGRA', 
-                    0, 
-                    1
-                )
-                pil_image.save(file_path)
-                return True
-            except Exception as e:
-                print(f"Ошибка сохранения изображения: {e}")
-                return False
-        else:
-            return self.image.save(file_path)
+        self.commit_selection()
+        try:
+            write_image(self.image, file_path)
+            return True
+        except Exception as e:
+            print(f"Ошибка сохранения изображения: {e}")
+            return False
     def export_image(self, file_path, scale=1):
-        if scale <= 0:
-            scale = 1
-        scaled_width = self.width * scale
-        scaled_height = self.height * scale
-        scaled_image = QImage(scaled_width, scaled_height, QImage.Format_ARGB32)
-        scaled_image.fill(Qt.white)
-        painter = QPainter(scaled_image)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
-        for y in range(self.height):
-            for x in range(self.width):
-                color = self.image.pixelColor(x, y)
-                if color != Qt.white:  
-                    painter.fillRect(x * scale, y * scale, scale, scale, color)
-        painter.end()
-        return self.save_image_with_format(scaled_image, file_path)
-    def save_image_with_format(self, image, file_path):
-        file_ext = os.path.splitext(file_path)[1].lower()
-        if file_ext in ['.png', '.jpg', '.jpeg', '.bmp', '.webp']:
-            return image.save(file_path)
-        elif file_ext in ['.pbm', '.tga', '.ico']:
-            try:
-                buffer = image.bits().asstring(image.byteCount())
-                pil_image = Image.frombuffer(
-                    "RGBA", 
-                    (image.width(), image.height()), 
-                    buffer, 
-                    'raw', 
-                    'BGRA', 
-                    0, 
-                    1
-                )
-                pil_image.save(file_path)
-                return True
-            except Exception as e:
-                print(f"Ошибка сохранения изображения: {e}")
-                return False
-        else:
-            return image.save(file_path)
+        self.commit_selection()
+        try:
+            write_scaled_image(self.image, file_path, scale)
+            return True
+        except Exception as e:
+            print(f"Ошибка сохранения изображения: {e}")
+            return False
     def fill(self, x, y):
         print(f"Canvas: заливка в точке ({x}, {y})")
         if x < 0 or x >= self.width or y < 0 or y >= self.height:
             return
-        target_color = self.image.pixelColor(x, y)
-        fill_color = Qt.white if self.eraser_mode else self.current_color
-        if target_color == fill_color:
+        if self.selection and not self.floating_selection and not self.selection_contains(x, y):
             return
-        queue = [(x, y)]
-        visited = set()
-        while queue:
-            px, py = queue.pop(0)
-            if (px < 0 or px >= self.width or py < 0 or py >= self.height or
-                (px, py) in visited):
-                continue
-            if self.image.pixelColor(px, py) != target_color:
-                continue
-            self.image.setPixelColor(px, py, fill_color)
-            visited.add((px, py))
-            queue.append((px + 1, py))
-            queue.append((px - 1, py))
-            queue.append((px, py + 1))
-            queue.append((px, py - 1))
+        fill_color = self.active_pixel()
+        pixels = read_array(self.image)
+        if pixels[y, x] == fill_color:
+            return
+        region = flood_fill_mask(pixels, x, y)
+        mask = None
+        if self.selection and not self.floating_selection:
+            mask = selection_to_array(self.selection, self.selection_mask, self.width, self.height)
+            region &= mask
+        if self.symmetry != "none":
+            ys, xs = np.nonzero(region)
+            self.plot(xs, ys, mask, filled=True)
+        else:
+            image_to_array(self.image)[region] = fill_color
+            self.mark_pixels()
         self.update()
         self.canvas_changed.emit()
     def draw_line_tool(self, x1, y1, x2, y2):
         print(f"Canvas: рисование линии от ({x1}, {y1}) до ({x2}, {y2})")
-        color = Qt.white if self.eraser_mode else self.current_color
         self.draw_line(x1, y1, x2, y2)
         self.update()
         self.canvas_changed.emit()
@@ -782,24 +1227,29 @@ class PixelCanvas(QWidget):
         print(f"Canvas: рисование текста '{text}' в точке ({x}, {y})")
         if not text:
             return
-        color = Qt.white if self.eraser_mode else self.current_color
-        try:
-            self.save_state()
-            painter = QPainter(self.image)
-            painter.setPen(color)
-            try:
-                painter.setFont(self.text_font)  
-                font_metrics = painter.fontMetrics()
-                painter.drawText(x, y + font_metrics.ascent(), text)
-            except Exception as e:
-                print(f"Ошибка при установке шрифта: {e}")
-                painter.drawText(x, y + 8, text)
-            finally:
-                painter.end()
-            self.update()
-            self.canvas_changed.emit()
-        except Exception as e:
-            print(f"Ошибка при рисовании текста: {e}")
+        self.save_state()
+        mask, left = bitmap_font(self.text_font).text_mask(text)
+        ys, xs = np.nonzero(mask)
+        self.plot(xs + x + left, ys + y)
+        self.canvas_changed.emit()
+    def floating_text_pixmap(self):
+        key = (self.floating_text, self.text_font.key(), self.current_color.rgba())
+        if key != self.text_cache_key:
+            mask, self.text_cache_offset = bitmap_font(self.text_font).text_mask(self.floating_text)
+            text_image = array_to_image(np.where(mask, pack_color(self.current_color), np.uint32(TRANSPARENT)))
+            self.text_pixmap = QPixmap.fromImage(text_image)
+            self.text_cache_key = key
+        return self.text_pixmap
+    def floating_text_rect(self):
+        text_pixmap = self.floating_text_pixmap()
+        return QRect(self.floating_text_pos.x() + self.text_cache_offset, self.floating_text_pos.y(),
+                     text_pixmap.width(), text_pixmap.height())
+    def floating_text_widget_rect(self):
+        return self.canvas_to_widget_rect(self.floating_text_rect()).adjusted(-2, -2, 2, 2)
+    def move_floating_text(self, position):
+        dirty = self.floating_text_widget_rect()
+        self.floating_text_pos = position
+        self.update(dirty.united(self.floating_text_widget_rect()))
     def choose_font(self):
         current_font = self.text_font
         font, ok = QFontDialog.getFont(current_font, self, "Выбор шрифта")
@@ -827,33 +1277,25 @@ class PixelCanvas(QWidget):
     def flip_selection_horizontal(self):
         if not self.selection or not self.selection_image:
             return
-        self.save_state()
-        mirrored = self.selection_image.mirrored(True, False)
-        painter = QPainter(self.image)
-        painter.fillRect(self.selection, Qt.white)
-        painter.drawImage(self.selection.topLeft(), mirrored)
-        painter.end()
-        self.selection_image = mirrored
-        self.update()
-        self.canvas_changed.emit()
+        self.lift_selection()
+        self.selection_image = self.selection_image.mirrored(True, False)
+        if self.selection_mask is not None:
+            self.selection_mask = self.selection_mask.mirrored(True, False)
+        self.update(self.canvas_to_widget_rect(self.selection))
         print("Выделение отражено по горизонтали")
     def flip_selection_vertical(self):
         if not self.selection or not self.selection_image:
             return
-        self.save_state()
-        mirrored = self.selection_image.mirrored(False, True)
-        painter = QPainter(self.image)
-        painter.fillRect(self.selection, Qt.white)
-        painter.drawImage(self.selection.topLeft(), mirrored)
-        painter.end()
-        self.selection_image = mirrored
-        self.update()
-        self.canvas_changed.emit()
+        self.lift_selection()
+        self.selection_image = self.selection_image.mirrored(False, True)
+        if self.selection_mask is not None:
+            self.selection_mask = self.selection_mask.mirrored(False, True)
+        self.update(self.canvas_to_widget_rect(self.selection))
         print("Выделение отражено по вертикали")
     def rotate_selection(self, angle):
         if not self.selection or not self.selection_image:
             return
-        self.save_state()
+        self.lift_selection()
         transform = QTransform()
         center_x = self.selection_image.width() / 2
         center_y = self.selection_image.height() / 2
@@ -869,18 +1311,14 @@ class PixelCanvas(QWidget):
             new_x = max(0, min(self.width - new_width, new_x))
             new_y = max(0, min(self.height - new_height, new_y))
             self.selection = QRect(new_x, new_y, new_width, new_height)
-        painter = QPainter(self.image)
-        painter.fillRect(self.selection, Qt.white)
-        painter.drawImage(self.selection.topLeft(), rotated)
-        painter.end()
         self.selection_image = rotated
+        if self.selection_mask is not None:
+            self.selection_mask = self.selection_mask.rotated(angle).resized(rotated.width(), rotated.height())
         self.update()
-        self.canvas_changed.emit()
         print(f"Выделение повернуто на {angle} градусов")
     def scale_selection(self, scale_x, scale_y):
         if not self.selection or not self.selection_image:
             return
-        self.save_state()
         new_width = int(self.selection.width() * scale_x)
         new_height = int(self.selection.height() * scale_y)
         if new_width <= 0 or new_height <= 0 or \
@@ -893,12 +1331,10 @@ class PixelCanvas(QWidget):
             Qt.KeepAspectRatio if scale_x == scale_y else Qt.IgnoreAspectRatio, 
             Qt.FastTransformation
         )
-        painter = QPainter(self.image)
-        painter.fillRect(self.selection, Qt.white)
-        self.selection = QRect(self.selection.x(), self.selection.y(), new_width, new_height)
-        painter.drawImage(self.selection.topLeft(), scaled)
-        painter.end()
+        self.lift_selection()
+        self.selection = QRect(self.selection.x(), self.selection.y(), scaled.width(), scaled.height())
         self.selection_image = scaled
+        if self.selection_mask is not None:
+            self.selection_mask = self.selection_mask.resized(scaled.width(), scaled.height())
         self.update()
-        self.canvas_changed.emit()
         print(f"Выделение масштабировано ({scale_x}x, {scale_y}y)")
\ No newline at end of file
@@ -0,0 +1,64 @@
+import heapq
+import numpy as np
+from pixel_buffer import read_array
+TILE_SIZE = 64
+class ColorHistogram:
+    def __init__(self):
+        self.layout = None
+        self.tile_counts = {}
+        self.counts = {}
+        self.tiles = set()
+        self.full = True
+    def mark(self, rect=None):
+        if rect is None:
+            self.full = True
+        elif not self.full and self.layout is not None:
+            left, top = max(0, rect.left()) // TILE_SIZE, max(0, rect.top()) // TILE_SIZE
+            right, bottom = max(0, rect.right()) // TILE_SIZE, max(0, rect.bottom()) // TILE_SIZE
+            self.tiles.update((row, column) for row in range(top, bottom + 1) for column in range(left, right + 1))
+    def count_tile(self, pixels, tile):
+        row, column = tile
+        block = pixels[row * TILE_SIZE:(row + 1) * TILE_SIZE, column * TILE_SIZE:(column + 1) * TILE_SIZE]
+        values, counts = np.unique(block, return_counts=True)
+        return values, counts.astype(np.uint16)
+    def reset(self, pixels):
+        height, width = pixels.shape
+        self.layout = (pixels.shape, pixels.dtype)
+        self.tile_counts = {(row, column): self.count_tile(pixels, (row, column))
+                            for row in range(-(-height // TILE_SIZE)) for column in range(-(-width // TILE_SIZE))}
+        if not self.tile_counts:
+            self.counts = {}
+            return
+        values = np.concatenate([values for values, _ in self.tile_counts.values()])
+        counts = np.concatenate([counts for _, counts in self.tile_counts.values()])
+        values, inverse = np.unique(values, return_inverse=True)
+        totals = np.bincount(inverse, weights=counts).astype(np.int64)
+        self.counts = dict(zip(values.tolist(), totals.tolist()))
+    def add(self, values, counts, sign):
+        for value, count in zip(values.tolist(), counts.tolist()):
+            total = self.counts.get(value, 0) + sign * count
+            if total:
+                self.counts[value] = total
+            else:
+                self.counts.pop(value, None)
+    def update(self, image):
+        pixels = read_array(image)
+        if self.full or self.layout != (pixels.shape, pixels.dtype):
+            self.reset(pixels)
+        else:
+            for tile in self.tiles & self.tile_counts.keys():
+                self.add(*self.tile_counts[tile], -1)
+                self.tile_counts[tile] = self.count_tile(pixels, tile)
+                self.add(*self.tile_counts[tile], 1)
+        self.tiles.clear()
+        self.full = False
+        return self.counts
+    def colors(self, image, limit=None):
+        counts = self.update(image)
+        if limit is None:
+            return sorted(counts.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(limit, counts.items(), key=lambda item: item[1])
+    def color_count(self, image):
+        return len(self.update(image))
+    def memory_usage(self):
+        return sum(values.nbytes + counts.nbytes for values, counts in self.tile_counts.values())
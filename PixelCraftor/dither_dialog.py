@@ -0,0 +1,86 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QSpinBox, QComboBox, QGridLayout, QSlider)
+from PySide6.QtGui import QPixmap
+from PySide6.QtCore import Qt, QTimer
+from dithering import DITHER_METHODS, DITHER_NAMES, dither, ink_to_image
+class DitherDialog(QDialog):
+    PREVIEW_SIZE = 384
+    def __init__(self, image, parent=None, allow_legacy=False):
+        super().__init__(parent)
+        self.setWindowTitle("Монохромное преобразование")
+        self.setMinimumWidth(420)
+        self.image = image
+        self.allow_legacy = allow_legacy
+        self.result_image = None
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(120)
+        self.preview_timer.timeout.connect(self.update_preview)
+        self.setup_ui()
+        self.update_preview()
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        grid_layout = QGridLayout()
+        grid_layout.addWidget(QLabel("Метод:"), 0, 0)
+        self.method_combo = QComboBox()
+        if self.allow_legacy:
+            self.method_combo.addItem("Стандартный (Qt)", None)
+        for method in DITHER_METHODS:
+            self.method_combo.addItem(DITHER_NAMES[method], method)
+        self.method_combo.setCurrentIndex(self.method_combo.findData("floyd_steinberg"))
+        self.method_combo.currentIndexChanged.connect(self.schedule_preview)
+        grid_layout.addWidget(self.method_combo, 0, 1, 1, 2)
+        grid_layout.addWidget(QLabel("Порог:"), 1, 0)
+        self.threshold_slider = QSlider(Qt.Horizontal)
+        self.threshold_slider.setRange(1, 255)
+        self.threshold_slider.setValue(128)
+        grid_layout.addWidget(self.threshold_slider, 1, 1)
+        self.threshold_spin = QSpinBox()
+        self.threshold_spin.setRange(1, 255)
+        self.threshold_spin.setValue(128)
+        grid_layout.addWidget(self.threshold_spin, 1, 2)
+        self.threshold_slider.valueChanged.connect(self.threshold_spin.setValue)
+        self.threshold_spin.valueChanged.connect(self.threshold_slider.setValue)
+        self.threshold_spin.valueChanged.connect(self.schedule_preview)
+        layout.addLayout(grid_layout)
+        self.preview_label = QLabel()
+        self.preview_label.setAlignment(Qt.AlignCenter)
+        self.preview_label.setMinimumSize(self.PREVIEW_SIZE, self.PREVIEW_SIZE // 2)
+        layout.addWidget(self.preview_label)
+        buttons_layout = QHBoxLayout()
+        self.cancel_button = QPushButton("Отмена")
+        self.cancel_button.clicked.connect(self.reject)
+        self.ok_button = QPushButton("ОК")
+        self.ok_button.clicked.connect(self.accept)
+        self.ok_button.setDefault(True)
+        buttons_layout.addWidget(self.cancel_button)
+        buttons_layout.addWidget(self.ok_button)
+        layout.addLayout(buttons_layout)
+        self.setLayout(layout)
+    def method(self):
+        return self.method_combo.currentData()
+    def threshold(self):
+        return self.threshold_spin.value()
+    def schedule_preview(self, *args):
+        self.threshold_spin.setEnabled(self.method() not in (None, "otsu"))
+        self.threshold_slider.setEnabled(self.method() not in (None, "otsu"))
+        self.preview_timer.start()
+    def update_preview(self):
+        if self.method() is None:
+            self.result_image = None
+            preview = self.image
+        else:
+            self.result_image = ink_to_image(dither(self.image, self.method(), self.threshold()))
+            preview = self.result_image
+        factor = max(1, min(self.PREVIEW_SIZE // max(1, preview.width()), self.PREVIEW_SIZE // max(1, preview.height())))
+        pixmap = QPixmap.fromImage(preview)
+        if factor > 1:
+            pixmap = pixmap.scaled(preview.width() * factor, preview.height() * factor, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        elif preview.width() > self.PREVIEW_SIZE or preview.height() > self.PREVIEW_SIZE:
+            pixmap = pixmap.scaled(self.PREVIEW_SIZE, self.PREVIEW_SIZE, Qt.KeepAspectRatio, Qt.FastTransformation)
+        self.preview_label.setPixmap(pixmap)
+    def get_result_image(self):
+        if self.preview_timer.isActive():
+            self.preview_timer.stop()
+            self.update_preview()
+        return self.result_image
@@ -0,0 +1,125 @@
+import numpy as np
+from pixel_buffer import DOCUMENT_FORMAT, array_to_image, image_to_array, WHITE
+BLACK = 0xFF000000
+DITHER_METHODS = ("threshold", "otsu", "bayer2", "bayer4", "bayer8", "floyd_steinberg", "atkinson", "blue_noise")
+DITHER_NAMES = {
+    "threshold": "Порог",
+    "otsu": "Порог Оцу",
+    "bayer2": "Байер 2x2",
+    "bayer4": "Байер 4x4",
+    "bayer8": "Байер 8x8",
+    "floyd_steinberg": "Флойд–Стейнберг",
+    "atkinson": "Аткинсон",
+    "blue_noise": "Синий шум",
+}
+LEVEL_DITHER_METHODS = ("bayer2", "bayer4", "bayer8", "floyd_steinberg", "atkinson", "blue_noise")
+DIFFUSION_KERNELS = {
+    "floyd_steinberg": ((0, 1, 7 / 16), (1, -1, 3 / 16), (1, 0, 5 / 16), (1, 1, 1 / 16)),
+    "atkinson": ((0, 1, 1 / 8), (0, 2, 1 / 8), (1, -1, 1 / 8), (1, 0, 1 / 8), (1, 1, 1 / 8), (2, 0, 1 / 8)),
+}
+_blue_noise = None
+def color_channels(image):
+    if image.format() != DOCUMENT_FORMAT:
+        image = image.convertToFormat(DOCUMENT_FORMAT)
+    pixels = image_to_array(image)
+    background = 255 - (pixels >> 24).astype(np.float32)
+    return [((pixels >> shift) & 0xFF).astype(np.float32) + background for shift in (16, 8, 0)]
+def luminance(image):
+    red, green, blue = color_channels(image)
+    return red * 0.299 + green * 0.587 + blue * 0.114
+def otsu_threshold(gray):
+    histogram = np.bincount(np.clip(gray, 0, 255).astype(np.uint8).ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(histogram)
+    total = weight[-1]
+    mean = np.cumsum(histogram * np.arange(256))
+    background = weight[:-1]
+    foreground = total - background
+    valid = (background > 0) & (foreground > 0)
+    if not valid.any():
+        return 128
+    variance = np.zeros(255)
+    mean_background = mean[:-1][valid] / background[valid]
+    mean_foreground = (mean[-1] - mean[:-1][valid]) / foreground[valid]
+    variance[valid] = background[valid] * foreground[valid] * (mean_background - mean_foreground) ** 2
+    return int(np.argmax(variance)) + 1
+def bayer_matrix(size):
+    matrix = np.zeros((1, 1), dtype=np.int64)
+    while matrix.shape[0] < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return (matrix + 0.5) * 255 / matrix.size
+def blue_noise_matrix():
+    global _blue_noise
+    if _blue_noise is None:
+        size = 64
+        noise = np.random.default_rng(0).random((size, size))
+        frequencies = np.fft.fftfreq(size)
+        radius = frequencies[:, None] ** 2 + frequencies[None, :] ** 2
+        for _ in range(3):
+            blurred = np.real(np.fft.ifft2(np.fft.fft2(noise) * np.exp(-radius * 2 * (np.pi * 1.5) ** 2)))
+            noise = noise - blurred
+            noise = np.argsort(np.argsort(noise.ravel())).reshape(size, size) / noise.size
+        _blue_noise = (noise + 0.5 / noise.size) * 255
+    return _blue_noise
+def ordered_matrix(method):
+    if method == "blue_noise":
+        return blue_noise_matrix()
+    return bayer_matrix(int(method[5:]))
+def tile_matrix(matrix, shape):
+    height, width = shape
+    rows = np.arange(height) % matrix.shape[0]
+    columns = np.arange(width) % matrix.shape[1]
+    return matrix[rows[:, None], columns]
+def ordered_dither(gray, matrix, threshold):
+    return gray < tile_matrix(matrix, gray.shape) + (threshold - 128)
+def diffuse(values, kernel, quantize):
+    height, width = values.shape
+    stride = width + 4
+    buffer = np.zeros((height + 2) * stride, dtype=np.float32)
+    buffer.reshape(height + 2, stride)[:height, 2:width + 2] = values
+    output = np.zeros(buffer.shape, dtype=np.uint8)
+    offsets = [(dy * stride + dx, weight) for dy, dx, weight in kernel]
+    step = stride - 2
+    for wave in range(width + 2 * (height - 1)):
+        first = max(0, (wave - width + 2) // 2)
+        last = min(height - 1, wave // 2)
+        start = first * step + wave + 2
+        stop = last * step + wave + 3
+        current = buffer[start:stop:step]
+        levels, quantized = quantize(current)
+        output[start:stop:step] = levels
+        error = current - quantized
+        for offset, weight in offsets:
+            buffer[start + offset:stop + offset:step] += error * weight
+    return output.reshape(height + 2, stride)[:height, 2:width + 2]
+def error_diffusion(gray, kernel, threshold):
+    def quantize(values):
+        dark = values < threshold
+        return dark, np.where(dark, 0, 255)
+    return diffuse(gray, kernel, quantize).astype(bool)
+def dither_levels(channel, levels, method=None):
+    step = 255 / (levels - 1)
+    if method in DIFFUSION_KERNELS:
+        def quantize(values):
+            indices = np.clip(np.rint(values / step), 0, levels - 1)
+            return indices, indices * step
+        return diffuse(channel, DIFFUSION_KERNELS[method], quantize)
+    scaled = channel / step
+    if method in ("bayer2", "bayer4", "bayer8", "blue_noise"):
+        scaled = scaled + tile_matrix(ordered_matrix(method), channel.shape) / 255 - 0.5
+    elif method is not None:
+        raise ValueError(f"Метод {method} не поддерживает многоуровневое квантование")
+    return np.clip(np.rint(scaled), 0, levels - 1).astype(np.uint8)
+def dither_array(gray, method="threshold", threshold=128):
+    if method == "threshold":
+        return gray < threshold
+    if method == "otsu":
+        return gray < otsu_threshold(gray)
+    if method in ("bayer2", "bayer4", "bayer8", "blue_noise"):
+        return ordered_dither(gray, ordered_matrix(method), threshold)
+    if method in DIFFUSION_KERNELS:
+        return error_diffusion(gray, DIFFUSION_KERNELS[method], threshold)
+    raise ValueError(f"Неизвестный метод дизеринга: {method}")
+def dither(image, method="threshold", threshold=128):
+    return dither_array(luminance(image), method, threshold)
+def ink_to_image(ink):
+    return array_to_image(np.where(ink, np.uint32(BLACK), np.uint32(WHITE)))
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtWidgets import QScrollArea
+from PySide6.QtCore import Qt, QObject, QTimer
+from canvas import PixelCanvas
+from history import HistoryManager
+from image_store import compress_image, image_store
+from layers import LayerManager, LayerWidget
+from viewport import DocumentRenderer
+class Document:
+    def __init__(self, width, height, title, renderer=None):
+        self.title = title
+        self.file_path = None
+        self.last_active = 0
+        self.canvas = PixelCanvas(width, height, renderer=renderer)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setAlignment(Qt.AlignCenter)
+        self.scroll_area.setWidget(self.canvas)
+        self.history_manager = HistoryManager(self.canvas)
+        self.layer_widget = LayerWidget()
+        self.layer_manager = LayerManager(self.layer_widget)
+        self.canvas.history_manager = self.history_manager
+        self.canvas.layer_manager = self.layer_manager
+        self.layer_widget.layer_added.connect(self.update_layering)
+        self.layer_widget.layer_removed.connect(self.update_layering)
+    def update_layering(self, *args):
+        self.canvas.set_layered(self.layer_widget.get_layer_count() > 1)
+    def keys(self):
+        return self.history_manager.keys() + self.canvas.history_keys()
+    def release(self):
+        self.history_manager.release()
+        self.canvas.release_history()
+    def display_name(self):
+        return os.path.basename(self.file_path) if self.file_path else self.title
+class DocumentManager(QObject):
+    COLLECT_INTERVAL = 500
+    COMPRESS_BATCH = 2
+    def __init__(self, memory_budget, parent=None):
+        super().__init__(parent)
+        self.memory_budget = memory_budget
+        self.documents = []
+        self.active = None
+        self.clock = 0
+        self.renderer = DocumentRenderer()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = {}
+        self.queue = []
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.collect)
+        self.timer.start(self.COLLECT_INTERVAL)
+    def create_document(self, width, height, title):
+        document = Document(width, height, title, self.renderer)
+        self.documents.append(document)
+        return document
+    def remove_document(self, document):
+        if document in self.documents:
+            self.documents.remove(document)
+        if self.active is document:
+            self.active = None
+        for key, (owner, future) in list(self.pending.items()):
+            if owner is document:
+                future.cancel()
+                del self.pending[key]
+        self.queue = [(owner, key) for owner, key in self.queue if owner is not document]
+        document.release()
+    def document_for_widget(self, widget):
+        return next((document for document in self.documents if document.scroll_area is widget), None)
+    def activate(self, document):
+        previous = self.active
+        self.clock += 1
+        document.last_active = self.clock
+        self.active = document
+        if previous is not None and previous is not document:
+            self.compress_history(previous)
+    def compress_history(self, document):
+        self.queue.extend((document, key) for key in dict.fromkeys(document.history_manager.keys()))
+    def compress_queued(self):
+        while self.queue and len(self.pending) < self.COMPRESS_BATCH:
+            document, key = self.queue.pop(0)
+            if document is self.active or key in self.pending or key not in document.history_manager.keys():
+                continue
+            image = image_store().shared_image(key)
+            if image is not None:
+                self.pending[key] = (document, self.executor.submit(compress_image, image))
+    def memory_usage(self):
+        return image_store().memory_usage(key for document in self.documents for key in document.keys())
+    def collect(self):
+        active_keys = self.active.history_manager.keys() if self.active else []
+        for key, (document, future) in list(self.pending.items()):
+            if future.done():
+                del self.pending[key]
+                if document is not self.active and document in self.documents and key not in active_keys:
+                    document.history_manager.store_packed(key, future.result())
+        self.compress_queued()
+        usage = self.memory_usage()
+        if usage <= self.memory_budget:
+            return
+        for document in sorted(self.documents, key=lambda document: document.last_active):
+            history = document.history_manager
+            while usage > self.memory_budget:
+                before = history.memory_usage()
+                if not history.evict_oldest():
+                    break
+                usage -= before - history.memory_usage()
+            if usage <= self.memory_budget:
+                break
+        print(f"История: {usage // 1024} КБ после вытеснения (лимит {self.memory_budget // 1024} КБ)")
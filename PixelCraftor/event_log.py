@@ -0,0 +1,87 @@
+import struct
+import time
+from PySide6.QtGui import QColor
+from PySide6.QtCore import QObject, QEvent
+MAGIC = b"PCEV"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHfHH")
+RECORD = struct.Struct("<BIiiBBi")
+PRESS, MOVE, RELEASE, KEY_PRESS, KEY_RELEASE, WHEEL, TOOL, COLOR = range(1, 9)
+MOUSE_EVENTS = {QEvent.MouseButtonPress: PRESS, QEvent.MouseMove: MOVE, QEvent.MouseButtonRelease: RELEASE}
+KEY_EVENTS = {QEvent.KeyPress: KEY_PRESS, QEvent.KeyRelease: KEY_RELEASE}
+MODIFIER_SHIFT = 25
+def pack_modifiers(modifiers):
+    return (modifiers.value >> MODIFIER_SHIFT) & 0xFF
+def unpack_modifiers(value):
+    return value << MODIFIER_SHIFT
+class EventRecorder(QObject):
+    def __init__(self, canvas, file_path, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.file_path = file_path
+        self.records = []
+        self.start = time.perf_counter()
+        viewport = canvas.scroll_area().viewport().size() if canvas.scroll_area() else canvas.size()
+        self.header = HEADER.pack(MAGIC, VERSION, canvas.width, canvas.height, canvas.scale,
+                                  viewport.width(), viewport.height())
+        self.add(TOOL, tool=canvas.current_tool)
+        self.add(COLOR, value=QColor(canvas.current_color).rgba())
+        canvas.tool_changed.connect(self.on_tool_changed)
+        canvas.color_changed.connect(self.on_color_changed)
+        canvas.installEventFilter(self)
+    def elapsed(self):
+        return int((time.perf_counter() - self.start) * 1000)
+    def add(self, kind, x=0, y=0, button=0, modifiers=0, value=0, tool=None):
+        if tool is not None:
+            name = tool.encode("utf-8")
+            self.records.append(RECORD.pack(kind, self.elapsed(), 0, 0, 0, 0, len(name)) + name)
+        else:
+            value = value - (1 << 32) if value >= 1 << 31 else value
+            self.records.append(RECORD.pack(kind, self.elapsed(), x, y, button, modifiers, value))
+    def eventFilter(self, watched, event):
+        kind = event.type()
+        if kind in MOUSE_EVENTS:
+            position = event.position()
+            button = event.button().value if kind != QEvent.MouseMove else event.buttons().value
+            self.add(MOUSE_EVENTS[kind], int(position.x()), int(position.y()), button & 0xFF,
+                     pack_modifiers(event.modifiers()))
+        elif kind in KEY_EVENTS and not event.isAutoRepeat():
+            self.add(KEY_EVENTS[kind], modifiers=pack_modifiers(event.modifiers()), value=event.key())
+        elif kind == QEvent.Wheel:
+            position = event.position()
+            self.add(WHEEL, int(position.x()), int(position.y()), modifiers=pack_modifiers(event.modifiers()),
+                     value=event.angleDelta().y())
+        return False
+    def on_tool_changed(self, tool):
+        self.add(TOOL, tool=tool)
+    def on_color_changed(self, color):
+        self.add(COLOR, value=QColor(color).rgba())
+    def stop(self):
+        self.canvas.removeEventFilter(self)
+        self.canvas.tool_changed.disconnect(self.on_tool_changed)
+        self.canvas.color_changed.disconnect(self.on_color_changed)
+        with open(self.file_path, "wb") as f:
+            f.write(self.header)
+            f.write(b"".join(self.records))
+        print(f"Запись сессии: {len(self.records)} событий сохранено в {self.file_path}")
+        return len(self.records)
+def read_event_log(file_path):
+    with open(file_path, "rb") as f:
+        data = f.read()
+    magic, version, width, height, scale, viewport_width, viewport_height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Неизвестный формат журнала событий: {file_path}")
+    header = {"width": width, "height": height, "scale": scale, "viewport": (viewport_width, viewport_height)}
+    events = []
+    offset = HEADER.size
+    while offset < len(data):
+        kind, elapsed, x, y, button, modifiers, value = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if kind == TOOL:
+            length = value
+            value = data[offset:offset + length].decode("utf-8")
+            offset += length
+        elif kind == COLOR:
+            value &= 0xFFFFFFFF
+        events.append((kind, elapsed, x, y, button, modifiers, value))
+    return header, events
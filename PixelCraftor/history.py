@@ -1,7 +1,9 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget,
                              QListWidgetItem, QPushButton, QLabel)
-from PySide6.QtGui import QIcon, QPixmap, QImage, QPainter
-from PySide6.QtCore import Qt, Signal, QSize, QTimer
+from PySide6.QtGui import QIcon, QImage, QPainter
+from PySide6.QtCore import Signal, QSize, QTimer
+from image_store import image_store
+from resources import thumbnail
 class HistoryThumbnail(QWidget):
     def __init__(self, image, description, parent=None):
         super().__init__(parent)
@@ -18,9 +20,7 @@ class HistoryThumbnail(QWidget):
         layout.addWidget(self.description_label)
         layout.setStretchFactor(self.description_label, 1)
     def update_thumbnail(self):
-        thumbnail = self.image.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        pixmap = QPixmap.fromImage(thumbnail)
-        self.thumbnail_label.setPixmap(pixmap)
+        self.thumbnail_label.setPixmap(thumbnail(self.image, 32))
     def set_image(self, image):
         self.image = image
         self.update_thumbnail()
@@ -90,9 +90,10 @@ class HistoryManager:
         self.canvas = canvas
         self.max_history = max_history
         self.history_widget = None
+        self.store = image_store()
         self.undo_stack = []
         self.redo_stack = []
-        self.current_image = None
+        self.current_key = None
         self.is_modified = False
         if canvas:
             self.canvas.canvas_changed.connect(self.on_canvas_changed)
@@ -103,62 +104,102 @@ class HistoryManager:
             widget.history_selected.connect(self.on_history_selected)
             self.update_history_widget()
     def save_state(self, description=""):
-        image = self.canvas.get_image()
-        if self.current_image and image.constBits() == self.current_image.constBits():
+        if self.canvas.mapped or self.canvas.read_only:
             return
-        self.current_image = image.copy()
+        key = self.store.put(self.canvas.get_image())
+        if key == self.current_key:
+            self.store.release(key)
+            return
+        self.current_key = key
+        self.canvas.counters.record_snapshot(self.store.size(key))
         self.undo_stack.append({
-            "image": self.current_image,
+            "key": key,
             "description": description or f"Состояние {len(self.undo_stack) + 1}"
         })
-        self.redo_stack.clear()
+        self.drop_states(self.redo_stack)
+        self.redo_stack = []
         if len(self.undo_stack) > self.max_history:
-            self.undo_stack.pop(0)
+            self.drop_states([self.undo_stack.pop(0)])
         self.update_history_widget()
         self.is_modified = True
+    def drop_states(self, states):
+        for state in states:
+            self.store.release(state["key"])
+    def show_state(self, state):
+        self.current_key = state["key"]
+        self.canvas.set_image(self.state_image(state))
     def undo(self):
+        if self.canvas.mapped:
+            return self.canvas.undo()
+        if self.canvas.cancel_floating_selection():
+            return True
         if len(self.undo_stack) <= 1:
             return False
-        current_state = self.undo_stack.pop()
-        self.redo_stack.append(current_state)
-        previous_state = self.undo_stack[-1]
-        self.canvas.set_image(previous_state["image"])
-        self.current_image = previous_state["image"].copy()
+        self.redo_stack.append(self.undo_stack.pop())
+        self.show_state(self.undo_stack[-1])
         self.update_history_widget()
         return True
     def redo(self):
+        if self.canvas.mapped:
+            return self.canvas.redo()
         if not self.redo_stack:
             return False
-        next_state = self.redo_stack.pop()
-        self.undo_stack.append(next_state)
-        self.canvas.set_image(next_state["image"])
-        self.current_image = next_state["image"].copy()
+        self.undo_stack.append(self.redo_stack.pop())
+        self.show_state(self.undo_stack[-1])
         self.update_history_widget()
         return True
     def on_canvas_changed(self):
-        QTimer.singleShot(100, lambda: self.save_state())
+        QTimer.singleShot(100, self.canvas, lambda: self.save_state())
     def on_history_selected(self, index):
         if 0 <= index < len(self.undo_stack):
-            state = self.undo_stack[index]
-            self.canvas.set_image(state["image"])
-            self.current_image = state["image"].copy()
+            self.show_state(self.undo_stack[index])
+            self.drop_states(self.undo_stack[index + 1:] + self.redo_stack)
             self.undo_stack = self.undo_stack[:index + 1]
-            self.redo_stack.clear()
+            self.redo_stack = []
     def update_history_widget(self):
         if not self.history_widget:
             return
         self.history_widget.clear()
         for state in self.undo_stack:
-            self.history_widget.add_history_item(state["image"], state["description"])
+            self.history_widget.add_history_item(self.state_image(state), state["description"])
+    def state_image(self, state):
+        return self.store.image(state["key"])
+    def states(self):
+        return self.undo_stack + self.redo_stack
+    def keys(self):
+        return [state["key"] for state in self.states()]
+    def store_packed(self, key, snapshot):
+        if key in self.keys():
+            self.store.pack(key, snapshot)
+    def memory_usage(self):
+        return self.store.memory_usage(self.keys())
+    def evict_oldest(self):
+        if len(self.undo_stack) > 1:
+            self.drop_states([self.undo_stack.pop(0)])
+        elif self.redo_stack:
+            self.drop_states([self.redo_stack.pop(0)])
+        else:
+            return False
+        self.update_history_widget()
+        return True
+    def release(self):
+        self.canvas.canvas_changed.disconnect(self.on_canvas_changed)
+        self.drop_states(self.states())
+        self.undo_stack = []
+        self.redo_stack = []
+        self.current_key = None
     def clear_history(self):
-        current_image = self.canvas.get_image().copy()
-        self.undo_stack.clear()
-        self.redo_stack.clear()
-        self.undo_stack.append({
-            "image": current_image,
-            "description": "Начальное состояние"
-        })
+        self.drop_states(self.states())
+        self.undo_stack = []
+        self.redo_stack = []
+        self.current_key = None
+        if not (self.canvas.mapped or self.canvas.read_only):
+            self.current_key = self.store.put(self.canvas.get_image())
+            self.undo_stack.append({
+                "key": self.current_key,
+                "description": "Начальное состояние"
+            })
         self.update_history_widget()
         self.is_modified = False
     def is_modified(self):
-        return self.is_modified 
\ No newline at end of file
+        return self.is_modified
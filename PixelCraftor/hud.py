@@ -0,0 +1,84 @@
+import time
+import numpy as np
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QColor, QFont, QFontMetrics
+from PySide6.QtCore import Qt, QTimer, QRect
+FRAME_SAMPLES = 120
+EVENT_SAMPLES = 512
+HUD_INTERVAL = 250
+def format_bytes(size):
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} МБ"
+    return f"{size / 1024:.1f} КБ"
+class RingBuffer:
+    def __init__(self, size, dtype=np.float64):
+        self.data = np.zeros(size, dtype=dtype)
+        self.count = 0
+    def push(self, value):
+        self.data[self.count % len(self.data)] = value
+        self.count += 1
+    def values(self):
+        return self.data[:min(self.count, len(self.data))]
+    def last(self):
+        return self.data[(self.count - 1) % len(self.data)] if self.count else 0
+class PerfCounters:
+    def __init__(self):
+        self.frame_times = RingBuffer(FRAME_SAMPLES)
+        self.frame_areas = RingBuffer(FRAME_SAMPLES, np.int64)
+        self.event_times = RingBuffer(EVENT_SAMPLES)
+        self.snapshot_bytes = 0
+    def record_frame(self, elapsed, rect):
+        self.frame_times.push(elapsed)
+        self.frame_areas.push(rect.width() * rect.height())
+    def record_event(self):
+        self.event_times.push(time.perf_counter())
+    def record_snapshot(self, size):
+        self.snapshot_bytes = size
+    def events_per_second(self):
+        times = self.event_times.values()
+        return int(np.count_nonzero(times > time.perf_counter() - 1.0))
+class HudOverlay(QWidget):
+    def __init__(self, canvas, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.font = QFont("monospace", 8)
+        self.font.setStyleHint(QFont.Monospace)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+    def start(self):
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.timer.start(HUD_INTERVAL)
+    def stop(self):
+        self.timer.stop()
+        self.hide()
+    def lines(self):
+        counters = self.canvas.counters
+        frames = counters.frame_times.values()
+        areas = counters.frame_areas.values()
+        return [
+            f"Кадр: {counters.frame_times.last():6.2f} мс  ср. {frames.mean() if len(frames) else 0:6.2f}  "
+            f"макс. {frames.max() if len(frames) else 0:6.2f}",
+            f"Перерисовка: {int(counters.frame_areas.last())} пикс.  ср. {int(areas.mean()) if len(areas) else 0}",
+            f"События: {counters.events_per_second()}/с",
+            f"История: {format_bytes(self.canvas.history_memory())}",
+            f"Кэш слоев: {format_bytes(self.canvas.layer_cache_memory())}",
+            f"Гистограмма: {format_bytes(self.canvas.histogram.memory_usage())}",
+            f"Последний снимок: {format_bytes(counters.snapshot_bytes)}",
+        ]
+    def refresh(self):
+        self.text_lines = self.lines()
+        metrics = QFontMetrics(self.font)
+        width = max(metrics.horizontalAdvance(line) for line in self.text_lines) + 12
+        self.setGeometry(QRect(8, 8, width, metrics.height() * len(self.text_lines) + 8))
+        self.update()
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 170))
+        painter.setFont(self.font)
+        painter.setPen(QColor(120, 255, 120))
+        metrics = painter.fontMetrics()
+        for index, line in enumerate(self.text_lines):
+            painter.drawText(6, 4 + metrics.ascent() + index * metrics.height(), line)
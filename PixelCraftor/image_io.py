@@ -0,0 +1,205 @@
+import io
+import os
+import struct
+import zlib
+import numpy as np
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader, QPainter
+from PySide6.QtCore import Qt, QRect, QSize
+from pixel_buffer import DOCUMENT_FORMAT, image_to_array
+PIL_FORMATS = ('.pbm', '.tga', '.ico')
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+STREAM_PIXELS = 2048 * 2048
+PREVIEW_SIZE = 1024
+STRIP_ROWS = 256
+CLIP_ROWS = 1024
+def report(progress, percent):
+    if progress:
+        progress(percent)
+def strip_image(strip):
+    if isinstance(strip, QImage):
+        return strip.convertToFormat(DOCUMENT_FORMAT)
+    if strip.mode != "RGBA":
+        strip = strip.convert("RGBA")
+    data = strip.tobytes("raw", "RGBA")
+    return QImage(data, strip.width, strip.height, strip.width * 4, QImage.Format_RGBA8888).convertToFormat(DOCUMENT_FORMAT)
+def write_strip(pixels, top, strip):
+    image = strip_image(strip)
+    pixels[top:top + image.height()] = image_to_array(image)
+    return image.height()
+def pil_strips(pil_image):
+    for top in range(0, pil_image.height, STRIP_ROWS):
+        yield top, pil_image.crop((0, top, pil_image.width, min(pil_image.height, top + STRIP_ROWS)))
+def read_image(file_path, progress=None):
+    from PIL import Image
+    pil_image = Image.open(file_path)
+    pil_image.load()
+    report(progress, 10)
+    image = QImage(pil_image.width, pil_image.height, DOCUMENT_FORMAT)
+    pixels = image_to_array(image)
+    for top, strip in pil_strips(pil_image):
+        write_strip(pixels, top, strip)
+        report(progress, 10 + 90 * top // pil_image.height)
+    report(progress, 100)
+    return image
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+def png_chunks(f):
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        length, kind = struct.unpack(">I4s", header)
+        data = f.read(length)
+        f.read(4)
+        yield kind, data
+        if kind == b"IEND":
+            return
+def png_header(file_path):
+    with open(file_path, "rb") as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+        length, kind = struct.unpack(">I4s", f.read(8))
+        if kind != b"IHDR" or length != 13:
+            return None
+        width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", f.read(13))
+    if depth != 8 or interlace or color not in PNG_CHANNELS:
+        return None
+    return width, height, color
+def decode_png_rows(width, color, chunks, previous, filtered):
+    from PIL import Image
+    rows = len(filtered) // (1 + width * PNG_CHANNELS[color])
+    if previous is not None:
+        filtered = b"\0" + previous + filtered
+        rows += 1
+    data = b"".join([PNG_SIGNATURE, png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, rows, 8, color, 0, 0, 0)),
+                     chunks, png_chunk(b"IDAT", zlib.compress(filtered, 0)), png_chunk(b"IEND", b"")])
+    strip = Image.open(io.BytesIO(data))
+    strip.load()
+    last = strip.crop((0, rows - 1, width, rows)).tobytes()
+    if previous is not None:
+        strip = strip.crop((0, 1, width, rows))
+    return strip, last
+def png_strips(file_path, width, height, color):
+    row_bytes = 1 + width * PNG_CHANNELS[color]
+    strip_bytes = row_bytes * STRIP_ROWS
+    inflater = zlib.decompressobj()
+    chunks = b""
+    pending = bytearray()
+    previous = None
+    top = 0
+    with open(file_path, "rb") as f:
+        f.read(len(PNG_SIGNATURE))
+        for kind, data in png_chunks(f):
+            if kind in (b"PLTE", b"tRNS"):
+                chunks += png_chunk(kind, data)
+            elif kind == b"IDAT":
+                while data:
+                    pending += inflater.decompress(data, strip_bytes)
+                    data = inflater.unconsumed_tail
+                    rows = min(len(pending) // row_bytes, STRIP_ROWS)
+                    while rows == STRIP_ROWS or (rows and top + rows >= height):
+                        size = rows * row_bytes
+                        strip, previous = decode_png_rows(width, color, chunks, previous, bytes(pending[:size]))
+                        del pending[:size]
+                        yield top, strip
+                        top += strip.height
+                        rows = min(len(pending) // row_bytes, STRIP_ROWS)
+    if top < height:
+        raise IOError(f"Файл обрезан: {file_path}")
+def stream_size(file_path):
+    png = png_header(file_path)
+    size = QSize(png[0], png[1]) if png else QImageReader(file_path).size()
+    if size.isValid() and size.width() * size.height() >= STREAM_PIXELS:
+        return size
+    return None
+def clip_strips(file_path, width, height):
+    for top in range(0, height, CLIP_ROWS):
+        reader = QImageReader(file_path)
+        reader.setClipRect(QRect(0, top, width, min(CLIP_ROWS, height - top)))
+        strip = reader.read()
+        if strip.isNull():
+            raise IOError(f"{reader.errorString()}: {file_path}")
+        yield top, strip
+def png_preview(file_path, width, height, color):
+    from PIL import Image
+    size = QSize(width, height).scaled(PREVIEW_SIZE, PREVIEW_SIZE, Qt.KeepAspectRatio)
+    preview = QImage(size, DOCUMENT_FORMAT)
+    target = image_to_array(preview)
+    rows = np.arange(size.height()) * height // size.height()
+    for top, strip in png_strips(file_path, width, height, color):
+        wanted = (rows >= top) & (rows < top + strip.height)
+        if wanted.any():
+            image = strip_image(strip.resize((size.width(), strip.height), Image.NEAREST))
+            target[wanted] = image_to_array(image)[rows[wanted] - top]
+    return preview
+def read_preview(file_path):
+    reader = QImageReader(file_path)
+    reader.setScaledSize(reader.size().scaled(PREVIEW_SIZE, PREVIEW_SIZE, Qt.KeepAspectRatio))
+    return reader.read()
+def fill_preview(pixels, preview):
+    height, width = pixels.shape
+    source = image_to_array(preview.convertToFormat(DOCUMENT_FORMAT))
+    columns = np.arange(width) * source.shape[1] // width
+    for top in range(0, height, STRIP_ROWS):
+        rows = np.arange(top, min(height, top + STRIP_ROWS)) * source.shape[0] // height
+        pixels[top:top + len(rows)] = source[rows][:, columns]
+def stream_image(file_path, pixels, progress=None):
+    height, width = pixels.shape
+    png = png_header(file_path)
+    preview = png_preview(file_path, *png) if png else read_preview(file_path)
+    if not preview.isNull():
+        fill_preview(pixels, preview)
+        report(progress, 20)
+    if png:
+        strips = png_strips(file_path, *png)
+    elif QImageReader(file_path).supportsOption(QImageIOHandler.ImageOption.ClipRect):
+        strips = clip_strips(file_path, width, height)
+    else:
+        from PIL import Image
+        strips = pil_strips(Image.open(file_path))
+    for top, strip in strips:
+        rows = write_strip(pixels, top, strip)
+        report(progress, 20 + 80 * (top + rows) // height)
+    return file_path
+def temporary_path(file_path):
+    root, ext = os.path.splitext(file_path)
+    return f"{root}.part{ext}"
+def replace_file(file_path, write, progress=None):
+    temp_path = temporary_path(file_path)
+    try:
+        if write(temp_path) is False:
+            raise IOError(f"Не удалось записать файл: {file_path}")
+        report(progress, 100)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+def encode_image(image, file_path):
+    if os.path.splitext(file_path)[1].lower() not in PIL_FORMATS:
+        return image.save(file_path)
+    from PIL import Image
+    image = image.convertToFormat(QImage.Format_ARGB32)
+    pil_image = Image.frombuffer("RGBA", (image.width(), image.height()), bytes(image.constBits()),
+                                 'raw', 'BGRA', image.bytesPerLine(), 1)
+    pil_image.save(file_path)
+    return True
+def write_image(image, file_path, progress=None):
+    if file_path.lower().endswith(".pcraw"):
+        from mapped_image import write_raw
+        return write_raw(image, file_path, progress)
+    report(progress, 10)
+    replace_file(file_path, lambda path: encode_image(image, path), progress)
+    return file_path
+def scale_image(image, scale):
+    scale = max(1, scale)
+    scaled_image = QImage(image.width() * scale, image.height() * scale, QImage.Format_ARGB32)
+    scaled_image.fill(Qt.white)
+    painter = QPainter(scaled_image)
+    painter.drawImage(scaled_image.rect(), image.scaled(scaled_image.size(), Qt.IgnoreAspectRatio, Qt.FastTransformation))
+    painter.end()
+    return scaled_image
+def write_scaled_image(image, file_path, scale=1, progress=None):
+    scaled_image = scale_image(image, scale)
+    report(progress, 40)
+    return write_image(scaled_image, file_path, progress)
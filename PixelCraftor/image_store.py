@@ -0,0 +1,88 @@
+import hashlib
+import zlib
+import numpy as np
+from PySide6.QtGui import QImage
+_store = None
+def snapshot_image(image):
+    return {
+        "bytes": bytes(image.constBits()),
+        "size": (image.width(), image.height()),
+        "bytes_per_line": image.bytesPerLine(),
+        "format": image.format(),
+        "color_table": image.colorTable(),
+    }
+def compress_image(image):
+    snapshot = snapshot_image(image)
+    snapshot["bytes"] = zlib.compress(snapshot["bytes"], 1)
+    return snapshot
+def restore_image(snapshot):
+    width, height = snapshot["size"]
+    data = zlib.decompress(snapshot["bytes"])
+    image = QImage(data, width, height, snapshot["bytes_per_line"], snapshot["format"]).copy()
+    if snapshot["color_table"]:
+        image.setColorTable(snapshot["color_table"])
+    return image
+def image_digest(image):
+    digest = hashlib.blake2b(image.constBits(), digest_size=16)
+    digest.update(f"{image.width()}x{image.height()}/{image.bytesPerLine()}/{image.format().value}".encode("ascii"))
+    if image.colorTable():
+        digest.update(np.array(image.colorTable(), dtype=np.uint32).tobytes())
+    return digest.hexdigest()
+class ImageStore:
+    def __init__(self):
+        self.entries = {}
+        self.cache_keys = {}
+        self.hits = 0
+    def put(self, image):
+        key = self.cache_keys.get(image.cacheKey())
+        if key is None:
+            key = image_digest(image)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = {"image": QImage(image), "refs": 0, "cache_key": image.cacheKey()}
+            self.cache_keys[image.cacheKey()] = key
+        else:
+            self.hits += 1
+        entry["refs"] += 1
+        return key
+    def retain(self, key):
+        self.entries[key]["refs"] += 1
+        return key
+    def release(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        entry["refs"] -= 1
+        if entry["refs"] <= 0:
+            del self.entries[key]
+            self.cache_keys.pop(entry["cache_key"], None)
+    def image(self, key):
+        entry = self.entries[key]
+        if "image" not in entry:
+            entry["image"] = restore_image(entry.pop("packed"))
+            entry["cache_key"] = entry["image"].cacheKey()
+            self.cache_keys[entry["cache_key"]] = key
+        return QImage(entry["image"])
+    def shared_image(self, key):
+        entry = self.entries.get(key)
+        if entry is None or "image" not in entry:
+            return None
+        return QImage(entry["image"])
+    def pack(self, key, snapshot):
+        entry = self.entries.get(key)
+        if entry is not None and "image" in entry:
+            self.cache_keys.pop(entry["cache_key"], None)
+            del entry["image"]
+            entry["packed"] = snapshot
+    def size(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return 0
+        return entry["image"].sizeInBytes() if "image" in entry else len(entry["packed"]["bytes"])
+    def memory_usage(self, keys=None):
+        return sum(self.size(key) for key in (self.entries if keys is None else set(keys)))
+def image_store():
+    global _store
+    if _store is None:
+        _store = ImageStore()
+    return _store
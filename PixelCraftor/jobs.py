@@ -0,0 +1,53 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+class JobCancelled(Exception):
+    pass
+class JobSignals(QObject):
+    progress = Signal(int)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+class Job(QRunnable):
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self.is_cancelled = False
+    def cancel(self):
+        self.is_cancelled = True
+    def report(self, percent):
+        if self.is_cancelled:
+            raise JobCancelled()
+        self.signals.progress.emit(percent)
+    def run(self):
+        try:
+            self.report(0)
+            result = self.function(*self.args, progress=self.report, **self.kwargs)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+class JobManager(QObject):
+    def __init__(self, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.jobs = []
+    def start(self, job):
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *result, job=job: self.release(job))
+        self.jobs.append(job)
+        self.pool.start(job)
+        return job
+    def release(self, job):
+        if job in self.jobs:
+            self.jobs.remove(job)
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+    def wait(self):
+        self.pool.waitForDone()
@@ -192,6 +192,8 @@ class LayerManager:
                 painter.drawImage(0, 0, layer["image"])
         painter.end()
         return result
+    def memory_usage(self):
+        return sum(layer["image"].sizeInBytes() for layer in self.layers)
     def clear_layers(self):
         self.layers.clear()
         self.layer_widget.clear_layers() 
\ No newline at end of file
@@ -0,0 +1,88 @@
+TEXTS = {
+    "app_name": "PixelCraftor",
+    "ok": "OK",
+    "cancel": "Cancel",
+    "yes": "Yes",
+    "no": "No",
+    "apply": "Apply",
+    "reset": "Reset",
+    "file": "File",
+    "edit": "Edit",
+    "view": "View",
+    "settings": "Settings",
+    "help": "Help",
+    "new": "New",
+    "open": "Open...",
+    "save": "Save",
+    "save_as": "Save As...",
+    "export": "Export...",
+    "export_xbm": "Export to XBM...",
+    "import_xbm": "Import from XBM...",
+    "monochrome": "Monochrome and dithering...",
+    "export_indexed": "Export to C array (palette)...",
+    "export_color": "Export to C array (RGB565, RGB332, grayscale)...",
+    "export_font": "Export font (Adafruit GFX)...",
+    "untitled": "Untitled",
+    "bits_per_pixel": "Bits per pixel:",
+    "palette": "Palette",
+    "exit": "Exit",
+    "undo": "Undo",
+    "redo": "Redo",
+    "cut": "Cut",
+    "copy": "Copy",
+    "paste": "Paste",
+    "delete": "Delete",
+    "select_all": "Select All",
+    "clear": "Clear",
+    "zoom_in": "Zoom In",
+    "zoom_out": "Zoom Out",
+    "toggle_grid": "Toggle Grid",
+    "theme": "Theme",
+    "light_theme": "Light",
+    "dark_theme": "Dark",
+    "language": "Language",
+    "about": "About",
+    "tools": "Tools",
+    "layers": "Layers",
+    "shortcuts": "Shortcuts",
+    "pen": "Pen",
+    "eraser": "Eraser",
+    "rectangle": "Rectangle",
+    "select": "Select",
+    "fill": "Fill",
+    "eyedropper": "Eyedropper",
+    "line": "Line",
+    "text": "Text",
+    "lasso": "Lasso",
+    "magic_wand": "Magic Wand",
+    "offset": "Wrap Offset",
+    "add_layer": "Add Layer",
+    "remove_layer": "Remove Layer",
+    "move_layer_up": "Move Layer Up",
+    "move_layer_down": "Move Layer Down",
+    "background_layer": "Background Layer",
+    "open_file": "Open File",
+    "save_file": "Save File",
+    "export_file": "Export File",
+    "export_scale": "Export Scale",
+    "select_scale": "Select scale:",
+    "opening": "Opening...",
+    "saving": "Saving...",
+    "saved": "Saved",
+    "io_error": "I/O error",
+    "assets": "Files",
+    "record_session": "Record session...",
+    "recording_stopped": "Session recording stopped: the active document changed",
+    "toggle_hud": "Toggle Performance HUD",
+    "color_loss": "Color loss",
+    "color_loss_message": "The image uses {used} colors but the format holds only {limit}. Some colors will be merged. Continue?",
+    "image_operations": "Image",
+    "invert_colors": "Invert Colors",
+    "threshold": "Threshold...",
+    "threshold_level": "Threshold (0-255):",
+    "replace_color": "Replace Current Color...",
+    "offset_image": "Offset...",
+    "mirror_horizontal": "Mirror Canvas Horizontally",
+    "mirror_vertical": "Mirror Canvas Vertically",
+    "tiled_preview": "Tiled Preview 3x3",
+}
@@ -0,0 +1,88 @@
+TEXTS = {
+    "app_name": "PixelCraftor",
+    "ok": "OK",
+    "cancel": "Отмена",
+    "yes": "Да",
+    "no": "Нет",
+    "apply": "Применить",
+    "reset": "Сбросить",
+    "file": "Файл",
+    "edit": "Правка",
+    "view": "Вид",
+    "settings": "Настройки",
+    "help": "Справка",
+    "new": "Новый",
+    "open": "Открыть...",
+    "save": "Сохранить",
+    "save_as": "Сохранить как...",
+    "export": "Экспорт...",
+    "export_xbm": "Экспорт в XBM...",
+    "import_xbm": "Импорт из XBM...",
+    "monochrome": "Монохром и дизеринг...",
+    "export_indexed": "Экспорт в C-массив (палитра)...",
+    "export_color": "Экспорт в C-массив (RGB565, RGB332, серый)...",
+    "export_font": "Экспорт шрифта (Adafruit GFX)...",
+    "untitled": "Без названия",
+    "bits_per_pixel": "Бит на пиксель:",
+    "palette": "Палитра",
+    "exit": "Выход",
+    "undo": "Отменить",
+    "redo": "Повторить",
+    "cut": "Вырезать",
+    "copy": "Копировать",
+    "paste": "Вставить",
+    "delete": "Удалить",
+    "select_all": "Выделить всё",
+    "clear": "Очистить",
+    "zoom_in": "Увеличить",
+    "zoom_out": "Уменьшить",
+    "toggle_grid": "Показать/скрыть сетку",
+    "theme": "Тема",
+    "light_theme": "Светлая",
+    "dark_theme": "Темная",
+    "language": "Язык",
+    "about": "О программе",
+    "tools": "Инструменты",
+    "layers": "Слои",
+    "shortcuts": "Горячие клавиши",
+    "pen": "Карандаш",
+    "eraser": "Ластик",
+    "rectangle": "Прямоугольник",
+    "select": "Выделение",
+    "fill": "Заливка",
+    "eyedropper": "Пипетка",
+    "line": "Линия",
+    "text": "Текст",
+    "lasso": "Лассо",
+    "magic_wand": "Волшебная палочка",
+    "offset": "Сдвиг с переносом",
+    "add_layer": "Добавить слой",
+    "remove_layer": "Удалить слой",
+    "move_layer_up": "Переместить слой вверх",
+    "move_layer_down": "Переместить слой вниз",
+    "background_layer": "Фоновый слой",
+    "open_file": "Открыть файл",
+    "save_file": "Сохранить файл",
+    "export_file": "Экспорт файла",
+    "export_scale": "Масштаб экспорта",
+    "select_scale": "Выберите масштаб:",
+    "opening": "Открытие...",
+    "saving": "Сохранение...",
+    "saved": "Сохранено",
+    "io_error": "Ошибка ввода-вывода",
+    "assets": "Файлы",
+    "record_session": "Записать сессию...",
+    "recording_stopped": "Запись сессии остановлена: сменился активный документ",
+    "toggle_hud": "Показать/скрыть счетчики производительности",
+    "color_loss": "Потеря цветов",
+    "color_loss_message": "Изображение содержит {used} цветов, а формат вмещает только {limit}. Часть цветов будет объединена. Продолжить?",
+    "image_operations": "Изображение",
+    "invert_colors": "Инвертировать цвета",
+    "threshold": "Порог яркости...",
+    "threshold_level": "Порог (0-255):",
+    "replace_color": "Заменить текущий цвет...",
+    "offset_image": "Сдвиг...",
+    "mirror_horizontal": "Отразить холст по горизонтали",
+    "mirror_vertical": "Отразить холст по вертикали",
+    "tiled_preview": "Мозаичный предпросмотр 3x3",
+}
@@ -2,18 +2,20 @@ import sys
 import os
 from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QLabel, QPushButton, QColorDialog, QFileDialog,
-                             QScrollArea, QSplitter, QListWidget, QListWidgetItem, 
-                             QComboBox, QSpinBox, QToolBar, QStatusBar, QMessageBox,
-                             QDockWidget, QTabWidget)
+                             QSplitter, QListWidget, QListWidgetItem, 
+                             QComboBox, QToolBar, QStatusBar, QMessageBox,
+                             QDockWidget, QTabWidget, QInputDialog, QStackedWidget,
+                             QProgressDialog)
 from PySide6.QtGui import (QIcon, QPixmap, QImage, QPainter, QPen, QColor, QKeySequence,
                           QAction, QShortcut, QCursor, QDrag, QFont, QFontMetrics)
 from PySide6.QtCore import Qt, QSize, QPoint, QRect, QMimeData, Signal, Slot, QSettings
-from canvas import PixelCanvas
-from layers import LayerManager, LayerWidget
+from documents import DocumentManager
+from image_io import write_image, write_scaled_image
+from jobs import Job, JobManager
+from mapped_image import MappedImage
 from tools import ToolPanel
-from history import HistoryManager
 from settings import Settings
-from xbm_converter import XBMConverter
+from bitmap_font import bitmap_font
 from shortcuts import ShortcutManager, ShortcutList
 from themes import ThemeManager
 from localization import LocalizationManager
@@ -27,6 +29,8 @@ class PixelCraftor(QMainWindow):
         self.localization = LocalizationManager(self)
         self.shortcuts = ShortcutManager(self)
         self.setWindowIcon(QIcon("PixelCraftor.ico"))
+        self.jobs = JobManager(self)
+        self.recorder = None
         self.setup_ui()
         self.load_settings()
         self.setup_shortcuts()
@@ -43,37 +47,115 @@ class PixelCraftor(QMainWindow):
         self.setup_menu()
         self.setup_toolbar()
         self.setup_statusbar()
+        self.add_document(128, 64)
         self.main_splitter.setSizes([200, 600, 200])
         self.resize(1200, 800)
     def setup_layers_panel(self):
         self.layers_dock = QDockWidget(self.localization.get_text("layers"))
         self.layers_dock.setFeatures(QDockWidget.DockWidgetMovable | QDockWidget.DockWidgetFloatable)
-        self.layer_widget = LayerWidget()
-        self.layers_dock.setWidget(self.layer_widget)
+        self.layer_stack = QStackedWidget()
+        self.layers_dock.setWidget(self.layer_stack)
         self.main_splitter.addWidget(self.layers_dock)
-        self.layer_manager = LayerManager(self.layer_widget)
     def setup_canvas_area(self):
         self.canvas_container = QWidget()
         self.canvas_layout = QVBoxLayout(self.canvas_container)
-        self.canvas_scroll = QScrollArea()
-        self.canvas_scroll.setWidgetResizable(True)
-        self.canvas_scroll.setAlignment(Qt.AlignCenter)
-        self.canvas = PixelCanvas(128, 64, self)
-        self.canvas_scroll.setWidget(self.canvas)
-        self.canvas_layout.addWidget(self.canvas_scroll)
-        self.resolution_widget = ResolutionWidget(self.canvas.width, self.canvas.height)
+        self.documents = DocumentManager(self.settings.get("history_memory_mb", 256) * 1024 * 1024, self)
+        self.document_tabs = QTabWidget()
+        self.document_tabs.setTabsClosable(True)
+        self.document_tabs.setMovable(True)
+        self.document_tabs.currentChanged.connect(self.on_document_changed)
+        self.document_tabs.tabCloseRequested.connect(self.close_document)
+        self.canvas_layout.addWidget(self.document_tabs)
+        self.resolution_widget = ResolutionWidget(128, 64)
         self.resolution_widget.resolution_changed.connect(self.change_resolution)
         self.canvas_layout.addWidget(self.resolution_widget)
         self.main_splitter.addWidget(self.canvas_container)
-        self.history_manager = HistoryManager(self.canvas)
-        self.canvas.position_changed.connect(self.update_position_label)
+    def add_document(self, width, height, title=None):
+        self.untitled_count = getattr(self, "untitled_count", 0) + 1
+        title = title or f"{self.localization.get_text('untitled')} {self.untitled_count}"
+        document = self.documents.create_document(width, height, title)
+        document.canvas.position_changed.connect(self.update_position_label)
+        self.layer_stack.addWidget(document.layer_widget)
+        self.document_tabs.setCurrentIndex(self.document_tabs.addTab(document.scroll_area, document.display_name()))
+        return document
+    def on_document_changed(self, index):
+        document = self.documents.document_for_widget(self.document_tabs.widget(index))
+        if document is None:
+            return
+        if getattr(self, "canvas", None) is not None and self.canvas is not document.canvas:
+            self.canvas.set_hud_visible(False)
+        if self.recorder and self.recorder.canvas is not document.canvas:
+            self.record_action.setChecked(False)
+            self.status_bar.showMessage(self.localization.get_text("recording_stopped"), 3000)
+        self.documents.activate(document)
+        self.document = document
+        self.canvas = document.canvas
+        self.history_manager = document.history_manager
+        self.layer_manager = document.layer_manager
+        self.layer_widget = document.layer_widget
+        self.layer_stack.setCurrentWidget(document.layer_widget)
+        if self.palette_panel:
+            self.palette_panel.set_canvas(self.canvas)
+        if self.canvas.current_tool != self.tool_panel.get_current_tool():
+            self.canvas.set_tool(self.tool_panel.get_current_tool())
+        self.canvas.set_color(self.tool_panel.get_current_color())
+        self.canvas.set_symmetry(*self.tool_panel.get_symmetry())
+        self.canvas.set_grid_visible(self.grid_action.isChecked())
+        self.canvas.set_tiled(self.tiled_action.isChecked())
+        self.canvas.set_rulers_visible(self.rulers_action.isChecked())
+        self.canvas.set_hud_visible(self.hud_action.isChecked())
+        self.update_document_labels()
+    def update_document_labels(self):
+        self.canvas_size_label.setText(f"{self.canvas.width}x{self.canvas.height}")
+        self.resolution_widget.update_resolution(self.canvas.width, self.canvas.height)
+        self.document_tabs.setTabText(self.document_tabs.indexOf(self.document.scroll_area), self.document.display_name())
+    def close_document(self, index):
+        if self.document_tabs.count() <= 1:
+            return
+        widget = self.document_tabs.widget(index)
+        document = self.documents.document_for_widget(widget)
+        self.documents.remove_document(document)
+        self.document_tabs.removeTab(index)
+        self.layer_stack.removeWidget(document.layer_widget)
+        document.layer_widget.deleteLater()
+        widget.deleteLater()
     def setup_right_panel(self):
         self.right_panel = QTabWidget()
-        self.tool_panel = ToolPanel(self.canvas)
+        self.tool_panel = ToolPanel()
+        self.tool_panel.tool_changed.connect(lambda tool: self.canvas.set_tool(tool))
+        self.tool_panel.color_changed.connect(lambda color: self.canvas.set_color(color))
+        self.tool_panel.symmetry_changed.connect(lambda mode, folds: self.canvas.set_symmetry(mode, folds))
         self.right_panel.addTab(self.tool_panel, self.localization.get_text("tools"))
-        self.shortcut_list = ShortcutList()
-        self.right_panel.addTab(self.shortcut_list, self.localization.get_text("shortcuts"))
+        self.shortcut_list = None
+        self.shortcut_page = QWidget()
+        QVBoxLayout(self.shortcut_page).setContentsMargins(0, 0, 0, 0)
+        self.right_panel.addTab(self.shortcut_page, self.localization.get_text("shortcuts"))
+        self.palette_panel = None
+        self.palette_page = QWidget()
+        QVBoxLayout(self.palette_page).setContentsMargins(0, 0, 0, 0)
+        self.right_panel.addTab(self.palette_page, self.localization.get_text("palette"))
+        self.asset_browser = None
+        self.asset_page = QWidget()
+        QVBoxLayout(self.asset_page).setContentsMargins(0, 0, 0, 0)
+        self.right_panel.addTab(self.asset_page, self.localization.get_text("assets"))
+        self.right_panel.currentChanged.connect(self.build_right_panel)
         self.main_splitter.addWidget(self.right_panel)
+    def build_right_panel(self, index):
+        page = self.right_panel.widget(index)
+        if page is self.shortcut_page and self.shortcut_list is None:
+            self.shortcut_list = ShortcutList()
+            self.shortcut_list.update_shortcuts(self.shortcuts.get_shortcuts())
+            page.layout().addWidget(self.shortcut_list)
+        elif page is self.palette_page and self.palette_panel is None:
+            from palette_panel import PalettePanel
+            self.palette_panel = PalettePanel(self.canvas)
+            self.palette_panel.color_selected.connect(self.tool_panel.color_palette.set_current_color)
+            page.layout().addWidget(self.palette_panel)
+        elif page is self.asset_page and self.asset_browser is None:
+            from asset_browser import AssetBrowser
+            self.asset_browser = AssetBrowser(self.settings)
+            self.asset_browser.file_activated.connect(self.open_path)
+            page.layout().addWidget(self.asset_browser)
     def setup_menu(self):
         self.menu_bar = self.menuBar()
         self.file_menu = self.menu_bar.addMenu(self.localization.get_text("file"))
@@ -101,6 +183,15 @@ class PixelCraftor(QMainWindow):
         self.export_xbm_action = QAction(QIcon(), self.localization.get_text("export_xbm"), self)
         self.export_xbm_action.triggered.connect(self.export_xbm)
         self.file_menu.addAction(self.export_xbm_action)
+        self.export_indexed_action = QAction(QIcon(), self.localization.get_text("export_indexed"), self)
+        self.export_indexed_action.triggered.connect(self.export_indexed)
+        self.file_menu.addAction(self.export_indexed_action)
+        self.export_color_action = QAction(QIcon(), self.localization.get_text("export_color"), self)
+        self.export_color_action.triggered.connect(self.export_color)
+        self.file_menu.addAction(self.export_color_action)
+        self.export_font_action = QAction(QIcon(), self.localization.get_text("export_font"), self)
+        self.export_font_action.triggered.connect(self.export_font)
+        self.file_menu.addAction(self.export_font_action)
         self.import_xbm_action = QAction(QIcon(), self.localization.get_text("import_xbm"), self)
         self.import_xbm_action.triggered.connect(self.import_xbm)
         self.file_menu.addAction(self.import_xbm_action)
@@ -111,11 +202,11 @@ class PixelCraftor(QMainWindow):
         self.file_menu.addAction(self.exit_action)
         self.edit_menu = self.menu_bar.addMenu(self.localization.get_text("edit"))
         self.undo_action = QAction(QIcon(), self.localization.get_text("undo"), self)
-        self.undo_action.triggered.connect(self.history_manager.undo)
+        self.undo_action.triggered.connect(lambda: self.history_manager.undo())
         self.undo_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Z))
         self.edit_menu.addAction(self.undo_action)
         self.redo_action = QAction(QIcon(), self.localization.get_text("redo"), self)
-        self.redo_action.triggered.connect(self.history_manager.redo)
+        self.redo_action.triggered.connect(lambda: self.history_manager.redo())
         self.redo_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_Z))
         self.edit_menu.addAction(self.redo_action)
         self.edit_menu.addSeparator()
@@ -124,33 +215,59 @@ class PixelCraftor(QMainWindow):
         self.cut_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_X))
         self.edit_menu.addAction(self.cut_action)
         self.copy_action = QAction(QIcon(), "Копировать", self)
-        self.copy_action.triggered.connect(self.canvas.copy_selection)
+        self.copy_action.triggered.connect(lambda: self.canvas.copy_selection())
         self.copy_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_C))
         self.edit_menu.addAction(self.copy_action)
         self.paste_action = QAction(QIcon(), "Вставить", self)
-        self.paste_action.triggered.connect(self.canvas.paste)
+        self.paste_action.triggered.connect(lambda: self.canvas.paste())
         self.paste_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_V))
         self.edit_menu.addAction(self.paste_action)
         self.delete_action = QAction(QIcon(), "Удалить", self)
-        self.delete_action.triggered.connect(self.canvas.delete_selection)
+        self.delete_action.triggered.connect(lambda: self.canvas.delete_selection())
         self.delete_action.setShortcut(QKeySequence(Qt.Key_Delete))
         self.edit_menu.addAction(self.delete_action)
         self.edit_menu.addSeparator()
         self.select_all_action = QAction(QIcon(), self.localization.get_text("select_all"), self)
-        self.select_all_action.triggered.connect(self.canvas.select_all)
+        self.select_all_action.triggered.connect(lambda: self.canvas.select_all())
         self.select_all_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_A))
         self.edit_menu.addAction(self.select_all_action)
         self.clear_action = QAction(QIcon(), self.localization.get_text("clear"), self)
-        self.clear_action.triggered.connect(self.canvas.clear)
+        self.clear_action.triggered.connect(lambda: self.canvas.clear())
         self.clear_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_Delete))
         self.edit_menu.addAction(self.clear_action)
+        self.edit_menu.addSeparator()
+        self.monochrome_action = QAction(QIcon(), self.localization.get_text("monochrome"), self)
+        self.monochrome_action.triggered.connect(self.convert_to_monochrome)
+        self.edit_menu.addAction(self.monochrome_action)
+        self.image_menu = self.edit_menu.addMenu(self.localization.get_text("image_operations"))
+        self.invert_action = QAction(QIcon(), self.localization.get_text("invert_colors"), self)
+        self.invert_action.triggered.connect(lambda: self.canvas.invert_colors())
+        self.invert_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_I))
+        self.image_menu.addAction(self.invert_action)
+        self.threshold_action = QAction(QIcon(), self.localization.get_text("threshold"), self)
+        self.threshold_action.triggered.connect(self.threshold_image)
+        self.image_menu.addAction(self.threshold_action)
+        self.replace_color_action = QAction(QIcon(), self.localization.get_text("replace_color"), self)
+        self.replace_color_action.triggered.connect(self.replace_current_color)
+        self.image_menu.addAction(self.replace_color_action)
+        self.offset_action = QAction(QIcon(), self.localization.get_text("offset_image"), self)
+        self.offset_action.triggered.connect(self.offset_image)
+        self.offset_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_O))
+        self.image_menu.addAction(self.offset_action)
+        self.image_menu.addSeparator()
+        self.mirror_h_action = QAction(QIcon(), self.localization.get_text("mirror_horizontal"), self)
+        self.mirror_h_action.triggered.connect(lambda: self.canvas.mirror_image(True))
+        self.image_menu.addAction(self.mirror_h_action)
+        self.mirror_v_action = QAction(QIcon(), self.localization.get_text("mirror_vertical"), self)
+        self.mirror_v_action.triggered.connect(lambda: self.canvas.mirror_image(False))
+        self.image_menu.addAction(self.mirror_v_action)
         self.view_menu = self.menu_bar.addMenu(self.localization.get_text("view"))
         self.zoom_in_action = QAction(QIcon(), self.localization.get_text("zoom_in"), self)
-        self.zoom_in_action.triggered.connect(self.canvas.zoom_in)
+        self.zoom_in_action.triggered.connect(lambda: self.canvas.zoom_in())
         self.zoom_in_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Plus))
         self.view_menu.addAction(self.zoom_in_action)
         self.zoom_out_action = QAction(QIcon(), self.localization.get_text("zoom_out"), self)
-        self.zoom_out_action.triggered.connect(self.canvas.zoom_out)
+        self.zoom_out_action.triggered.connect(lambda: self.canvas.zoom_out())
         self.zoom_out_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Minus))
         self.view_menu.addAction(self.zoom_out_action)
         self.view_menu.addSeparator()
@@ -160,23 +277,33 @@ class PixelCraftor(QMainWindow):
         self.grid_action.triggered.connect(self.toggle_grid)
         self.grid_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_G))
         self.view_menu.addAction(self.grid_action)
+        self.tiled_action = QAction(QIcon(), self.localization.get_text("tiled_preview"), self)
+        self.tiled_action.setCheckable(True)
+        self.tiled_action.triggered.connect(lambda checked: self.canvas.set_tiled(checked))
+        self.tiled_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_T))
+        self.view_menu.addAction(self.tiled_action)
         self.rulers_action = QAction(QIcon(), "Показать/скрыть линейки", self)
         self.rulers_action.setCheckable(True)
         self.rulers_action.setChecked(True)
         self.rulers_action.triggered.connect(self.toggle_rulers)
         self.rulers_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_R))
         self.view_menu.addAction(self.rulers_action)
+        self.hud_action = QAction(QIcon(), self.localization.get_text("toggle_hud"), self)
+        self.hud_action.setCheckable(True)
+        self.hud_action.toggled.connect(lambda checked: self.canvas.set_hud_visible(checked))
+        self.hud_action.setShortcut(QKeySequence(Qt.Key_F3))
+        self.view_menu.addAction(self.hud_action)
         self.clear_guides_action = QAction(QIcon(), "Очистить направляющие", self)
-        self.clear_guides_action.triggered.connect(self.canvas.clear_guides)
+        self.clear_guides_action.triggered.connect(lambda: self.canvas.clear_guides())
         self.clear_guides_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_G))
         self.view_menu.addAction(self.clear_guides_action)
         self.transform_menu = self.menu_bar.addMenu("Трансформация")
         self.flip_h_action = QAction(QIcon(), "Отразить по горизонтали", self)
-        self.flip_h_action.triggered.connect(self.canvas.flip_selection_horizontal)
+        self.flip_h_action.triggered.connect(lambda: self.canvas.flip_selection_horizontal())
         self.flip_h_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.Key_H))
         self.transform_menu.addAction(self.flip_h_action)
         self.flip_v_action = QAction(QIcon(), "Отразить по вертикали", self)
-        self.flip_v_action.triggered.connect(self.canvas.flip_selection_vertical)
+        self.flip_v_action.triggered.connect(lambda: self.canvas.flip_selection_vertical())
         self.flip_v_action.setShortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_V))
         self.transform_menu.addAction(self.flip_v_action)
         self.rotate_cw_action = QAction(QIcon(), "Повернуть на 90° по часовой", self)
@@ -214,6 +341,11 @@ class PixelCraftor(QMainWindow):
         self.english_action = QAction(QIcon(), "English", self)
         self.english_action.triggered.connect(lambda: self.localization.set_language("en"))
         self.language_menu.addAction(self.english_action)
+        self.settings_menu.addSeparator()
+        self.record_action = QAction(QIcon(), self.localization.get_text("record_session"), self)
+        self.record_action.setCheckable(True)
+        self.record_action.toggled.connect(self.toggle_recording)
+        self.settings_menu.addAction(self.record_action)
     def setup_toolbar(self):
         self.toolbar = QToolBar("Main Toolbar")
         self.addToolBar(self.toolbar)
@@ -231,17 +363,17 @@ class PixelCraftor(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.position_label = QLabel()
         self.status_bar.addWidget(self.position_label)
-        self.canvas_size_label = QLabel(f"{self.canvas.width}x{self.canvas.height}")
+        self.canvas_size_label = QLabel()
         self.status_bar.addPermanentWidget(self.canvas_size_label)
     def setup_shortcuts(self):
-        self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Delete), self.canvas.delete_selection)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Backspace), self.canvas.delete_selection)
+        self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Delete), lambda: self.canvas.delete_selection())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Backspace), lambda: self.canvas.delete_selection())
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_X), self.cut_selection)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_C), self.canvas.copy_selection)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_V), self.canvas.paste)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_A), self.canvas.select_all)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Z), self.history_manager.undo)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_Z), self.history_manager.redo)
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_C), lambda: self.canvas.copy_selection())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_V), lambda: self.canvas.paste())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_A), lambda: self.canvas.select_all())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Z), lambda: self.history_manager.undo())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_Z), lambda: self.history_manager.redo())
         self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Left), lambda: self.canvas.move_selection(-1, 0))
         self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Right), lambda: self.canvas.move_selection(1, 0))
         self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Up), lambda: self.canvas.move_selection(0, -1))
@@ -250,14 +382,14 @@ class PixelCraftor(QMainWindow):
         self.shortcuts.register_shortcut(QKeySequence(Qt.ShiftModifier | Qt.Key_Right), lambda: self.canvas.move_selection(10, 0))
         self.shortcuts.register_shortcut(QKeySequence(Qt.ShiftModifier | Qt.Key_Up), lambda: self.canvas.move_selection(0, -10))
         self.shortcuts.register_shortcut(QKeySequence(Qt.ShiftModifier | Qt.Key_Down), lambda: self.canvas.move_selection(0, 10))
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Up), self.layer_manager.move_layer_up)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Down), self.layer_manager.move_layer_down)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Plus), self.canvas.zoom_in)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Minus), self.canvas.zoom_out)
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Up), lambda: self.layer_manager.move_layer_up())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Down), lambda: self.layer_manager.move_layer_down())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Plus), lambda: self.canvas.zoom_in())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_Minus), lambda: self.canvas.zoom_out())
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_G), lambda: self.toggle_grid_shortcut())
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_R), lambda: self.toggle_rulers_shortcut())
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_H), self.canvas.flip_selection_horizontal)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_V), self.canvas.flip_selection_vertical)
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_H), lambda: self.canvas.flip_selection_horizontal())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_V), lambda: self.canvas.flip_selection_vertical())
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.AltModifier | Qt.Key_R), lambda: self.canvas.rotate_selection(90))
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.AltModifier | Qt.Key_R), lambda: self.canvas.rotate_selection(-90))
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_Plus), lambda: self.canvas.scale_selection(1.2, 1.2))
@@ -267,8 +399,9 @@ class PixelCraftor(QMainWindow):
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_S), self.save_file)
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.ShiftModifier | Qt.Key_S), self.save_file_as)
         self.shortcuts.register_shortcut(QKeySequence(Qt.ControlModifier | Qt.Key_E), self.export_image)
-        self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Escape), self.canvas.reset_selection)
-        self.shortcut_list.update_shortcuts(self.shortcuts.get_shortcuts())
+        self.shortcuts.register_shortcut(QKeySequence(Qt.Key_Escape), lambda: self.canvas.reset_selection())
+        if self.shortcut_list:
+            self.shortcut_list.update_shortcuts(self.shortcuts.get_shortcuts())
     def toggle_grid_shortcut(self):
         self.grid_action.setChecked(not self.grid_action.isChecked())
         self.toggle_grid()
@@ -295,44 +428,110 @@ class PixelCraftor(QMainWindow):
     def new_file(self):
         dialog = ResolutionDialog(self.canvas.width, self.canvas.height, self)
         def on_resolution_selected(width, height):
-            self.canvas.resize_canvas(width, height)
-            self.canvas.clear()
-            self.layer_manager.clear_layers()
-            self.layer_manager.add_layer(self.localization.get_text("background_layer"))
-            self.history_manager.clear_history()
-            self.canvas_size_label.setText(f"{width}x{height}")
-            self.resolution_widget.update_resolution(width, height)
+            document = self.add_document(width, height)
+            document.layer_manager.add_layer(self.localization.get_text("background_layer"))
+            document.history_manager.clear_history()
         dialog.resolution_changed.connect(on_resolution_selected)
         dialog.exec()
+    def start_job(self, label, job, on_finished=None):
+        dialog = QProgressDialog(label, self.localization.get_text("cancel"), 0, 100, self)
+        dialog.setWindowModality(Qt.NonModal)
+        dialog.setMinimumDuration(300)
+        dialog.canceled.connect(job.cancel)
+        job.signals.progress.connect(dialog.setValue)
+        if on_finished:
+            job.signals.finished.connect(on_finished)
+        job.signals.failed.connect(lambda message: QMessageBox.warning(self, self.localization.get_text("io_error"), message))
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *args: dialog.deleteLater())
+        self.jobs.start(job)
+        return job
     def open_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             self.localization.get_text("open_file"),
             "",
-            "Images (*.png *.jpg *.bmp *.webp *.pbm *.tga *.ico);;All Files (*)"
+            "Images (*.png *.jpg *.bmp *.webp *.pbm *.tga *.ico *.pcraw);;All Files (*)"
         )
         if file_path:
-            self.canvas.load_image(file_path)
-            self.canvas_size_label.setText(f"{self.canvas.width}x{self.canvas.height}")
-            self.resolution_widget.update_resolution(self.canvas.width, self.canvas.height)
+            self.open_path(file_path)
+    def open_path(self, file_path):
+        from asset_browser import read_asset
+        from image_io import stream_size
+        size = stream_size(file_path)
+        if size:
+            self.stream_path(file_path, size)
+            return
+        self.start_job(self.localization.get_text("opening"), Job(read_asset, file_path),
+                       lambda image: self.open_image(file_path, image))
+    def stream_path(self, file_path, size):
+        from image_io import stream_image
+        from pixel_buffer import DOCUMENT_FORMAT, image_to_array
+        image = QImage(size, DOCUMENT_FORMAT)
+        image.fill(Qt.transparent)
+        pixels = image_to_array(image)
+        document = self.add_document(1, 1, os.path.basename(file_path))
+        document.canvas.show_partial_image(image)
+        self.update_document_labels()
+        job = Job(stream_image, file_path, pixels)
+        job.signals.progress.connect(lambda value: document.canvas.partial_image_updated())
+        for signal in (job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *args: self.finish_stream(document, None, image))
+        self.start_job(self.localization.get_text("opening"), job,
+                       lambda result: self.finish_stream(document, file_path, image))
+    def finish_stream(self, document, file_path, image):
+        if document not in self.documents.documents:
+            return
+        document.canvas.set_read_only(False)
+        document.canvas.set_image(image)
+        document.history_manager.clear_history()
+        self.update_document_labels()
+        if file_path:
+            self.add_recent_file(file_path)
+    def add_recent_file(self, file_path):
+        self.settings.add_recent_file(os.path.abspath(file_path))
+        if self.asset_browser and self.asset_browser.directory is None:
+            self.asset_browser.show_recent()
+    def open_image(self, file_path, image):
+        if image is None:
+            QMessageBox.warning(self, self.localization.get_text("io_error"), file_path)
+            return
+        if isinstance(image, MappedImage):
+            document = self.add_document(1, 1, os.path.basename(file_path))
+            document.canvas.set_mapped_image(image)
+        else:
+            document = self.add_document(image.width(), image.height(), os.path.basename(file_path))
+            document.canvas.set_image(image)
+        document.history_manager.clear_history()
+        self.update_document_labels()
+        self.add_recent_file(file_path)
     def save_file(self):
-        if not hasattr(self, "current_file") or not self.current_file:
+        if not self.document.file_path:
             self.save_file_as()
         else:
-            self.canvas.save_image(self.current_file)
+            self.save_snapshot(self.document.file_path)
     def save_file_as(self):
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             self.localization.get_text("save_file"),
             "",
-            "PNG (*.png);;BMP (*.bmp);;JPEG (*.jpg);;WEBP (*.webp);;PBM (*.pbm);;TGA (*.tga);;ICO (*.ico)"
+            "PNG (*.png);;BMP (*.bmp);;JPEG (*.jpg);;WEBP (*.webp);;PBM (*.pbm);;TGA (*.tga);;ICO (*.ico);;PixelCraftor Raw (*.pcraw)"
         )
         if file_path:
-            self.current_file = file_path
-            self.canvas.save_image(file_path)
+            self.document.file_path = file_path
+            self.save_snapshot(file_path)
+            self.update_document_labels()
+    def snapshot(self):
+        return self.canvas.snapshot()
+    def save_snapshot(self, file_path):
+        self.start_job(self.localization.get_text("saving"), Job(write_image, self.snapshot(), file_path),
+                       self.show_saved)
+    def show_saved(self, file_path):
+        self.add_recent_file(file_path)
+        self.status_bar.showMessage(f"{self.localization.get_text('saved')}: {file_path}", 3000)
     def export_image(self):
-        scale, ok = QSpinBox.getInt(
-            None, 
+        scale, ok = QInputDialog.getInt(
+            self,
             self.localization.get_text("export_scale"),
             self.localization.get_text("select_scale"),
             1, 1, 16, 1
@@ -344,9 +543,14 @@ class PixelCraftor(QMainWindow):
                 "",
                 "PNG (*.png);;BMP (*.bmp);;JPEG (*.jpg);;WEBP (*.webp);;PBM (*.pbm);;TGA (*.tga);;ICO (*.ico)"
             )
+            if file_path and file_path.lower().endswith(".pbm") and not self.confirm_color_loss(2):
+                return
             if file_path:
-                self.canvas.export_image(file_path, scale)
+                self.start_job(self.localization.get_text("saving"),
+                               Job(write_scaled_image, self.snapshot(), file_path, scale), self.show_saved)
     def export_xbm(self):
+        from dither_dialog import DitherDialog
+        from xbm_converter import XBMConverter
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             self.localization.get_text("export_xbm"),
@@ -354,11 +558,96 @@ class PixelCraftor(QMainWindow):
             "XBM (*.xbm);;C Header (*.h);;Text (*.txt)"
         )
         if file_path:
-            xbm_converter = XBMConverter()
-            xbm_data = xbm_converter.image_to_xbm(self.canvas.get_image())
+            self.canvas.commit_selection()
+            if not self.confirm_color_loss(2):
+                return
+            dialog = DitherDialog(self.canvas.get_image(), self, allow_legacy=True)
+            if not dialog.exec():
+                return
+            job = Job(XBMConverter().save_xbm, file_path, self.snapshot(), dither=dialog.method(),
+                      threshold=dialog.threshold())
+            self.start_job(self.localization.get_text("saving"), job, self.show_saved)
+    def export_indexed(self):
+        from c_array import CArrayExporter
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.localization.get_text("export_indexed"),
+            "",
+            "C Header (*.h);;Text (*.txt)"
+        )
+        if not file_path:
+            return
+        self.canvas.commit_selection()
+        palette = self.canvas.palette()
+        default = next((i for i, bpp in enumerate((1, 2, 4, 8)) if len(palette) <= 1 << bpp), 2)
+        bpp, ok = QInputDialog.getItem(self, self.localization.get_text("export_indexed"),
+                                       self.localization.get_text("bits_per_pixel"),
+                                       ["1", "2", "4", "8"], default, False)
+        if not ok or not self.confirm_color_loss(1 << int(bpp)):
+            return
+        job = Job(CArrayExporter().save_indexed, file_path, self.snapshot(), bpp=int(bpp))
+        self.start_job(self.localization.get_text("saving"), job, self.show_saved)
+    def export_color(self):
+        from c_array import CArrayExporter, COLOR_FORMAT_BPP
+        from c_export_dialog import CArrayExportDialog
+        dialog = CArrayExportDialog(self)
+        if not dialog.exec():
+            return
+        self.canvas.commit_selection()
+        if not self.confirm_color_loss(1 << COLOR_FORMAT_BPP[dialog.color_format()]):
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.localization.get_text("export_color"),
+            "",
+            "C Header (*.h);;Text (*.txt)"
+        )
+        if file_path:
+            job = Job(CArrayExporter().save_color, file_path, self.snapshot(), color_format=dialog.color_format(),
+                      dither=dialog.dither(), formatter=dialog.formatter())
+            self.start_job(self.localization.get_text("saving"), job, self.show_saved)
+    def export_font(self):
+        if not self.canvas.choose_font():
+            return
+        font = bitmap_font(self.canvas.text_font)
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.localization.get_text("export_font"),
+            f"{font.gfx_name()}.h",
+            "C Header (*.h);;Text (*.txt)"
+        )
+        if file_path:
             with open(file_path, 'w') as f:
-                f.write(xbm_data)
+                font.write_gfx(f)
+    def confirm_color_loss(self, limit):
+        used = self.canvas.used_color_count()
+        if used is None or used <= limit:
+            return True
+        answer = QMessageBox.question(self, self.localization.get_text("color_loss"),
+                                      self.localization.get_text("color_loss_message").format(used=used, limit=limit))
+        return answer == QMessageBox.Yes
+    def convert_to_monochrome(self):
+        from dither_dialog import DitherDialog
+        self.canvas.commit_selection()
+        dialog = DitherDialog(self.canvas.get_image(), self)
+        if dialog.exec():
+            self.canvas.replace_image(dialog.get_result_image())
+    def threshold_image(self):
+        level, ok = QInputDialog.getInt(self, self.localization.get_text("threshold"),
+                                        self.localization.get_text("threshold_level"), 128, 0, 255, 1)
+        if ok:
+            self.canvas.threshold_image(level)
+    def replace_current_color(self):
+        color = QColorDialog.getColor(self.canvas.current_color, self, self.localization.get_text("replace_color"))
+        if color.isValid():
+            self.canvas.replace_color(self.canvas.pixel_for_color(self.canvas.current_color), color)
+    def offset_image(self):
+        from offset_dialog import OffsetDialog
+        dialog = OffsetDialog(self.canvas.width, self.canvas.height, self)
+        if dialog.exec():
+            self.canvas.offset_image(*dialog.offset(), dialog.wrap())
     def import_xbm(self):
+        from xbm_converter import XBMConverter
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             self.localization.get_text("import_xbm"),
@@ -372,13 +661,28 @@ class PixelCraftor(QMainWindow):
             image = xbm_converter.xbm_to_image(xbm_data)
             if image:
                 self.canvas.set_image(image)
-                self.canvas_size_label.setText(f"{self.canvas.width}x{self.canvas.height}")
+                self.update_document_labels()
+    def toggle_recording(self, checked):
+        if not checked:
+            if self.recorder:
+                self.recorder.stop()
+                self.recorder = None
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, self.localization.get_text("record_session"), "",
+                                                   "Event Log (*.pcev)")
+        if not file_path:
+            self.record_action.setChecked(False)
+            return
+        from event_log import EventRecorder
+        self.recorder = EventRecorder(self.canvas, file_path, self)
     def closeEvent(self, event):
+        self.record_action.setChecked(False)
+        self.jobs.wait()
         self.save_settings()
         event.accept()
     def change_resolution(self, width, height):
         self.canvas.resize_canvas(width, height)
-        self.canvas_size_label.setText(f"{width}x{height}")
+        self.update_document_labels()
     def update_position_label(self, x, y):
         self.position_label.setText(f"X: {x}, Y: {y}")
     def cut_selection(self):
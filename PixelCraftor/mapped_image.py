@@ -0,0 +1,59 @@
+import os
+import struct
+import numpy as np
+from PySide6.QtGui import QImage
+from image_io import replace_file, report
+from pixel_buffer import DOCUMENT_FORMAT, array_to_image
+MAGIC = b"PCRW"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")
+HEADER_SIZE = 64
+RAW_EXTENSION = ".pcraw"
+STRIP_ROWS = 256
+def is_raw_path(file_path):
+    return file_path.lower().endswith(RAW_EXTENSION)
+def read_header(file_path):
+    with open(file_path, "rb") as f:
+        magic, version, _, width, height, stride = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise IOError(f"Неизвестный формат файла: {file_path}")
+    if stride < width * 4 or os.path.getsize(file_path) < HEADER_SIZE + stride * height:
+        raise IOError(f"Файл поврежден или обрезан: {file_path}")
+    return width, height, stride
+class MappedImage:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.width, self.height, self.stride = read_header(file_path)
+        self.file = open(file_path, "rb")
+        self.pixels = self.map("c")
+        self.image = self.view()
+    def map(self, mode):
+        return np.memmap(self.file, dtype=np.uint32, mode=mode, offset=HEADER_SIZE, shape=(self.height, self.stride // 4))
+    def view(self):
+        return QImage(self.pixels.data, self.width, self.height, self.stride, DOCUMENT_FORMAT)
+    def original(self):
+        return self.map("r")[:, :self.width]
+    def snapshot(self, tiles):
+        pixels = self.map("c")
+        for (rows, columns), data in tiles:
+            pixels[rows, columns] = data
+        return QImage(pixels.data, self.width, self.height, self.stride, DOCUMENT_FORMAT)
+    def owns(self, image):
+        bits = np.frombuffer(image.constBits(), dtype=np.uint8)
+        return bits.ctypes.data == self.pixels.ctypes.data
+    def preview(self, size):
+        step = max(1, -(-max(self.width, self.height) // size))
+        return array_to_image(self.pixels[::step, :self.width:step])
+def write_raw(image, file_path, progress=None):
+    if image.format() != DOCUMENT_FORMAT:
+        image = image.convertToFormat(DOCUMENT_FORMAT)
+    width, height = image.width(), image.height()
+    pixels = np.frombuffer(image.constBits(), dtype=np.uint32).reshape(height, image.bytesPerLine() // 4)[:, :width]
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, width, height, width * 4).ljust(HEADER_SIZE, b"\0"))
+            for top in range(0, height, STRIP_ROWS):
+                f.write(np.ascontiguousarray(pixels[top:top + STRIP_ROWS]).tobytes())
+                report(progress, 10 + 85 * top // max(1, height))
+    replace_file(file_path, write, progress)
+    return file_path
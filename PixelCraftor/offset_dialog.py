@@ -0,0 +1,39 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QSpinBox, QGridLayout, QCheckBox)
+class OffsetDialog(QDialog):
+    def __init__(self, width, height, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Сдвиг изображения")
+        self.setMinimumWidth(260)
+        self.setup_ui(width, height)
+    def setup_ui(self, width, height):
+        layout = QVBoxLayout()
+        grid_layout = QGridLayout()
+        grid_layout.addWidget(QLabel("По горизонтали:"), 0, 0)
+        self.dx_spin = QSpinBox()
+        self.dx_spin.setRange(-width, width)
+        self.dx_spin.setValue(width // 2)
+        grid_layout.addWidget(self.dx_spin, 0, 1)
+        grid_layout.addWidget(QLabel("По вертикали:"), 1, 0)
+        self.dy_spin = QSpinBox()
+        self.dy_spin.setRange(-height, height)
+        self.dy_spin.setValue(height // 2)
+        grid_layout.addWidget(self.dy_spin, 1, 1)
+        self.wrap_check = QCheckBox("С переносом через край")
+        self.wrap_check.setChecked(True)
+        grid_layout.addWidget(self.wrap_check, 2, 0, 1, 2)
+        layout.addLayout(grid_layout)
+        buttons_layout = QHBoxLayout()
+        self.cancel_button = QPushButton("Отмена")
+        self.cancel_button.clicked.connect(self.reject)
+        self.ok_button = QPushButton("ОК")
+        self.ok_button.clicked.connect(self.accept)
+        self.ok_button.setDefault(True)
+        buttons_layout.addWidget(self.cancel_button)
+        buttons_layout.addWidget(self.ok_button)
+        layout.addLayout(buttons_layout)
+        self.setLayout(layout)
+    def offset(self):
+        return self.dx_spin.value(), self.dy_spin.value()
+    def wrap(self):
+        return self.wrap_check.isChecked()
@@ -0,0 +1,196 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QColorDialog,
+                             QLabel, QGridLayout, QGroupBox, QComboBox, QSpinBox, QListWidget, QListWidgetItem)
+from PySide6.QtGui import QIcon, QPixmap, QColor
+from PySide6.QtCore import Qt, Signal, QSize
+from quantize import PRESET_PALETTES, swap_palette
+class PalettePanel(QWidget):
+    color_selected = Signal(QColor)
+    COLUMNS = 8
+    USED_LIMIT = 256
+    def __init__(self, canvas=None, parent=None):
+        super().__init__(parent)
+        self.canvas = None
+        self.selected_index = -1
+        self.preview_original = None
+        self.setup_ui()
+        if canvas:
+            self.set_canvas(canvas)
+    def set_canvas(self, canvas):
+        if self.canvas is canvas:
+            return
+        if self.canvas:
+            self.revert_preview()
+            self.canvas.canvas_changed.disconnect(self.refresh)
+            self.canvas.pixel_picked.disconnect(self.select_pixel)
+        self.canvas = canvas
+        self.selected_index = -1
+        self.canvas.canvas_changed.connect(self.refresh)
+        self.canvas.pixel_picked.connect(self.select_pixel)
+        self.refresh()
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        mode_group = QGroupBox("Индексированный режим")
+        mode_layout = QGridLayout(mode_group)
+        mode_layout.addWidget(QLabel("Цветов:"), 0, 0)
+        self.colors_spin = QSpinBox()
+        self.colors_spin.setRange(2, 256)
+        self.colors_spin.setValue(16)
+        mode_layout.addWidget(self.colors_spin, 0, 1)
+        mode_layout.addWidget(QLabel("Метод:"), 1, 0)
+        self.method_combo = QComboBox()
+        self.method_combo.addItem("Медианное сечение", "median_cut")
+        self.method_combo.addItem("K-средних", "kmeans")
+        mode_layout.addWidget(self.method_combo, 1, 1)
+        self.index_button = QPushButton("Индексировать")
+        self.index_button.clicked.connect(self.convert_to_indexed)
+        mode_layout.addWidget(self.index_button, 2, 0)
+        self.rgb_button = QPushButton("RGB")
+        self.rgb_button.clicked.connect(lambda: self.canvas.convert_to_rgb())
+        mode_layout.addWidget(self.rgb_button, 2, 1)
+        layout.addWidget(mode_group)
+        self.palette_group = QGroupBox("Палитра документа")
+        self.swatch_layout = QGridLayout(self.palette_group)
+        self.swatch_layout.setSpacing(2)
+        layout.addWidget(self.palette_group)
+        self.edit_button = QPushButton("Изменить цвет...")
+        self.edit_button.clicked.connect(self.edit_selected_color)
+        layout.addWidget(self.edit_button)
+        used_group = QGroupBox("Используемые цвета")
+        used_layout = QVBoxLayout(used_group)
+        self.used_label = QLabel()
+        used_layout.addWidget(self.used_label)
+        self.used_list = QListWidget()
+        self.used_list.setIconSize(QSize(16, 16))
+        self.used_list.itemClicked.connect(self.select_used_color)
+        self.used_list.currentItemChanged.connect(lambda current, previous: self.update_replace_button())
+        used_layout.addWidget(self.used_list)
+        self.replace_button = QPushButton("Заменить цвет...")
+        self.replace_button.clicked.connect(self.replace_used_color)
+        used_layout.addWidget(self.replace_button)
+        layout.addWidget(used_group)
+        swap_group = QGroupBox("Замена палитры")
+        swap_layout = QVBoxLayout(swap_group)
+        self.preset_combo = QComboBox()
+        self.preset_combo.addItem("Выберите...")
+        for name in PRESET_PALETTES:
+            self.preset_combo.addItem(name)
+        self.preset_combo.currentIndexChanged.connect(self.preview_preset)
+        swap_layout.addWidget(self.preset_combo)
+        buttons_layout = QHBoxLayout()
+        self.apply_button = QPushButton("Применить")
+        self.apply_button.clicked.connect(self.apply_preview)
+        buttons_layout.addWidget(self.apply_button)
+        self.revert_button = QPushButton("Отменить")
+        self.revert_button.clicked.connect(self.revert_preview)
+        buttons_layout.addWidget(self.revert_button)
+        swap_layout.addLayout(buttons_layout)
+        layout.addWidget(swap_group)
+        layout.addStretch()
+    def refresh(self):
+        while self.swatch_layout.count():
+            swatch = self.swatch_layout.takeAt(0).widget()
+            swatch.setParent(None)
+            swatch.deleteLater()
+        palette = self.canvas.palette()
+        for index, rgba in enumerate(palette):
+            button = QPushButton()
+            button.setFixedSize(20, 20)
+            button.setCheckable(True)
+            button.setChecked(index == self.selected_index)
+            pixmap = QPixmap(16, 16)
+            pixmap.fill(QColor.fromRgba(rgba))
+            button.setIcon(QIcon(pixmap))
+            button.setIconSize(QSize(16, 16))
+            button.setToolTip(f"{index}: #{rgba:08x}")
+            button.clicked.connect(lambda checked, i=index: self.select_swatch(i))
+            self.swatch_layout.addWidget(button, index // self.COLUMNS, index % self.COLUMNS)
+        indexed = self.canvas.is_indexed()
+        self.rgb_button.setEnabled(indexed)
+        self.edit_button.setEnabled(indexed and 0 <= self.selected_index < len(palette))
+        self.preset_combo.setEnabled(indexed)
+        self.apply_button.setEnabled(self.preview_original is not None)
+        self.revert_button.setEnabled(self.preview_original is not None)
+        self.refresh_used_colors()
+    def refresh_used_colors(self):
+        if not self.isVisible():
+            return
+        selected = self.used_list.currentItem().data(Qt.UserRole) if self.used_list.currentItem() else None
+        self.used_list.clear()
+        colors = self.canvas.used_colors(self.USED_LIMIT)
+        if colors is None:
+            self.used_label.setText("Недоступно для отображаемых в память документов")
+            self.update_replace_button()
+            return
+        total = self.canvas.used_color_count()
+        self.used_label.setText(f"Цветов: {total}" + (f" (показаны {self.USED_LIMIT})" if total > self.USED_LIMIT else ""))
+        for value, count in colors:
+            color = self.canvas.color_for_pixel(value)
+            pixmap = QPixmap(16, 16)
+            pixmap.fill(color)
+            item = QListWidgetItem(QIcon(pixmap), f"#{color.rgba():08x}  {count} пикс.")
+            item.setData(Qt.UserRole, value)
+            self.used_list.addItem(item)
+            if value == selected:
+                self.used_list.setCurrentItem(item)
+        self.update_replace_button()
+    def update_replace_button(self):
+        self.replace_button.setEnabled(self.used_list.currentItem() is not None)
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_used_colors()
+    def select_used_color(self, item):
+        self.color_selected.emit(self.canvas.color_for_pixel(item.data(Qt.UserRole)))
+    def select_pixel(self, value):
+        if self.canvas.is_indexed():
+            self.selected_index = value
+            self.refresh()
+        for row in range(self.used_list.count()):
+            if self.used_list.item(row).data(Qt.UserRole) == value:
+                self.used_list.setCurrentRow(row)
+                break
+    def replace_used_color(self):
+        item = self.used_list.currentItem()
+        if item is None:
+            return
+        value = item.data(Qt.UserRole)
+        color = QColorDialog.getColor(self.canvas.color_for_pixel(value), self)
+        if color.isValid():
+            self.canvas.replace_color(value, color)
+    def convert_to_indexed(self):
+        self.preview_original = None
+        self.canvas.convert_to_indexed(self.colors_spin.value(), self.method_combo.currentData())
+    def select_swatch(self, index):
+        self.selected_index = index
+        self.color_selected.emit(QColor.fromRgba(self.canvas.palette()[index]))
+        self.refresh()
+    def edit_selected_color(self):
+        palette = self.canvas.palette()
+        if not 0 <= self.selected_index < len(palette):
+            return
+        color = QColorDialog.getColor(QColor.fromRgba(palette[self.selected_index]), self)
+        if color.isValid():
+            palette[self.selected_index] = color.rgba()
+            self.canvas.set_palette(palette)
+    def preview_preset(self, index):
+        if index <= 0 or not self.canvas.is_indexed():
+            return
+        if self.preview_original is None:
+            self.preview_original = self.canvas.palette()
+        preset = PRESET_PALETTES[self.preset_combo.itemText(index)]
+        self.canvas.set_palette(swap_palette(self.preview_original, preset), save=False)
+        self.refresh()
+    def apply_preview(self):
+        if self.preview_original is None:
+            return
+        preview = self.canvas.palette()
+        self.canvas.set_palette(self.preview_original, save=False)
+        self.preview_original = None
+        self.preset_combo.setCurrentIndex(0)
+        self.canvas.set_palette(preview)
+    def revert_preview(self):
+        if self.preview_original is None:
+            return
+        self.canvas.set_palette(self.preview_original, save=False)
+        self.preview_original = None
+        self.preset_combo.setCurrentIndex(0)
+        self.refresh()
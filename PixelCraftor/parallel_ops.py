@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+MAX_WORKERS = os.cpu_count() or 1
+MIN_BAND_ROWS = 16
+BAND_PIXELS = 1 << 20
+MIN_PARALLEL_PIXELS = 512 * 512
+_executor = None
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="pixel-ops")
+    return _executor
+def row_bands(height, width, workers=None):
+    workers = MAX_WORKERS if workers is None else max(1, workers)
+    if height * width < MIN_PARALLEL_PIXELS:
+        workers = 1
+    count = max(workers, -(-height * width // BAND_PIXELS))
+    count = max(1, min(count, height // MIN_BAND_ROWS))
+    edges = np.linspace(0, height, count + 1).astype(int)
+    return [slice(int(top), int(bottom)) for top, bottom in zip(edges[:-1], edges[1:])]
+def run_bands(kernel, height, width, workers=None):
+    bands = row_bands(height, width, workers)
+    workers = min(len(bands), MAX_WORKERS if workers is None else max(1, workers))
+    if workers == 1:
+        return [kernel(rows) for rows in bands]
+    groups = [bands[index::workers] for index in range(workers)]
+    results = executor().map(lambda group: [kernel(rows) for rows in group], groups)
+    return [result for group in results for result in group]
+def invert(pixels, workers=None):
+    def kernel(rows):
+        band = pixels[rows]
+        alpha = band >> 24
+        band[:] = (band & 0xFF000000) | (alpha * 0x010101 - (band & 0xFFFFFF))
+    run_bands(kernel, *pixels.shape, workers)
+def threshold(pixels, level=128, workers=None):
+    def kernel(rows):
+        band = pixels[rows]
+        channels = band.view(np.uint8).reshape(band.shape + (4,))
+        luminance = channels[..., 2] * np.uint32(299) + channels[..., 1] * np.uint32(587) + channels[..., 0] * np.uint32(114)
+        alpha = channels[..., 3].astype(np.uint32)
+        white = luminance * 255 >= alpha * (level * 1000)
+        band[:] = (alpha << 24) | (alpha * 0x010101) * white
+    run_bands(kernel, *pixels.shape, workers)
+def replace(pixels, old, new, workers=None):
+    def kernel(rows):
+        band = pixels[rows]
+        matches = band == old
+        band[matches] = new
+        return int(np.count_nonzero(matches))
+    return sum(run_bands(kernel, *pixels.shape, workers))
+def offset(target, source, dx, dy, wrap=True, fill=0, workers=None):
+    height, width = source.shape
+    def kernel(rows):
+        lines = np.arange(rows.start, rows.stop) - dy
+        if wrap:
+            target[rows] = np.roll(source[lines % height], dx, axis=1)
+            return
+        target[rows] = fill
+        valid = (lines >= 0) & (lines < height)
+        left, right = max(0, dx), min(width, width + dx)
+        if left < right:
+            target[rows][valid, left:right] = source[lines[valid], left - dx:right - dx]
+    run_bands(kernel, height, width, workers)
+def mirror(target, source, horizontal=True, workers=None):
+    height, width = source.shape
+    def kernel(rows):
+        if horizontal:
+            target[rows] = source[rows, ::-1]
+        else:
+            target[rows] = source[height - rows.stop:height - rows.start][::-1]
+    run_bands(kernel, height, width, workers)
+def copy_region(target, source, fill=0, workers=None):
+    height, width = min(target.shape[0], source.shape[0]), min(target.shape[1], source.shape[1])
+    def kernel(rows):
+        band = target[rows]
+        band[:] = fill
+        if rows.start < height:
+            band[:height - rows.start, :width] = source[rows.start:min(rows.stop, height), :width]
+    run_bands(kernel, *target.shape, workers)
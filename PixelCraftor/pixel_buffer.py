@@ -0,0 +1,48 @@
+import numpy as np
+from PySide6.QtGui import QImage, QColor
+DOCUMENT_FORMAT = QImage.Format_ARGB32_Premultiplied
+PIXEL_FORMATS = (QImage.Format_ARGB32, QImage.Format_ARGB32_Premultiplied)
+WHITE = 0xFFFFFFFF
+TRANSPARENT = 0x00000000
+def image_to_array(image):
+    if image.format() == QImage.Format_Indexed8:
+        pixels = np.frombuffer(image.bits(), dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+        return pixels[:, :image.width()]
+    if image.format() not in PIXEL_FORMATS:
+        raise ValueError(f"Ожидается формат ARGB32 или Indexed8, получен {image.format()}")
+    stride = image.bytesPerLine() // 4
+    pixels = np.frombuffer(image.bits(), dtype=np.uint32).reshape(image.height(), stride)
+    return pixels[:, :image.width()]
+def read_array(image):
+    if image.format() == QImage.Format_Indexed8:
+        pixels = np.frombuffer(image.constBits(), dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+        return pixels[:, :image.width()]
+    if image.format() not in PIXEL_FORMATS:
+        raise ValueError(f"Ожидается формат ARGB32 или Indexed8, получен {image.format()}")
+    pixels = np.frombuffer(image.constBits(), dtype=np.uint32).reshape(image.height(), image.bytesPerLine() // 4)
+    return pixels[:, :image.width()]
+def array_to_image(pixels, image_format=DOCUMENT_FORMAT):
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint32)
+    height, width = pixels.shape
+    image = QImage(pixels.data, width, height, width * 4, image_format)
+    return image.copy()
+def clip_rect(rect, width, height):
+    left = max(0, rect.left())
+    top = max(0, rect.top())
+    right = min(width, rect.x() + rect.width())
+    bottom = min(height, rect.y() + rect.height())
+    return left, top, max(left, right), max(top, bottom)
+def pack_color(color):
+    color = QColor(color)
+    alpha = color.alpha()
+    if alpha == 255:
+        return color.rgba()
+    red, green, blue = ((channel * alpha + 127) // 255 for channel in (color.red(), color.green(), color.blue()))
+    return (alpha << 24) | (red << 16) | (green << 8) | blue
+def unpack_color(value):
+    value = int(value)
+    alpha = value >> 24
+    if alpha in (0, 255):
+        return QColor.fromRgba(value if alpha else TRANSPARENT)
+    red, green, blue = (min(255, (((value >> shift) & 0xFF) * 255 + alpha // 2) // alpha) for shift in (16, 8, 0))
+    return QColor(red, green, blue, alpha)
@@ -0,0 +1,112 @@
+import numpy as np
+from PySide6.QtGui import QImage
+from pixel_buffer import image_to_array, TRANSPARENT
+QUANTIZE_METHODS = ("median_cut", "kmeans")
+PRESET_PALETTES = {
+    "Оттенки серого (4)": [0xFF000000, 0xFF555555, 0xFFAAAAAA, 0xFFFFFFFF],
+    "Game Boy (4)": [0xFF0F380F, 0xFF306230, 0xFF8BAC0F, 0xFF9BBC0F],
+    "CGA (4)": [0xFF000000, 0xFF55FFFF, 0xFFFF55FF, 0xFFFFFFFF],
+    "PICO-8 (16)": [
+        0xFF000000, 0xFF1D2B53, 0xFF7E2553, 0xFF008751, 0xFFAB5236, 0xFF5F574F, 0xFFC2C3C7, 0xFFFFF1E8,
+        0xFFFF004D, 0xFFFFA300, 0xFFFFEC27, 0xFF00E436, 0xFF29ADFF, 0xFF83769C, 0xFFFF77A8, 0xFFFFCCAA,
+    ],
+}
+def _channels(pixels):
+    return np.stack([(pixels >> shift) & 0xFF for shift in (16, 8, 0)], axis=-1).astype(np.float64)
+def _histogram(pixels):
+    rgb = _channels(pixels)
+    bins = (rgb[:, 0].astype(np.int64) >> 3) << 10 | (rgb[:, 1].astype(np.int64) >> 3) << 5 | rgb[:, 2].astype(np.int64) >> 3
+    counts = np.bincount(bins, minlength=32768)
+    sums = np.stack([np.bincount(bins, weights=rgb[:, c], minlength=32768) for c in range(3)], axis=-1)
+    used = counts > 0
+    return sums[used] / counts[used, None], counts[used].astype(np.float64)
+def median_cut(colors, counts, size):
+    boxes = [np.arange(len(colors))]
+    while len(boxes) < size:
+        spans = [np.ptp(colors[box], axis=0).max() if len(box) > 1 else -1 for box in boxes]
+        widest = int(np.argmax(spans))
+        if spans[widest] <= 0:
+            break
+        box = boxes.pop(widest)
+        channel = int(np.argmax(np.ptp(colors[box], axis=0)))
+        box = box[np.argsort(colors[box, channel], kind="stable")]
+        cumulative = np.cumsum(counts[box])
+        split = int(np.clip(np.searchsorted(cumulative, cumulative[-1] / 2) + 1, 1, len(box) - 1))
+        boxes.extend((box[:split], box[split:]))
+    return np.array([np.average(colors[box], axis=0, weights=counts[box]) for box in boxes])
+def _nearest(colors, palette):
+    palette = np.asarray(palette, dtype=np.float32)
+    bias = (palette ** 2).sum(axis=1)
+    labels = np.empty(len(colors), dtype=np.int64)
+    for start in range(0, len(colors), 262144):
+        chunk = np.asarray(colors[start:start + 262144], dtype=np.float32)
+        labels[start:start + 262144] = np.argmin(bias - 2 * chunk @ palette.T, axis=1)
+    return labels
+def kmeans(colors, counts, size, iterations=8):
+    centers = median_cut(colors, counts, size)
+    for _ in range(iterations):
+        labels = _nearest(colors, centers)
+        weights = np.bincount(labels, weights=counts, minlength=len(centers))
+        used = weights > 0
+        for channel in range(3):
+            totals = np.bincount(labels, weights=colors[:, channel] * counts, minlength=len(centers))
+            centers[used, channel] = totals[used] / weights[used]
+    return centers
+def build_palette(pixels, size=16, method="median_cut"):
+    opaque = pixels[(pixels >> 24) >= 128]
+    palette = [TRANSPARENT] if len(opaque) < pixels.size else []
+    if len(opaque) and size > len(palette):
+        colors, counts = _histogram(opaque)
+        if method == "kmeans":
+            centers = kmeans(colors, counts, size - len(palette))
+        else:
+            centers = median_cut(colors, counts, size - len(palette))
+        centers = np.clip(np.rint(centers), 0, 255).astype(np.int64)
+        palette.extend(int(0xFF000000 | r << 16 | g << 8 | b) for r, g, b in centers)
+    return palette or [0xFF000000]
+def nearest_indices(pixels, palette):
+    unique, inverse = np.unique(pixels, return_inverse=True)
+    entries = np.array(palette, dtype=np.uint32)
+    source = np.concatenate((_channels(unique), (unique >> 24)[:, None].astype(np.float64)), axis=1)
+    target = np.concatenate((_channels(entries), (entries >> 24)[:, None].astype(np.float64)), axis=1)
+    return _nearest(source, target).astype(np.uint8)[inverse].reshape(pixels.shape)
+def to_straight_pixels(image):
+    if image.format() != QImage.Format_ARGB32:
+        image = image.convertToFormat(QImage.Format_ARGB32)
+    return image_to_array(image).copy()
+def indexed_image(indices, palette):
+    height, width = indices.shape
+    image = QImage(width, height, QImage.Format_Indexed8)
+    image.setColorTable(palette)
+    image_to_array(image)[:] = indices
+    return image
+def remap_image(image, palette):
+    return indexed_image(nearest_indices(to_straight_pixels(image), palette), palette)
+def quantize_image(image, size=16, method="median_cut"):
+    pixels = to_straight_pixels(image)
+    palette = build_palette(pixels, size, method)
+    return indexed_image(nearest_indices(pixels, palette), palette)
+def bits_per_pixel(palette):
+    for bpp in (1, 2, 4, 8):
+        if len(palette) <= 1 << bpp:
+            return bpp
+    raise ValueError(f"Слишком много цветов в палитре: {len(palette)}")
+def pack_indices(indices, bpp):
+    per_byte = 8 // bpp
+    height, width = indices.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = indices & ((1 << bpp) - 1)
+    groups = padded.reshape(height, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * bpp
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+def swap_palette(palette, preset):
+    def brightness(entries):
+        rgb = _channels(np.array(entries, dtype=np.uint32))
+        return rgb @ np.array([0.299, 0.587, 0.114])
+    order = np.argsort(brightness(palette), kind="stable")
+    targets = [preset[i] for i in np.argsort(brightness(preset), kind="stable")]
+    swapped = list(palette)
+    for rank, index in enumerate(order.tolist()):
+        if palette[index] >> 24:
+            swapped[index] = targets[rank * len(targets) // len(palette)]
+    return swapped
@@ -0,0 +1,73 @@
+import numpy as np
+def line_points(x1, y1, x2, y2):
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    steps = np.arange(max(dx, dy) + 1, dtype=np.int64)
+    if dx >= dy:
+        xs = x1 + sx * steps
+        ys = y1 + sy * ((2 * dy * steps + dx - 1) // (2 * dx)) if dx else np.full(1, y1)
+    else:
+        ys = y1 + sy * steps
+        xs = x1 + sx * ((2 * dx * steps + dy - 1) // (2 * dy))
+    return xs, ys
+def rectangle_points(rect):
+    left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+    columns = np.arange(left, right + 1, dtype=np.int64)
+    rows = np.arange(top + 1, bottom, dtype=np.int64)
+    xs = np.concatenate((columns, np.full(len(rows), right), columns[::-1], np.full(len(rows), left), columns[:1]))
+    ys = np.concatenate((np.full(len(columns), top), rows, np.full(len(columns), bottom), rows[::-1], [top]))
+    return xs, ys
+def clip_points(xs, ys, width, height):
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return xs[inside], ys[inside]
+SYMMETRY_MODES = ("none", "horizontal", "vertical", "both", "radial")
+def rotate_points(xs, ys, center_x, center_y, angle):
+    cos, sin = np.round(np.cos(angle), 12), np.round(np.sin(angle), 12)
+    dx, dy = xs - center_x, ys - center_y
+    return (np.floor(center_x + dx * cos - dy * sin + 0.5).astype(np.int64),
+            np.floor(center_y + dx * sin + dy * cos + 0.5).astype(np.int64))
+def join_points(xs, ys, copy_xs, copy_ys):
+    neighbours = (np.abs(np.diff(xs)) <= 1) & (np.abs(np.diff(ys)) <= 1)
+    gaps = neighbours & ((np.abs(np.diff(copy_xs)) > 1) | (np.abs(np.diff(copy_ys)) > 1))
+    if not gaps.any():
+        return copy_xs, copy_ys
+    joined_xs, joined_ys = [copy_xs], [copy_ys]
+    for index in np.flatnonzero(gaps).tolist():
+        line_xs, line_ys = line_points(int(copy_xs[index]), int(copy_ys[index]),
+                                       int(copy_xs[index + 1]), int(copy_ys[index + 1]))
+        joined_xs.append(line_xs[1:-1])
+        joined_ys.append(line_ys[1:-1])
+    return np.concatenate(joined_xs), np.concatenate(joined_ys)
+def rotate_region(xs, ys, center_x, center_y, angle):
+    left, top = int(xs.min()), int(ys.min())
+    region = np.zeros((int(ys.max()) - top + 1, int(xs.max()) - left + 1), dtype=bool)
+    region[ys - top, xs - left] = True
+    corner_xs, corner_ys = rotate_points(np.array([left, left + region.shape[1], left, left + region.shape[1]]),
+                                         np.array([top, top, top + region.shape[0], top + region.shape[0]]),
+                                         center_x, center_y, angle)
+    grid_ys, grid_xs = np.mgrid[corner_ys.min() - 1:corner_ys.max() + 2, corner_xs.min() - 1:corner_xs.max() + 2]
+    grid_xs, grid_ys = grid_xs.ravel(), grid_ys.ravel()
+    source_xs, source_ys = rotate_points(grid_xs, grid_ys, center_x, center_y, -angle)
+    source_xs, source_ys = source_xs - left, source_ys - top
+    inside = (source_xs >= 0) & (source_xs < region.shape[1]) & (source_ys >= 0) & (source_ys < region.shape[0])
+    inside[inside] = region[source_ys[inside], source_xs[inside]]
+    return grid_xs[inside], grid_ys[inside]
+def symmetry_copies(xs, ys, mode, axis_x2, axis_y2, folds=4, filled=False):
+    copies = [(xs, ys)]
+    if mode in ("horizontal", "both"):
+        copies.append((axis_x2 - 1 - xs, ys))
+    if mode in ("vertical", "both"):
+        copies.extend([(copy_xs, axis_y2 - 1 - copy_ys) for copy_xs, copy_ys in copies])
+    if mode == "radial" and folds > 1 and len(xs):
+        center_x, center_y = (axis_x2 - 1) / 2, (axis_y2 - 1) / 2
+        for fold in range(1, folds):
+            angle = 2 * np.pi * fold / folds
+            if 4 * fold % folds == 0:
+                copies.append(rotate_points(xs, ys, center_x, center_y, angle))
+            elif filled:
+                copies.append(rotate_region(xs, ys, center_x, center_y, angle))
+            else:
+                copies.append(join_points(xs, ys, *rotate_points(xs, ys, center_x, center_y, angle)))
+    return copies
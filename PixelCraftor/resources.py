@@ -0,0 +1,27 @@
+from collections import OrderedDict
+from PySide6.QtGui import QPixmap, QPainter, QColor, QBrush
+from PySide6.QtCore import Qt
+THUMBNAIL_LIMIT = 512
+_thumbnails = OrderedDict()
+_checker_brush = None
+def thumbnail(image, size=32):
+    key = (image.cacheKey(), size)
+    if key in _thumbnails:
+        _thumbnails.move_to_end(key)
+        return _thumbnails[key]
+    pixmap = QPixmap.fromImage(image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+    _thumbnails[key] = pixmap
+    if len(_thumbnails) > THUMBNAIL_LIMIT:
+        _thumbnails.popitem(last=False)
+    return pixmap
+def transparency_brush():
+    global _checker_brush
+    if _checker_brush is None:
+        tile = QPixmap(16, 16)
+        tile.fill(QColor(255, 255, 255))
+        tile_painter = QPainter(tile)
+        tile_painter.fillRect(0, 0, 8, 8, QColor(204, 204, 204))
+        tile_painter.fillRect(8, 8, 8, 8, QColor(204, 204, 204))
+        tile_painter.end()
+        _checker_brush = QBrush(tile)
+    return _checker_brush
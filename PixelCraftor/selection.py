@@ -0,0 +1,145 @@
+import numpy as np
+from PySide6.QtGui import QImage, QPainter, QPainterPath, QPolygonF, QColor, QPen
+from PySide6.QtCore import Qt, QRect, QPointF
+from pixel_buffer import clip_rect
+def _runs(line):
+    edges = np.diff(np.concatenate(([0], line.astype(np.int8), [0])))
+    return zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist())
+class SelectionMask:
+    def __init__(self, bits, width, height):
+        self.bits = bits
+        self.width = width
+        self.height = height
+        self._bounding_rect = None
+        self._outline = None
+    @classmethod
+    def from_array(cls, mask):
+        height, width = mask.shape
+        return cls(np.packbits(mask, axis=1), width, height)
+    def to_array(self):
+        return np.unpackbits(self.bits, axis=1, count=self.width).astype(bool)
+    def contains(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return bool((self.bits[y, x >> 3] >> (7 - (x & 7))) & 1)
+        return False
+    def is_empty(self):
+        return not self.bits.any()
+    def bounding_rect(self):
+        if self._bounding_rect is None:
+            rows = np.flatnonzero(self.bits.any(axis=1))
+            if not len(rows):
+                self._bounding_rect = QRect()
+            else:
+                row_bits = np.bitwise_or.reduce(self.bits[rows[0]:rows[-1] + 1], axis=0)
+                columns = np.flatnonzero(np.unpackbits(row_bits, count=self.width))
+                self._bounding_rect = QRect(int(columns[0]), int(rows[0]),
+                                            int(columns[-1] - columns[0] + 1),
+                                            int(rows[-1] - rows[0] + 1))
+        return self._bounding_rect
+    def outline_path(self):
+        if self._outline is None:
+            mask = np.pad(self.to_array(), 1)
+            path = QPainterPath()
+            horizontal = mask[1:, 1:-1] != mask[:-1, 1:-1]
+            for y in np.flatnonzero(horizontal.any(axis=1)).tolist():
+                for start, end in _runs(horizontal[y]):
+                    path.moveTo(start, y)
+                    path.lineTo(end, y)
+            vertical = mask[1:-1, 1:] != mask[1:-1, :-1]
+            for x in np.flatnonzero(vertical.any(axis=0)).tolist():
+                for start, end in _runs(vertical[:, x]):
+                    path.moveTo(x, start)
+                    path.lineTo(x, end)
+            self._outline = path
+        return self._outline
+    def mirrored(self, horizontal, vertical):
+        mask = self.to_array()
+        if horizontal:
+            mask = mask[:, ::-1]
+        if vertical:
+            mask = mask[::-1, :]
+        return SelectionMask.from_array(np.ascontiguousarray(mask))
+    def rotated(self, angle):
+        return SelectionMask.from_array(np.ascontiguousarray(np.rot90(self.to_array(), (-angle // 90) % 4)))
+    def resized(self, width, height):
+        if width == self.width and height == self.height:
+            return self
+        rows = np.arange(height) * self.height // height
+        columns = np.arange(width) * self.width // width
+        return SelectionMask.from_array(self.to_array()[rows[:, None], columns])
+def mask_array(rect, mask):
+    if mask is not None:
+        return mask.to_array()
+    return np.ones((rect.height(), rect.width()), dtype=bool)
+def mask_slices(rect, width, height):
+    left, top, right, bottom = clip_rect(rect, width, height)
+    return ((slice(top, bottom), slice(left, right)),
+            (slice(top - rect.top(), bottom - rect.top()), slice(left - rect.left(), right - rect.left())))
+def selection_to_array(rect, mask, width, height):
+    region = np.zeros((height, width), dtype=bool)
+    if rect is None:
+        return region
+    target, source = mask_slices(rect, width, height)
+    region[target] = mask_array(rect, mask)[source]
+    return region
+def selection_from_array(region):
+    mask = SelectionMask.from_array(region)
+    rect = mask.bounding_rect()
+    if rect.isEmpty():
+        return None, None
+    local = region[rect.top():rect.bottom() + 1, rect.left():rect.right() + 1]
+    return rect, SelectionMask.from_array(np.ascontiguousarray(local))
+def combine_selections(base, other, mode, width, height):
+    first = selection_to_array(base[0], base[1], width, height)
+    second = selection_to_array(other[0], other[1], width, height)
+    if mode == "add":
+        region = first | second
+    elif mode == "subtract":
+        region = first & ~second
+    elif mode == "intersect":
+        region = first & second
+    else:
+        region = second
+    return selection_from_array(region)
+def flood_fill_mask(pixels, x, y):
+    height, width = pixels.shape
+    same = pixels == pixels[y, x]
+    mask = np.zeros((height, width), dtype=bool)
+    stack = [(x, y)]
+    while stack:
+        sx, sy = stack.pop()
+        if mask[sy, sx] or not same[sy, sx]:
+            continue
+        row = same[sy]
+        left_run = row[sx::-1]
+        stop = int(np.argmin(left_run))
+        left = 0 if left_run[stop] else sx - stop + 1
+        right_run = row[sx:]
+        stop = int(np.argmin(right_run))
+        right = width if right_run[stop] else sx + stop
+        mask[sy, left:right] = True
+        for ny in (sy - 1, sy + 1):
+            if 0 <= ny < height:
+                candidates = same[ny, left:right] & ~mask[ny, left:right]
+                if candidates.any():
+                    starts = np.flatnonzero(candidates & ~np.concatenate(([False], candidates[:-1])))
+                    stack.extend((left + int(s), ny) for s in starts)
+    return mask
+def polygon_mask(points, width, height):
+    polygon = QPolygonF([QPointF(p.x() + 0.5, p.y() + 0.5) for p in points])
+    bounds = polygon.boundingRect().toAlignedRect().adjusted(-1, -1, 1, 1).intersected(QRect(0, 0, width, height))
+    if bounds.isEmpty():
+        return None, None
+    image = QImage(bounds.width(), bounds.height(), QImage.Format_Grayscale8)
+    image.fill(0)
+    painter = QPainter(image)
+    painter.translate(-bounds.x(), -bounds.y())
+    painter.setPen(QPen(QColor(255, 255, 255), 0))
+    painter.setBrush(QColor(255, 255, 255))
+    painter.drawPolygon(polygon, Qt.WindingFill)
+    painter.end()
+    raw = np.frombuffer(image.constBits(), dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+    rect, mask = selection_from_array(raw[:, :bounds.width()] > 127)
+    if rect is not None:
+        rect.translate(bounds.topLeft())
+    return rect, mask
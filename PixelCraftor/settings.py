@@ -14,7 +14,8 @@ class Settings:
             "recent_files": [],
             "autosave": True,
             "autosave_interval": 5,  
-            "max_history": 50
+            "max_history": 50,
+            "history_memory_mb": 256
         }
         self.load()
     def load(self):
@@ -0,0 +1,64 @@
+from PySide6.QtCore import QRect
+import numpy as np
+TILE_SIZE = 128
+class TileHistory:
+    def __init__(self, original, max_steps=50):
+        self.original = original
+        self.shape = original.shape
+        self.max_steps = max_steps
+        self.base = {}
+        self.dirty = set()
+        self.undo_stack = []
+        self.redo_stack = []
+    def mark(self, rect=None):
+        height, width = self.shape
+        if rect is None:
+            rect = QRect(0, 0, width, height)
+        rect = rect.intersected(QRect(0, 0, width, height))
+        if rect.isEmpty():
+            return
+        self.dirty.update((row, column)
+                          for row in range(rect.top() // TILE_SIZE, rect.bottom() // TILE_SIZE + 1)
+                          for column in range(rect.left() // TILE_SIZE, rect.right() // TILE_SIZE + 1))
+    def slices(self, tile):
+        row, column = tile
+        return slice(row * TILE_SIZE, (row + 1) * TILE_SIZE), slice(column * TILE_SIZE, (column + 1) * TILE_SIZE)
+    def checkpoint(self, pixels):
+        if not self.dirty:
+            return
+        patch = {}
+        for tile in self.dirty:
+            rows, columns = self.slices(tile)
+            saved = self.base.get(tile)
+            patch[tile] = np.array(self.original[rows, columns]) if saved is None else saved
+            self.base[tile] = pixels[rows, columns].copy()
+        self.dirty.clear()
+        self.undo_stack.append(patch)
+        self.redo_stack.clear()
+        if len(self.undo_stack) > self.max_steps:
+            self.undo_stack.pop(0)
+    def restore(self, pixels, source, target):
+        self.checkpoint(pixels)
+        if not source:
+            return None
+        patch = source.pop()
+        reverse = {}
+        rect = QRect()
+        for tile, data in patch.items():
+            rows, columns = self.slices(tile)
+            reverse[tile] = self.base[tile]
+            pixels[rows, columns] = data
+            self.base[tile] = data
+            rect = rect.united(QRect(columns.start, rows.start, TILE_SIZE, TILE_SIZE))
+        target.append(reverse)
+        return rect.intersected(QRect(0, 0, self.shape[1], self.shape[0]))
+    def undo(self, pixels):
+        return self.restore(pixels, self.undo_stack, self.redo_stack)
+    def redo(self, pixels):
+        return self.restore(pixels, self.redo_stack, self.undo_stack)
+    def modified(self, pixels):
+        self.checkpoint(pixels)
+        return [(self.slices(tile), data) for tile, data in self.base.items()]
+    def memory_usage(self):
+        arrays = {id(data): data for patch in [self.base] + self.undo_stack + self.redo_stack for data in patch.values()}
+        return sum(data.nbytes for data in arrays.values())
@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QColorDialog, QLabel, QGridLayout, QSlider,
-                             QGroupBox, QRadioButton, QButtonGroup)
+                             QGroupBox, QRadioButton, QButtonGroup, QComboBox, QSpinBox)
 from PySide6.QtGui import QIcon, QPixmap, QColor, QPainter, QPen, QBrush
 from PySide6.QtCore import Qt, Signal, QSize
 class ColorButton(QPushButton):
@@ -78,6 +78,7 @@ class ToolButton(QPushButton):
 class ToolPanel(QWidget):
     tool_changed = Signal(str)
     color_changed = Signal(QColor)
+    symmetry_changed = Signal(str, int)
     def __init__(self, canvas=None, parent=None):
         super().__init__(parent)
         self.canvas = canvas
@@ -133,6 +134,21 @@ class ToolPanel(QWidget):
         self.text_button.setToolTip("Текст")
         self.tool_group.addButton(self.text_button)
         tools_layout.addWidget(self.text_button, 1, 3)
+        self.lasso_button = ToolButton("lasso")
+        self.lasso_button.setText("➰")
+        self.lasso_button.setToolTip("Лассо")
+        self.tool_group.addButton(self.lasso_button)
+        tools_layout.addWidget(self.lasso_button, 2, 0)
+        self.magic_wand_button = ToolButton("magic_wand")
+        self.magic_wand_button.setText("🪄")
+        self.magic_wand_button.setToolTip("Волшебная палочка")
+        self.tool_group.addButton(self.magic_wand_button)
+        tools_layout.addWidget(self.magic_wand_button, 2, 1)
+        self.offset_button = ToolButton("offset")
+        self.offset_button.setText("✥")
+        self.offset_button.setToolTip("Сдвиг с переносом")
+        self.tool_group.addButton(self.offset_button)
+        tools_layout.addWidget(self.offset_button, 2, 2)
         self.pen_button.clicked.connect(lambda: self.set_tool("pen"))
         self.eraser_button.clicked.connect(lambda: self.set_tool("eraser"))
         self.rect_button.clicked.connect(lambda: self.set_tool("rectangle"))
@@ -141,7 +157,29 @@ class ToolPanel(QWidget):
         self.eyedropper_button.clicked.connect(lambda: self.set_tool("eyedropper"))
         self.line_button.clicked.connect(lambda: self.set_tool("line"))
         self.text_button.clicked.connect(lambda: self.set_tool("text"))
+        self.lasso_button.clicked.connect(lambda: self.set_tool("lasso"))
+        self.magic_wand_button.clicked.connect(lambda: self.set_tool("magic_wand"))
+        self.offset_button.clicked.connect(lambda: self.set_tool("offset"))
         layout.addWidget(tools_group)
+        symmetry_group = QGroupBox("Симметрия")
+        symmetry_layout = QHBoxLayout(symmetry_group)
+        self.symmetry_combo = QComboBox()
+        self.symmetry_combo.addItem("Нет", "none")
+        self.symmetry_combo.addItem("Горизонтальная", "horizontal")
+        self.symmetry_combo.addItem("Вертикальная", "vertical")
+        self.symmetry_combo.addItem("Обе оси", "both")
+        self.symmetry_combo.addItem("Радиальная", "radial")
+        self.symmetry_combo.setToolTip("Оси берутся из первых направляющих, иначе из центра холста")
+        self.symmetry_combo.currentIndexChanged.connect(self.on_symmetry_changed)
+        symmetry_layout.addWidget(self.symmetry_combo)
+        self.folds_spin = QSpinBox()
+        self.folds_spin.setRange(2, 16)
+        self.folds_spin.setValue(4)
+        self.folds_spin.setToolTip("Число лучей радиальной симметрии")
+        self.folds_spin.setEnabled(False)
+        self.folds_spin.valueChanged.connect(self.on_symmetry_changed)
+        symmetry_layout.addWidget(self.folds_spin)
+        layout.addWidget(symmetry_group)
         self.color_palette = ColorPalette()
         self.color_palette.color_selected.connect(self.on_color_changed)
         layout.addWidget(self.color_palette)
@@ -152,6 +190,13 @@ class ToolPanel(QWidget):
         print(f"Выбран инструмент: {tool_name}")
     def on_color_changed(self, color):
         self.color_changed.emit(color)
+    def on_symmetry_changed(self):
+        mode, folds = self.get_symmetry()
+        self.folds_spin.setEnabled(mode == "radial")
+        self.symmetry_changed.emit(mode, folds)
+        print(f"Симметрия: {mode}, лучей {folds}")
+    def get_symmetry(self):
+        return self.symmetry_combo.currentData(), self.folds_spin.value()
     def get_current_tool(self):
         return self.current_tool
     def get_current_color(self):
@@ -0,0 +1,104 @@
+import math
+import os
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QPixmap
+from PySide6.QtCore import Qt, QRect, QRectF, QPointF
+try:
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+except ImportError:
+    QOpenGLWidget = None
+MIN_SCALE = 1
+MAX_SCALE = 32
+def select_backend():
+    backend = os.environ.get("PIXELCRAFTOR_VIEWPORT", "raster").lower()
+    if backend == "gl" and QOpenGLWidget is not None:
+        if os.environ.get("QT_QPA_PLATFORM", "") not in ("offscreen", "minimal"):
+            return "gl"
+        print("Viewport: OpenGL недоступен на этой платформе, используется raster")
+    return "raster"
+BACKEND = select_backend()
+CanvasBase = QOpenGLWidget if BACKEND == "gl" else QWidget
+def pixmap_bytes(pixmap):
+    if pixmap is None or pixmap.isNull():
+        return 0
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+class DocumentRenderer:
+    TILE_PIXELS = 256
+    def __init__(self, backend=BACKEND):
+        self.backend = backend
+        self.texture_owner = None
+        self.texture = None
+        self.texture_dirty = QRect()
+        self.cache_key = None
+        self.cache_rect = QRect()
+        self.cache_pixmap = None
+        self.cache_misses = 0
+    def mark_texture(self, owner, rect=None):
+        if owner != self.texture_owner:
+            return
+        if rect is None:
+            self.texture_owner = None
+        else:
+            self.texture_dirty = self.texture_dirty.united(rect)
+    def document_texture(self, image, owner=None):
+        owner = image.cacheKey() if owner is None else owner
+        if owner != self.texture_owner or self.texture is None or self.texture.size() != image.size():
+            self.texture = QPixmap.fromImage(image)
+            self.texture_owner = owner
+            self.texture_dirty = QRect()
+            return self.texture
+        dirty = self.texture_dirty.intersected(image.rect())
+        if not dirty.isEmpty():
+            painter = QPainter(self.texture)
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.drawImage(dirty.topLeft(), image, dirty)
+            painter.end()
+        self.texture_dirty = QRect()
+        return self.texture
+    def visible_document_rect(self, bounds, scale, offset, exposed):
+        left = int((exposed.left() - offset) // scale)
+        top = int((exposed.top() - offset) // scale)
+        right = int((exposed.right() - offset) // scale) + 1
+        bottom = int((exposed.bottom() - offset) // scale) + 1
+        return QRect(left, top, right - left + 1, bottom - top + 1).intersected(bounds)
+    def draw(self, painter, image, scale, offset, exposed, owner=None):
+        if self.backend == "gl":
+            painter.drawPixmap(
+                QRectF(offset, offset, image.width() * scale, image.height() * scale),
+                self.document_texture(image, owner),
+                QRectF(image.rect())
+            )
+            return
+        visible = self.visible_document_rect(image.rect(), scale, offset, exposed)
+        if visible.isEmpty():
+            return
+        key = (image.cacheKey(), scale)
+        if key != self.cache_key or not self.cache_rect.contains(visible):
+            tile = max(1, math.ceil(self.TILE_PIXELS / scale))
+            left = visible.left() // tile * tile
+            top = visible.top() // tile * tile
+            right = (visible.right() // tile + 1) * tile
+            bottom = (visible.bottom() // tile + 1) * tile
+            region = QRect(left, top, right - left, bottom - top).intersected(image.rect())
+            self.cache_pixmap = QPixmap.fromImage(image.copy(region).scaled(
+                round(region.width() * scale), round(region.height() * scale),
+                Qt.IgnoreAspectRatio, Qt.FastTransformation
+            ))
+            self.cache_rect = region
+            self.cache_key = key
+            self.cache_misses += 1
+        painter.drawPixmap(
+            QPointF(offset + self.cache_rect.x() * scale, offset + self.cache_rect.y() * scale),
+            self.cache_pixmap
+        )
+    def draw_tiled(self, painter, image, scale, offset, copies, owner=None):
+        painter.save()
+        painter.translate(offset, offset)
+        painter.scale(scale, scale)
+        painter.drawTiledPixmap(QRectF(0, 0, image.width() * copies, image.height() * copies), self.document_texture(image, owner))
+        painter.restore()
+    def invalidate(self):
+        self.cache_key = None
+        self.texture_owner = None
+    def memory_usage(self):
+        return pixmap_bytes(self.cache_pixmap) + pixmap_bytes(self.texture)
@@ -1,39 +1,54 @@
-from PySide6.QtGui import QImage, QColor, QPainter
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QColor
+import io
+import os
 import re
+import numpy as np
+from dithering import BLACK, dither as dither_image
+from pixel_buffer import array_to_image, WHITE
+from c_formatter import CHeaderFormatter
+from image_io import replace_file
 class XBMConverter:
     def __init__(self):
         pass
-    def image_to_xbm(self, image, name="image"):
+    def image_to_ink(self, image, dither=None, threshold=128):
+        if dither:
+            return dither_image(image, dither, threshold)
+        mono_image = image.convertToFormat(QImage.Format_Mono)
+        raw = np.frombuffer(mono_image.constBits(), dtype=np.uint8).reshape(mono_image.height(), mono_image.bytesPerLine())
+        return np.unpackbits(raw, axis=1, count=mono_image.width()) == 0
+    def pack_bits(self, ink):
+        return np.packbits(ink, axis=1, bitorder="little")
+    def write_xbm(self, stream, image, name="image", dither=None, threshold=128):
+        formatter = CHeaderFormatter(const=False)
+        stream.write(f"#define {name}_width {image.width()}\n")
+        stream.write(f"#define {name}_height {image.height()}\n")
+        bytes_data = self.pack_bits(self.image_to_ink(image, dither, threshold))
+        formatter.write_array(stream, f"{name}_bits", bytes_data)
+    def save_xbm(self, file_path, image, name="image", dither=None, threshold=128, progress=None):
+        def write(path):
+            with open(path, 'w') as f:
+                self.write_xbm(f, image, name, dither, threshold)
+        replace_file(file_path, write, progress)
+        return file_path
+    def image_to_xbm(self, image, name="image", dither=None, threshold=128):
         if not isinstance(image, QImage):
             return None
-        width = image.width()
-        height = image.height()
-        xbm_data = f"#define {name}_width {width}\n"
-        xbm_data += f"#define {name}_height {height}\n"
-        xbm_data += f"static unsigned char {name}_bits[] = {{\n"
-        mono_image = image.convertToFormat(QImage.Format_Mono)
-        bytes_data = []
-        for y in range(height):
-            row_bytes = []
-            for x in range(0, width, 8):
-                byte = 0
-                for bit in range(8):
-                    if x + bit < width:
-                        pixel = mono_image.pixelIndex(x + bit, y)
-                        if pixel == 0:
-                            byte |= (1 << bit)
-                row_bytes.append(byte)
-            bytes_data.extend(row_bytes)
-        for i in range(0, len(bytes_data), 12):
-            chunk = bytes_data[i:i+12]
-            xbm_data += "  " + ", ".join(f"0x{b:02x}" for b in chunk)
-            if i + 12 < len(bytes_data):
-                xbm_data += ",\n"
-            else:
-                xbm_data += "\n"
-        xbm_data += "};\n"
-        return xbm_data
+        stream = io.StringIO()
+        self.write_xbm(stream, image, name, dither, threshold)
+        return stream.getvalue()
+    def convert_files(self, paths, output_dir, dither=None, threshold=128):
+        written = []
+        for path in paths:
+            image = QImage(path)
+            if image.isNull():
+                print(f"Не удалось открыть изображение: {path}")
+                continue
+            name = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+            output_path = os.path.join(output_dir, f"{name}.xbm")
+            with open(output_path, 'w') as f:
+                self.write_xbm(f, image, name, dither, threshold)
+            written.append(output_path)
+        return written
     def xbm_to_image(self, xbm_data):
         width_match = re.search(r'#define\s+\w+_width\s+(\d+)', xbm_data)
         height_match = re.search(r'#define\s+\w+_height\s+(\d+)', xbm_data)
@@ -44,23 +59,9 @@ class XBMConverter:
         bits_match = re.search(r'static\s+unsigned\s+char\s+\w+_bits\[\]\s*=\s*{([^}]+)}', xbm_data, re.DOTALL)
         if not bits_match:
             return None
-        bits_str = bits_match.group(1)
-        bytes_str = re.findall(r'0x[0-9a-fA-F]{2}', bits_str)
-        bytes_data = [int(b, 16) for b in bytes_str]
-        image = QImage(width, height, QImage.Format_Mono)
-        image.fill(Qt.white)  
-        for y in range(height):
-            for x in range(width):
-                byte_index = (y * ((width + 7) // 8)) + (x // 8)
-                if byte_index < len(bytes_data):
-                    bit_index = x % 8
-                    if bytes_data[byte_index] & (1 << bit_index):
-                        image.setPixel(x, y, 0)  
-                    else:
-                        image.setPixel(x, y, 1)  
-        result = QImage(width, height, QImage.Format_ARGB32)
-        result.fill(Qt.white)
-        painter = QPainter(result)
-        painter.drawImage(0, 0, image)
-        painter.end()
-        return result 
\ No newline at end of file
+        data = np.array([int(b, 16) for b in re.findall(r'0x[0-9a-fA-F]{2}', bits_match.group(1))], dtype=np.uint8)
+        row_bytes = (width + 7) // 8
+        packed = np.zeros(row_bytes * height, dtype=np.uint8)
+        packed[:min(len(data), len(packed))] = data[:len(packed)]
+        ink = np.unpackbits(packed.reshape(height, row_bytes), axis=1, count=width, bitorder="little").astype(bool)
+        return array_to_image(np.where(ink, np.uint32(BLACK), np.uint32(WHITE)), QImage.Format_ARGB32)
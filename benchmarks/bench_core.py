@@ -0,0 +1,132 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PixelCraftor")
+sys.path.insert(0, SOURCE_DIR)
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QColor
+from PySide6.QtCore import Qt, QRect
+from canvas import PixelCanvas
+from history import HistoryManager
+from layers import LayerManager, LayerWidget
+from xbm_converter import XBMConverter
+SIZES = [(128, 64), (512, 512), (1024, 1024), (4096, 4096)]
+LAYER_COUNTS = [2, 8, 32]
+HISTORY_STATES = 4
+VIEWPORT = QRect(0, 0, 1200, 800)
+COLORS = [QColor(Qt.black), QColor(Qt.red)]
+def measure(step, repeat, setup=None):
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(repeat + 1):
+            if setup:
+                setup(i)
+            start = time.perf_counter()
+            step(i)
+            elapsed = (time.perf_counter() - start) * 1000
+            if i:
+                times.append(elapsed)
+    return {"min_ms": min(times), "median_ms": statistics.median(times), "mean_ms": statistics.fmean(times)}
+def canvas_cases(width, height, repeat, directory):
+    canvas = PixelCanvas(width, height)
+    full = QRect(0, 0, width, height)
+    set_color = lambda i: canvas.set_color(COLORS[i % 2])
+    yield "fill", measure(lambda i: canvas.fill(width // 2, height // 2), repeat, set_color)
+    yield "draw_line", measure(lambda i: canvas.draw_line(0, 0, width - 1, height - 1), repeat, set_color)
+    yield "fill_rectangle", measure(lambda i: canvas.fill_rectangle(full), repeat, set_color)
+    for x in range(0, width, 8):
+        canvas.draw_line(x, 0, width - 1 - x, height - 1)
+    path = os.path.join(directory, f"export_{width}x{height}.png")
+    yield "export_image", measure(lambda i: canvas.export_image(path), repeat)
+    yield "paint", measure(lambda i: canvas.grab(VIEWPORT), repeat)
+    converter = XBMConverter()
+    image = canvas.get_image()
+    yield "image_to_xbm", measure(lambda i: converter.image_to_xbm(image), repeat)
+    xbm_data = converter.image_to_xbm(image)
+    yield "xbm_to_image", measure(lambda i: converter.xbm_to_image(xbm_data), repeat)
+    history = HistoryManager(canvas, max_history=HISTORY_STATES)
+    def save_state(i):
+        canvas.fill_rectangle(QRect(i % width, 0, 1, height))
+        history.save_state()
+    yield "history_save", measure(save_state, repeat, set_color)
+    yield "undo", measure(lambda i: history.undo(), repeat, lambda i: history.redo() if i else None)
+    yield "redo", measure(lambda i: history.redo(), repeat, lambda i: history.undo())
+def layer_cases(repeat):
+    for count in LAYER_COUNTS:
+        manager = LayerManager(LayerWidget())
+        for index in range(count):
+            manager.add_layer(f"Слой {index + 1}")
+            manager.layers[-1]["image"].fill(QColor(index * 7 % 256, 0, 0, 128))
+        yield f"get_composite_image {count} layers", measure(lambda i: manager.get_composite_image(), repeat)
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SOURCE_DIR,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+def compare(results, baseline, threshold, noise):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        ratio = result["median_ms"] / max(previous["median_ms"], 1e-6)
+        slower = ratio > threshold and result["median_ms"] - previous["median_ms"] > noise
+        marker = "  РЕГРЕССИЯ" if slower else ""
+        print(f"{name:<44} {previous['median_ms']:9.2f} -> {result['median_ms']:9.2f} ms  x{ratio:5.2f}{marker}")
+        if slower:
+            regressions.append(name)
+    return regressions
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки холста, истории, слоев и XBM")
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=SIZES, help="размеры холста, например 128x64")
+    parser.add_argument("--repeat", type=int, default=5, help="число замеров на операцию")
+    parser.add_argument("--json", help="файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON с прошлыми результатами для сравнения")
+    parser.add_argument("--threshold", type=float, default=1.25, help="допустимое замедление медианы")
+    parser.add_argument("--noise-ms", type=float, default=0.5, help="разница в мс, которая считается шумом")
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    def record(name, result):
+        results[name] = result
+        print(f"{name:<44} min {result['min_ms']:9.2f} ms   median {result['median_ms']:9.2f} ms")
+    with tempfile.TemporaryDirectory() as directory:
+        for width, height in args.sizes:
+            for case, result in canvas_cases(width, height, args.repeat, directory):
+                record(f"{case} {width}x{height}", result)
+    for name, result in layer_cases(args.repeat):
+        record(name, result)
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": f"{platform.system()} {platform.machine()}",
+        "qt_platform": app.platformName(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.noise_ms)
+        if regressions:
+            print(f"Регрессии: {', '.join(regressions)}")
+            return 1
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
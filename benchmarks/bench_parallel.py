@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_core import SOURCE_DIR, git_revision, measure, parse_size
+sys.path.insert(0, SOURCE_DIR)
+import parallel_ops
+WORKERS = [1, 2, 4, 8]
+def operation_cases(pixels, target, workers):
+    source = pixels.copy()
+    yield "invert", lambda i: parallel_ops.invert(pixels, workers)
+    yield "threshold", lambda i: parallel_ops.threshold(pixels, 128, workers)
+    values = (0xFF000000, 0xFFFFFFFF)
+    yield "replace", lambda i: parallel_ops.replace(pixels, values[i % 2], values[1 - i % 2], workers)
+    yield "offset_wrap", lambda i: parallel_ops.offset(target, source, 17, -9, True, 0, workers)
+    yield "offset_shift", lambda i: parallel_ops.offset(target, source, 17, -9, False, 0, workers)
+    yield "mirror_horizontal", lambda i: parallel_ops.mirror(target, source, True, workers)
+    yield "mirror_vertical", lambda i: parallel_ops.mirror(target, source, False, workers)
+    yield "resize_copy", lambda i: parallel_ops.copy_region(target, source[:-64, :-64], 0xFFFFFFFF, workers)
+def main():
+    parser = argparse.ArgumentParser(description="Масштабирование параллельных операций над буфером по числу потоков")
+    parser.add_argument("--size", type=parse_size, default=(8192, 8192), help="размер изображения, например 8192x8192")
+    parser.add_argument("--workers", type=int, nargs="+", default=WORKERS, help="число потоков для замера")
+    parser.add_argument("--repeat", type=int, default=3, help="число замеров на операцию")
+    parser.add_argument("--json", help="файл для результатов в JSON")
+    args = parser.parse_args()
+    width, height = args.size
+    generator = np.random.default_rng(1)
+    pixels = np.where(generator.random((height, width)) < 0.5, np.uint32(0xFF000000), np.uint32(0xFFFFFFFF))
+    target = np.empty_like(pixels)
+    print(f"Изображение {width}x{height}, ядер: {os.cpu_count()}, пул: {parallel_ops.MAX_WORKERS} потоков")
+    results = {}
+    for workers in args.workers:
+        for name, step in operation_cases(pixels, target, workers):
+            result = measure(step, args.repeat)
+            base = results.get(f"{name} x1")
+            result["speedup"] = base["median_ms"] / result["median_ms"] if base else 1.0
+            results[f"{name} x{workers}"] = result
+            print(f"{name:<20} потоков {workers:<3} median {result['median_ms']:9.2f} ms   ускорение x{result['speedup']:5.2f}")
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": f"{platform.system()} {platform.machine()}",
+        "cpu_count": os.cpu_count(),
+        "size": f"{width}x{height}",
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
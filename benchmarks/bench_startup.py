@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PixelCraftor")
+FIRST_PAINT = """
+import time
+start = time.perf_counter()
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QObject, QEvent
+import main
+class PaintWatcher(QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            print((time.perf_counter() - start) * 1000)
+            app.exit(0)
+        return False
+app = QApplication([])
+window = main.PixelCraftor()
+watcher = PaintWatcher()
+window.canvas.installEventFilter(watcher)
+window.show()
+app.exec()
+"""
+def environment():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+def import_time():
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=SOURCE_DIR,
+                            env=environment(), capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return modules
+def first_paint_time():
+    result = subprocess.run([sys.executable, "-c", FIRST_PAINT], cwd=SOURCE_DIR,
+                            env=environment(), capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени запуска PixelCraftor")
+    parser.add_argument("--runs", type=int, default=5, help="число запусков")
+    parser.add_argument("--max-import-ms", type=float, default=600, help="порог времени импорта main")
+    parser.add_argument("--max-paint-ms", type=float, default=1500, help="порог времени до первой отрисовки")
+    parser.add_argument("--json", help="файл для результатов в JSON")
+    args = parser.parse_args()
+    imports = [import_time() for _ in range(args.runs)]
+    paints = [first_paint_time() for _ in range(args.runs)]
+    slowest = sorted(imports[-1].items(), key=lambda item: item[1], reverse=True)[:10]
+    results = {
+        "import_ms": statistics.median(run["main"] for run in imports),
+        "first_paint_ms": statistics.median(paints),
+        "slowest_imports_ms": dict(slowest),
+        "lazy_modules_loaded": sorted(name for name in ("PIL", "PIL.Image", "dither_dialog", "palette_panel", "locale_en")
+                                      if name in imports[-1]),
+    }
+    print(f"{'import main':<30} median {results['import_ms']:8.1f} ms   limit {args.max_import_ms:8.1f} ms")
+    print(f"{'first paint':<30} median {results['first_paint_ms']:8.1f} ms   limit {args.max_paint_ms:8.1f} ms")
+    for name, elapsed in slowest:
+        print(f"  {name:<28} {elapsed:8.1f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    failed = results["import_ms"] > args.max_import_ms or results["first_paint_ms"] > args.max_paint_ms
+    if results["lazy_modules_loaded"]:
+        print(f"Модули загружены при старте: {', '.join(results['lazy_modules_loaded'])}")
+        failed = True
+    return 1 if failed else 0
+if __name__ == "__main__":
+    sys.exit(main())
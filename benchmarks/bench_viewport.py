@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+import statistics
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PixelCraftor"))
+from PySide6.QtWidgets import QApplication, QScrollArea
+from PySide6.QtCore import QPointF
+from canvas import PixelCanvas
+from viewport import BACKEND
+SIZES = [(128, 64), (1024, 1024), (4096, 4096)]
+SCALES = [1, 4, 8.5, 32]
+FRAMES = 30
+def frame_times(canvas, step):
+    times = []
+    for i in range(FRAMES):
+        step(i)
+        start = time.perf_counter()
+        canvas.repaint(canvas.visibleRegion().boundingRect())
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+def report(name, times):
+    times = sorted(times)
+    print(f"{name:<40} median {statistics.median(times):7.2f} ms   p95 {times[int(len(times) * 0.95) - 1]:7.2f} ms")
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"Viewport backend: {BACKEND}, platform: {app.platformName()}")
+    for width, height in SIZES:
+        scroll_area = QScrollArea()
+        scroll_area.resize(1200, 800)
+        canvas = PixelCanvas(width, height)
+        scroll_area.setWidget(canvas)
+        scroll_area.show()
+        app.processEvents()
+        for scale in SCALES:
+            canvas.set_scale(scale)
+            app.processEvents()
+            report(f"repaint {width}x{height} @ {scale}x", frame_times(canvas, lambda i: None))
+            bar = scroll_area.horizontalScrollBar()
+            report(f"pan {width}x{height} @ {scale}x",
+                   frame_times(canvas, lambda i: bar.setValue(bar.maximum() * i // FRAMES)))
+        canvas.set_scale(1)
+        app.processEvents()
+        report(f"smooth zoom {width}x{height} 1x..32x",
+               frame_times(canvas, lambda i: canvas.zoom_at(QPointF(600, 400), 32 ** (1 / FRAMES))))
+        scroll_area.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PixelCraftor"))
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QColor, QWheelEvent
+from PySide6.QtCore import Qt, QObject, QEvent, QPoint, QPointF
+from PySide6.QtTest import QTest
+from documents import Document
+from event_log import (EventRecorder, read_event_log, unpack_modifiers,
+                       PRESS, MOVE, RELEASE, KEY_PRESS, KEY_RELEASE, WHEEL, TOOL, COLOR)
+EVENT_NAMES = {PRESS: "press", MOVE: "move", RELEASE: "release", KEY_PRESS: "key_press",
+               KEY_RELEASE: "key_release", WHEEL: "wheel"}
+SETTLE_MS = 200
+class PaintCounter(QObject):
+    def __init__(self, widget):
+        super().__init__()
+        self.paints = 0
+        widget.installEventFilter(self)
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            self.paints += 1
+        return False
+def count_calls(owner, name, counter, key):
+    original = getattr(owner, name)
+    def wrapper(*args, **kwargs):
+        counter[key] += 1
+        return original(*args, **kwargs)
+    setattr(owner, name, wrapper)
+def open_document(width, height, scale, viewport):
+    document = Document(width, height, "replay")
+    document.scroll_area.resize(viewport[0] + 2, viewport[1] + 2)
+    document.canvas.set_scale(scale)
+    document.scroll_area.show()
+    QApplication.processEvents()
+    return document
+def dispatch(canvas, kind, x, y, button, modifiers, value):
+    position = QPoint(x, y)
+    modifiers = Qt.KeyboardModifier(unpack_modifiers(modifiers))
+    if kind == PRESS:
+        QTest.mousePress(canvas, Qt.MouseButton(button), modifiers, position)
+    elif kind == MOVE:
+        QTest.mouseMove(canvas, position)
+    elif kind == RELEASE:
+        QTest.mouseRelease(canvas, Qt.MouseButton(button), modifiers, position)
+    elif kind == KEY_PRESS:
+        QTest.keyPress(canvas, Qt.Key(value), modifiers)
+    elif kind == KEY_RELEASE:
+        QTest.keyRelease(canvas, Qt.Key(value), modifiers)
+    elif kind == WHEEL:
+        point = QPointF(position)
+        QApplication.sendEvent(canvas, QWheelEvent(point, canvas.mapToGlobal(point), QPoint(), QPoint(0, value),
+                                                   Qt.NoButton, modifiers, Qt.NoScrollPhase, False))
+def percentiles(times):
+    times = sorted(times)
+    pick = lambda fraction: times[min(len(times) - 1, int(len(times) * fraction))]
+    return {"count": len(times), "p50_ms": statistics.median(times), "p90_ms": pick(0.9),
+            "p99_ms": pick(0.99), "max_ms": times[-1]}
+def replay(file_path, realtime=False):
+    header, events = read_event_log(file_path)
+    document = open_document(header["width"], header["height"], header["scale"], header["viewport"])
+    canvas = document.canvas
+    painter = PaintCounter(canvas)
+    snapshots = {"history": 0, "canvas": 0}
+    count_calls(document.history_manager, "save_state", snapshots, "history")
+    count_calls(canvas, "save_state", snapshots, "canvas")
+    latencies = {}
+    start = time.perf_counter()
+    for kind, elapsed, x, y, button, modifiers, value in events:
+        if realtime:
+            delay = elapsed / 1000 - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        if kind == TOOL:
+            canvas.set_tool(value)
+            continue
+        if kind == COLOR:
+            canvas.set_color(QColor.fromRgba(value))
+            continue
+        begin = time.perf_counter()
+        dispatch(canvas, kind, x, y, button, modifiers, value)
+        QApplication.processEvents()
+        latencies.setdefault(EVENT_NAMES[kind], []).append((time.perf_counter() - begin) * 1000)
+    wall = (time.perf_counter() - start) * 1000
+    QTest.qWait(SETTLE_MS)
+    all_latencies = [value for times in latencies.values() for value in times]
+    return {
+        "log": os.path.basename(file_path),
+        "canvas": f"{header['width']}x{header['height']}",
+        "scale": header["scale"],
+        "events": len(all_latencies),
+        "wall_ms": wall,
+        "latency": percentiles(all_latencies) if all_latencies else None,
+        "latency_by_event": {name: percentiles(times) for name, times in latencies.items()},
+        "paints": painter.paints,
+        "history_snapshots": snapshots["history"],
+        "canvas_snapshots": snapshots["canvas"],
+    }
+def record_demo(file_path, width, height, strokes, seed):
+    document = open_document(width, height, 8, (1200, 800))
+    canvas = document.canvas
+    recorder = EventRecorder(canvas, file_path)
+    generator = random.Random(seed)
+    limit = QPoint(min(width * canvas.scale, 1200) - 1, min(height * canvas.scale, 800) - 1)
+    for stroke in range(strokes):
+        canvas.set_tool(["pen", "pen", "line", "eraser"][stroke % 4])
+        canvas.set_color(QColor.fromHsv(generator.randrange(360), 255, 200))
+        point = QPoint(generator.randrange(limit.x()), generator.randrange(limit.y()))
+        QTest.mousePress(canvas, Qt.LeftButton, Qt.NoModifier, point)
+        for _ in range(40):
+            point = QPoint(max(0, min(limit.x(), point.x() + generator.randint(-12, 12))),
+                           max(0, min(limit.y(), point.y() + generator.randint(-12, 12))))
+            QTest.mouseMove(canvas, point)
+        QTest.mouseRelease(canvas, Qt.LeftButton, Qt.NoModifier, point)
+        if stroke % 5 == 4:
+            QTest.keyClick(canvas, Qt.Key_Z, Qt.ControlModifier)
+    return recorder.stop()
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение записанной сессии и замер задержек")
+    parser.add_argument("log", help="журнал событий (.pcev)")
+    parser.add_argument("--realtime", action="store_true", help="соблюдать интервалы между событиями")
+    parser.add_argument("--demo", action="store_true", help="сначала записать синтетическую сессию в журнал")
+    parser.add_argument("--size", default="128x64", help="размер холста для --demo")
+    parser.add_argument("--strokes", type=int, default=50, help="число штрихов для --demo")
+    parser.add_argument("--seed", type=int, default=1, help="зерно генератора для --demo")
+    parser.add_argument("--json", help="файл для результатов в JSON")
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if args.demo:
+            width, height = (int(value) for value in args.size.lower().split("x"))
+            record_demo(args.log, width, height, args.strokes, args.seed)
+        result = replay(args.log, args.realtime)
+    print(f"Журнал {result['log']}: {result['events']} событий, холст {result['canvas']} @ {result['scale']}x, "
+          f"{result['wall_ms']:.0f} ms")
+    for name, stats in [("all", result["latency"])] + sorted(result["latency_by_event"].items()):
+        if stats:
+            print(f"  {name:<12} n={stats['count']:<6} p50 {stats['p50_ms']:7.2f}   p90 {stats['p90_ms']:7.2f}   "
+                  f"p99 {stats['p99_ms']:7.2f}   max {stats['max_ms']:7.2f} ms")
+    print(f"  отрисовок {result['paints']}, снимков истории {result['history_snapshots']}, "
+          f"снимков холста {result['canvas_snapshots']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    app.processEvents()
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())